@@ -7,6 +7,7 @@ import os
 from flask import Flask
 from config import CONFIG_NAME_MAPPER
 from app.extensions import db, ma, migrate, jwt
+from app.middleware import GzipRequestMiddleware
 from redis import Redis
 
 
@@ -17,6 +18,9 @@ def create_app(config_name):
     configure_extensions(app)
     configure_redis(app)
     register_blueprints(app)
+    app.wsgi_app = GzipRequestMiddleware(
+        app.wsgi_app, max_size=app.config["MAX_DECOMPRESSED_REQUEST_SIZE"]
+    )
     return app
 
 
@@ -0,0 +1,45 @@
+"""This module contains set-based writes used by the bulk api resources."""
+
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql
+from app.extensions import db
+
+
+def upsert_rows(model, rows, keys):
+    """Insert the rows whose key columns do not match an existing row.
+    Return a dictionary mapping every row's key to its id, along with
+    the set of keys that were inserted.
+    """
+    columns = [getattr(model, key) for key in keys]
+    rows_by_key = {tuple(row[key] for key in keys): row for row in rows}
+    ids = find_ids(model, columns, rows_by_key)
+    new_rows = [row for key, row in rows_by_key.items() if key not in ids]
+    if not new_rows:
+        return ids, set()
+    # rows inserted by a concurrent request are skipped and picked up below
+    db.session.execute(insert_ignoring_conflicts(model.__table__), new_rows)
+    existing_keys = set(ids)
+    ids = find_ids(model, columns, rows_by_key)
+    return ids, set(ids) - existing_keys
+
+
+def find_ids(model, columns, keys):
+    """Return a dictionary mapping the given keys to the ids of the rows
+    whose key columns match them.
+    """
+    query = db.session.query(model.id, *columns)
+    if len(columns) == 1:
+        query = query.filter(columns[0].in_([key[0] for key in keys]))
+    else:
+        query = query.filter(tuple_(*columns).in_(list(keys)))
+    return {tuple(row[1:]): row[0] for row in query}
+
+
+def insert_ignoring_conflicts(table):
+    """Return an INSERT statement for the given table that skips rows
+    violating a unique constraint.
+    """
+    if db.session.bind.dialect.name == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return table.insert().prefix_with("OR IGNORE")
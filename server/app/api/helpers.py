@@ -3,7 +3,7 @@
 
 import os
 from flask import current_app
-from datetime import datetime
+from datetime import datetime, time, timedelta
 
 
 def string_to_date(date_string, format):
@@ -16,6 +16,16 @@ def string_to_date(date_string, format):
         return None
 
 
+def date_range_bounds(start_date, end_date):
+    """Given an inclusive range of dates, return the half-open
+    range of datetimes [start, end) that covers every moment of those days.
+    Comparing a column against these bounds lets the database use an index.
+    """
+    start_datetime = datetime.combine(start_date, time.min)
+    end_datetime = datetime.combine(end_date + timedelta(days=1), time.min)
+    return start_datetime, end_datetime
+
+
 def allowed_file_extension(filename):
     """Return True if the extension of the given file is in the set of
     allowed file extensions.
@@ -31,18 +41,3 @@ def create_directory(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-
-def create_filepath(filename, version=1):
-    """Given a filename and version, return the filepath where
-    the file will be stored as a string.
-    """
-    extensions = current_app.config["ALLOWED_EXTENSIONS"]
-    for extension in extensions:
-        index = filename.find(extension)
-        #creaate new filename in the format of my_old_file_2.jpg
-        if index != - 1:
-            new_filename = filename[:index - 1] + "_" + str(version) + "." + extension
-            break
-    filepath = current_app.config["UPLOAD_DIRECTORY"] + "/" + new_filename
-    return filepath
-
@@ -0,0 +1,277 @@
+"""This module contains the content-addressed storage of image files.
+
+Files are named after the SHA-256 hash of their bytes and sharded into two
+levels of directories named after the first four characters of the hash,
+so identical images are stored once however many artists use them.
+Files that no image row references any more are deleted by a periodic
+sweep rather than on the request path, since a concurrent upload of the
+same bytes may be about to reuse them.
+
+Uploads are streamed into an UploadStream while the multipart body is
+parsed, so they are hashed, sniffed and size checked as they arrive.
+
+Resized copies of every stored image are written next to it by a Celery
+task, so no image is resized on the request path.
+"""
+
+
+import hashlib
+import os
+import re
+import time
+from io import BytesIO
+from uuid import uuid4
+from flask import current_app
+from PIL import Image as PillowImage
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+from app.extensions import db
+from app.models import Image
+from app.api.helpers import create_directory
+
+
+# room left for the multipart boundaries and headers around an upload
+MULTIPART_OVERHEAD = 64 * 1024
+
+# widths in pixels of the resized copies made of every stored image
+DERIVATIVE_WIDTHS = (150, 300, 600)
+
+# file extensions and Pillow formats of the resized copies
+DERIVATIVE_FORMATS = (("webp", "WEBP"), ("jpg", "JPEG"))
+
+# names of stored files and of their resized copies
+FILENAME_PATTERN = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:_(?P<width>[0-9]+))?\.(?P<extension>jpg|png|webp)$")
+
+# uploads up to this size are kept in memory, larger ones spill to disk
+SPOOL_SIZE = 512 * 1024
+
+# leading bytes that identify the supported image types
+SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+)
+
+
+class UploadStream:
+    """Class to represent the destination of an uploaded file. The bytes are
+    hashed and the image type is sniffed as they are written. Once the upload
+    is larger than SPOOL_SIZE it is written to a temporary file in the upload
+    directory, and writing more than max_size bytes raises RequestEntityTooLarge.
+    """
+
+    def __init__(self, directory, max_size):
+        self._directory = directory
+        self._max_size = max_size
+        self._digest = hashlib.sha256()
+        self._header = b""
+        self._file = BytesIO()
+        self._temporary_path = None
+        self.size = 0
+
+    @property
+    def digest(self):
+        """Return the SHA-256 hex digest of the bytes written so far."""
+        return self._digest.hexdigest()
+
+    @property
+    def extension(self):
+        """Return the file extension of the sniffed image type, or None
+        if the bytes are not a supported image.
+        """
+        for signature, extension in SIGNATURES:
+            if self._header.startswith(signature):
+                return extension
+        return None
+
+    def write(self, data):
+        """Write a chunk of the upload."""
+        self.size += len(data)
+        if self.size > self._max_size:
+            raise RequestEntityTooLarge()
+        if len(self._header) < 8:
+            self._header += data[:8 - len(self._header)]
+        self._digest.update(data)
+        if self._temporary_path is None and self.size > SPOOL_SIZE:
+            self._spill()
+        self._file.write(data)
+
+    def _spill(self):
+        """Move the bytes written so far from memory to a temporary file."""
+        create_directory(self._directory)
+        self._temporary_path = os.path.join(self._directory, f".{uuid4().hex}.upload")
+        temporary_file = open(self._temporary_path, "wb+")
+        temporary_file.write(self._file.getvalue())
+        self._file = temporary_file
+
+    def seek(self, offset, whence=0):
+        """Move the position in the upload."""
+        return self._file.seek(offset, whence)
+
+    def read(self, size=-1):
+        """Read from the upload."""
+        return self._file.read(size)
+
+    def save(self, path):
+        """Atomically move the upload to the given path. Nothing is
+        written if the path already exists.
+        """
+        if os.path.exists(path):
+            return
+        create_directory(os.path.dirname(path))
+        if self._temporary_path is None:
+            self._spill()
+        self._file.close()
+        os.replace(self._temporary_path, path)
+        self._temporary_path = None
+
+    def discard(self):
+        """Delete the upload if it was not saved."""
+        self._file.close()
+        if self._temporary_path is not None and os.path.exists(self._temporary_path):
+            os.remove(self._temporary_path)
+        self._temporary_path = None
+
+
+def parse_uploads(environ):
+    """Parse the multipart body of the request, streaming every file into
+    an UploadStream. Return the parsed files and the created streams, which
+    have to be discarded once the request is handled.
+    """
+    config = current_app.config
+    uploads = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        upload = UploadStream(config["UPLOAD_DIRECTORY"], config["MAX_IMAGE_SIZE"])
+        uploads.append(upload)
+        return upload
+
+    try:
+        _, _, files = parse_form_data(
+            environ,
+            stream_factory=stream_factory,
+            max_content_length=config["MAX_IMAGE_SIZE"] + MULTIPART_OVERHEAD
+        )
+    except RequestEntityTooLarge:
+        for upload in uploads:
+            upload.discard()
+        raise
+    return files, uploads
+
+
+def content_path(digest, extension):
+    """Return the path of the stored file with the given hash."""
+    return os.path.join(
+        current_app.config["UPLOAD_DIRECTORY"], digest[:2], digest[2:4], f"{digest}.{extension}"
+    )
+
+
+def stored_file_path(filename):
+    """Return the path of the stored file or resized copy with the given
+    name, or None if the name is not one the store produces.
+    """
+    match = FILENAME_PATTERN.match(filename)
+    if match is None:
+        return None
+    digest = match.group("digest")
+    return os.path.join(current_app.config["UPLOAD_DIRECTORY"], digest[:2], digest[2:4], filename)
+
+
+def store_upload(upload):
+    """Save the upload under its content-addressed path and return the
+    path. Nothing is written if the same bytes are already stored.
+    """
+    path = content_path(upload.digest, upload.extension)
+    if os.path.exists(path):
+        # marks the file as in use, so the sweep leaves it alone until the
+        # image row that reuses it is committed
+        os.utime(path)
+    upload.save(path)
+    return path
+
+
+def derivative_path(path, width, extension):
+    """Return the path of a resized copy of the stored file at the given path."""
+    root, _ = os.path.splitext(path)
+    return f"{root}_{width}.{extension}"
+
+
+def create_derivatives(path):
+    """Write a copy of the stored image at the given path for each of the
+    DERIVATIVE_WIDTHS and DERIVATIVE_FORMATS, and return their descriptions.
+    Images are never enlarged, and copies that already exist are kept.
+    """
+    derivatives = []
+    with PillowImage.open(path) as original:
+        original.load()
+        for width in DERIVATIVE_WIDTHS:
+            resized = None
+            for extension, image_format in DERIVATIVE_FORMATS:
+                destination = derivative_path(path, width, extension)
+                if not os.path.exists(destination):
+                    if resized is None:
+                        resized = resize(original, width)
+                    save_image(resized, destination, image_format)
+                derivatives.append(
+                    {"width": width, "format": extension, "path": destination}
+                )
+    return derivatives
+
+
+def resize(image, width):
+    """Return a copy of the given Pillow image scaled to the given width."""
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), PillowImage.LANCZOS)
+
+
+def save_image(image, path, image_format):
+    """Atomically write the given Pillow image to the given path."""
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    temporary_path = os.path.join(os.path.dirname(path), f".{uuid4().hex}.tmp")
+    try:
+        image.save(temporary_path, image_format, quality=85)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+
+def sweep_orphaned_files(grace_period):
+    """Delete the stored files that no image references and that were not
+    stored or reused in the last grace_period seconds, along with their
+    resized copies. Return the paths of the deleted files.
+    """
+    referenced = {path for path, in db.session.query(Image.path)}
+    cutoff = time.time() - grace_period
+    deleted = []
+    for directory, _, filenames in os.walk(current_app.config["UPLOAD_DIRECTORY"]):
+        for filename in filenames:
+            match = FILENAME_PATTERN.match(filename)
+            if match is None or match.group("width") is not None:
+                continue
+            path = os.path.join(directory, filename)
+            if path in referenced:
+                continue
+            try:
+                if os.stat(path).st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+            delete_file(path)
+            deleted.append(path)
+    return deleted
+
+
+def delete_file(path):
+    """Delete the stored file at the given path and its resized copies."""
+    for width in DERIVATIVE_WIDTHS:
+        for extension, _ in DERIVATIVE_FORMATS:
+            copy_path = derivative_path(path, width, extension)
+            if os.path.exists(copy_path):
+                os.remove(copy_path)
+    if os.path.exists(path):
+        os.remove(path)
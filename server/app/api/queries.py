@@ -0,0 +1,85 @@
+"""This module contains functions for building the database queries
+used by the api resources.
+"""
+
+
+from http import HTTPStatus
+from flask_restful import abort
+from app.models import Performance
+from app.extensions import db
+from app.api.helpers import string_to_date, date_range_bounds
+
+
+def filter_performances(
+    artist_id=None, venue_id=None, start_date=None, end_date=None, title=None
+):
+    """Return a query for the performances that match all of the given
+    filters, ordered by start time. Filters that are None are ignored.
+    """
+    query = Performance.query
+    if artist_id is not None:
+        query = query.filter(Performance.artist_id == artist_id)
+    if venue_id is not None:
+        query = query.filter(Performance.venue_id == venue_id)
+    if start_date is not None and end_date is not None:
+        start_datetime, end_datetime = date_range_bounds(start_date, end_date)
+        query = query.filter(
+            Performance.start_datetime >= start_datetime,
+            Performance.start_datetime < end_datetime
+        )
+    if title:
+        pattern = title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(Performance.title.ilike(f"%{pattern}%", escape="\\"))
+    return query.order_by(Performance.start_datetime, Performance.id)
+
+
+def parse_date_range(args):
+    """Return the start and end dates sent in the given query string
+    arguments. Both dates are None if neither was sent. Abort with a 400
+    status if only one date was sent or if a date is incorrectly formatted.
+    """
+    start_date = args.get("start_date")
+    end_date = args.get("end_date")
+    if start_date is None and end_date is None:
+        return None, None
+    # only provided with either start date or end date
+    if start_date is None or end_date is None:
+        abort(HTTPStatus.BAD_REQUEST, message="Please provide both a start and an end date.")
+    start_date = string_to_date(start_date, "%m/%d/%Y")
+    end_date = string_to_date(end_date, "%m/%d/%Y")
+    if start_date is None:
+        abort(HTTPStatus.BAD_REQUEST, message={"start_date": "Incorrectly formatted date."})
+    if end_date is None:
+        abort(HTTPStatus.BAD_REQUEST, message={"end_date": "Incorrectly formatted date."})
+    return start_date, end_date
+
+
+def preload_performance_ids(owners, column):
+    """Load the ids of the performances of every given artist or venue
+    with a single query. The column is the foreign key on Performance
+    that points at the owners, e.g. Performance.artist_id.
+    """
+    ids_by_owner = {owner.id: [] for owner in owners}
+    if ids_by_owner:
+        rows = (
+            db.session.query(column, Performance.id)
+            .filter(column.in_(ids_by_owner))
+            .order_by(column, Performance.start_datetime, Performance.id)
+        )
+        for owner_id, performance_id in rows:
+            ids_by_owner[owner_id].append(performance_id)
+    for owner in owners:
+        owner.preloaded_performance_ids = ids_by_owner[owner.id]
+
+
+def performance_ids(owner):
+    """Return the ids of the performances of the given artist or venue,
+    using the ids loaded by preload_performance_ids if there are any.
+    """
+    ids = getattr(owner, "preloaded_performance_ids", None)
+    if ids is None:
+        rows = owner.performances.with_entities(Performance.id).order_by(
+            Performance.start_datetime, Performance.id
+        )
+        ids = [performance_id for performance_id, in rows]
+    return ids
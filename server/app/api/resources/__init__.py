@@ -6,11 +6,13 @@ from app.api.resources.artist import (
     ArtistListAPI,
     ArtistByNameAPI
 )
-from app.api.resources.image import ArtistImageListAPI
+from app.api.resources.image import ArtistImageListAPI, ImageFileAPI
 from app.api.resources.performance import (
     PerformanceAPI, 
     PerformanceListAPI, 
-    ArtistPerformanceListAPI
+    PerformanceBulkAPI,
+    ArtistPerformanceListAPI,
+    VenuePerformanceListAPI
 )
 from app.api.resources.venue import (
     VenueAPI,
@@ -21,7 +23,8 @@ from app.api.resources.user import UserAPI, UserListAPI
 from app.api.resources.crawl import (
     CrawlTaskAPI, 
     CrawlTaskStatusAPI, 
-    CrawlGroupAPI
+    CrawlTaskStatusStreamAPI, 
+    CrawlGroupAPI, 
+    CrawlGroupStatusAPI
 )
-    
-
+from app.api.resources.cache import CacheStatsAPI
@@ -2,12 +2,17 @@
 
 
 from http import HTTPStatus
+from functools import partial
 from flask import request
 from flask_restful import Resource
+from sqlalchemy.orm import selectinload
 from marshmallow import ValidationError
-from app.models import Artist
+from app.models import Artist, Performance, Image
 from app.extensions import db
 from app.project_helpers import paginate
+from app.api.queries import preload_performance_ids
+from app.cache import cached, invalidates
+from app.conditional import conditional, row_version, collection_version
 
 
 class ArtistAPI(Resource):
@@ -16,6 +21,12 @@ class ArtistAPI(Resource):
     def __init__(self, schema):
         self.schema = schema
 
+    def _version(self, artist_id):
+        """Return the version of a single artist resource."""
+        return row_version(Artist, Artist.id == artist_id)
+
+    @conditional()
+    @cached(Artist.__tablename__, Performance.__tablename__, Image.__tablename__)
     def get(self, artist_id):
         """Return a single artist resource."""
         artist = Artist.query.get(artist_id)
@@ -23,6 +34,7 @@ class ArtistAPI(Resource):
             return {"message": "Artist could not be found."}, HTTPStatus.NOT_FOUND
         return self.schema.dump(artist), HTTPStatus.OK
 
+    @invalidates(Artist.__tablename__)
     def put(self, artist_id):
         """Update a single artist resource."""
         json_data = request.get_json()
@@ -39,6 +51,7 @@ class ArtistAPI(Resource):
         db.session.commit()
         return {}, HTTPStatus.NO_CONTENT
 
+    @invalidates(Artist.__tablename__, Performance.__tablename__, Image.__tablename__)
     def delete(self, artist_id):
         """Delete a single artist resource."""
         artist = Artist.query.get(artist_id)
@@ -52,9 +65,15 @@ class ArtistAPI(Resource):
 class ArtistByNameAPI(Resource):
     """Class to represent a single artist resource identified by name."""
 
-    def __init__(self, **kwargs):
+    def __init__(self, schema):
         self.schema = schema
 
+    def _version(self, name):
+        """Return the version of a single artist resource identified by name."""
+        return row_version(Artist, Artist.name == name)
+
+    @conditional()
+    @cached(Artist.__tablename__, Performance.__tablename__, Image.__tablename__)
     def get(self, name):
         """Return a single artist resource identified by name."""
         artist = Artist.query.filter_by(name=name).first()
@@ -69,11 +88,24 @@ class ArtistListAPI(Resource):
     def __init__(self, schema):
         self.schema = schema
 
+    def _version(self):
+        """Return the version of the collection of artist resources."""
+        return collection_version(Artist.query)
+
+    @conditional(weak=True)
+    @cached(Artist.__tablename__, Performance.__tablename__, Image.__tablename__)
     def get(self):
         """Return all artist resources."""
-        query = Artist.query
-        return paginate(Artist.__tablename__, query, self.schema), HTTPStatus.OK
+        query = Artist.query.options(selectinload(Artist.image))
+        return paginate(
+            Artist.__tablename__,
+            query,
+            self.schema,
+            keys=(Artist.name, Artist.id),
+            preload=partial(preload_performance_ids, column=Performance.artist_id)
+        ), HTTPStatus.OK
         
+    @invalidates(Artist.__tablename__)
     def post(self):
         """Create a new artist resource."""
         json_data = request.get_json()
@@ -0,0 +1,21 @@
+"""This module contains the resource for monitoring the response cache."""
+
+
+from http import HTTPStatus
+from flask import current_app
+from flask_restful import Resource
+from redis.exceptions import RedisError
+from app.cache import cache_stats
+
+
+class CacheStatsAPI(Resource):
+    """Class to represent the hit and miss counters of the response cache."""
+
+    def get(self):
+        """Return the hit and miss counters of the response cache."""
+        if not current_app.config["RESPONSE_CACHE_ENABLED"]:
+            return {"message": "The response cache is disabled."}, HTTPStatus.NOT_FOUND
+        try:
+            return cache_stats(), HTTPStatus.OK
+        except RedisError:
+            return {"message": "The response cache is unavailable."}, HTTPStatus.SERVICE_UNAVAILABLE
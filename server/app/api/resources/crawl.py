@@ -3,17 +3,32 @@ as Celery tasks.
 """
 
 
-import time
-from flask import request, url_for
+import json
+import threading
+from flask import Response, current_app, request, stream_with_context, url_for
 from flask_restful import Resource
-from app.performance_scraper.performance_scraper.tasks import start_crawl
+from app.celery_app import celery_app
+from app.celery_app.task_status import (
+    follow_status,
+    get_group_summary,
+    get_status,
+    record_group_summary,
+    record_status
+)
+from app.performance_scraper.performance_scraper.tasks import start_crawl, summarize_group_crawl
 from app.performance_scraper.performance_scraper.spiders import SPIDERS
-from celery import group
+from celery import chord, group, states
+from celery.result import GroupResult
+from celery.utils import uuid
 from http import HTTPStatus
 
 
 SPIDER_NAMES = set(SPIDERS)
 
+# number of crawl status streams open in this process
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
 
 class CrawlTaskAPI(Resource):
     """Class for executing a single Scrapy crawl."""
@@ -40,18 +55,14 @@ class CrawlTaskAPI(Resource):
                 "message": f"Crawl was not started due to an invalid spider being provided.",
                 "invalid_spider": spider_name
             }, HTTPStatus.BAD_REQUEST
-        async_result = start_crawl.delay(spider_name)
-        #delay needed to allow for the custom task state to be read
-        time.sleep(5)
+        task_id = queue_crawl(spider_name)
         response = {}
         response["message"] = "Single crawl started."
-        response["uri"] = url_for("api.crawl_status", task_id=async_result.id)
-        response["status"] = async_result.status
+        response["task_id"] = task_id
+        response["uri"] = url_for("api.crawl_status", task_id=task_id)
+        response["status"] = states.PENDING
         response["spider"] = spider_name
-        http_status = HTTPStatus.ACCEPTED
-        if response["status"] == "FAILURE":
-            http_status = HTTPStatus.INTERNAL_SERVER_ERROR
-        return response, http_status
+        return response, HTTPStatus.ACCEPTED
 
 
 class CrawlTaskStatusAPI(Resource):
@@ -59,14 +70,39 @@ class CrawlTaskStatusAPI(Resource):
 
     def get(self, task_id):
         """Return the status of the given task based on its id."""
-        #returns an AsyncResult object, but naming the variable 'task' makes this more readable
-        task = start_crawl.AsyncResult(task_id)
-        response = {"status": task.status}
-        if task.status == "SUCCESS":
-            response["result"] = task.info
-        elif task.status == "FAILURE":
-            response["errors"] = str(task.info)
-        return response, HTTPStatus.OK
+        status = get_status(task_id)
+        if status is not None:
+            return status, HTTPStatus.OK
+        return backend_status(task_id), HTTPStatus.OK
+
+
+class CrawlTaskStatusStreamAPI(Resource):
+    """Class for following the status and progress of a single Scrapy crawl
+    as a stream of Server-Sent Events.
+    """
+
+    def get(self, task_id):
+        """Return a stream of the status and progress events of the given
+        task, which ends once the task has finished. Tasks whose record has
+        expired get their status from the Celery result backend as a single
+        event, and tasks unknown to both are not found. Streams beyond
+        CRAWL_STATUS_MAX_STREAMS in this process are refused.
+        """
+        if get_status(task_id) is None:
+            status = backend_status(task_id)
+            if status["status"] == states.PENDING:
+                return {"message": "Crawl task not found."}, HTTPStatus.NOT_FOUND
+            return event_stream([format_event(("status", status))])
+        if not acquire_stream():
+            return {
+                "message": "Too many crawl status streams are open, poll the status instead.",
+                "uri": url_for("api.crawl_status", task_id=task_id)
+            }, HTTPStatus.SERVICE_UNAVAILABLE
+        response = event_stream(format_event(event) for event in follow_status(task_id))
+        # called once the server is done with the response, even if the
+        # client went away before the stream started
+        response.call_on_close(release_stream)
+        return response
 
 
 class CrawlGroupAPI(Resource):
@@ -101,33 +137,134 @@ class CrawlGroupAPI(Resource):
             spider_name = spider.lower().replace(" ", "_") #format user input
             if spider_name not in SPIDER_NAMES:
                 invalid_spiders.append(spider_name)
-            else:
+            elif spider_name not in valid_spiders:
                 valid_spiders.append(spider_name)
         if not valid_spiders:
             return {
                 "message": "Group crawl was not started due to no valid spiders being provided.", 
                 "invalid spiders": invalid_spiders
             }, HTTPStatus.BAD_REQUEST
+        group_id = uuid()
+        task_ids = [uuid() for _ in valid_spiders]
+        tasks = [
+            {
+                "task_id": task_id,
+                "status": states.PENDING,
+                "spider": spider,
+                "uri": url_for("api.crawl_status", task_id=task_id),
+            }
+            for task_id, spider in zip(task_ids, valid_spiders)
+        ]
+        for task in tasks:
+            record_status(task["task_id"], states.PENDING, spider=task["spider"])
+        record_group_summary(group_id, {"status": states.PENDING, "tasks": tasks})
         crawl_group = group(
-            [start_crawl.signature(args=(spider,)) for spider in valid_spiders]
+            [
+                start_crawl.signature(args=(spider,), task_id=task_id)
+                for task_id, spider in zip(task_ids, valid_spiders)
+            ],
+            task_id=group_id
         )
-        group_result = crawl_group()
-        #delay needed to allow for the custom task state to be read
-        time.sleep(10)
+        summary = summarize_group_crawl.signature(args=(group_id, valid_spiders, task_ids))
+        # saved so that the group can be looked up after its summary expires
+        GroupResult(
+            group_id, [start_crawl.AsyncResult(task_id) for task_id in task_ids], app=celery_app
+        ).save()
+        chord(crawl_group)(summary)
         response = {}
         response["message"] = "Group crawl started."
         response["num_spiders_executed"] = len(valid_spiders)
         response["invalid_spiders"] = invalid_spiders
-        response["tasks"] = []
-        http_status = HTTPStatus.ACCEPTED
-        for result in group_result.results:
-            response["tasks"].append({
-                "status": result.status,
-                "spider": result.info.get("spider"),
-                "uri": url_for("api.crawl_status", task_id=result.id),
-            })
-            if result.status == "FAILURE":
-                http_status = HTTPStatus.INTERNAL_SERVER_ERROR
-        return response, http_status
+        response["group_id"] = group_id
+        response["uri"] = url_for("api.group_crawl_status", group_id=group_id)
+        response["tasks"] = tasks
+        return response, HTTPStatus.ACCEPTED
 
 
+class CrawlGroupStatusAPI(Resource):
+    """Class for checking the status of a group crawl."""
+
+    def get(self, group_id):
+        """Return the summary of the given group crawl. Groups whose summary
+        has expired are looked up in the Celery result backend.
+        """
+        summary = get_group_summary(group_id)
+        if summary is not None:
+            return summary, HTTPStatus.OK
+        group_result = GroupResult.restore(group_id, app=celery_app)
+        if group_result is None:
+            return {"message": "Group crawl not found."}, HTTPStatus.NOT_FOUND
+        return {
+            "status": states.SUCCESS if group_result.ready() else states.PENDING,
+            "tasks": [
+                {
+                    "task_id": result.id,
+                    "status": result.status,
+                    "uri": url_for("api.crawl_status", task_id=result.id),
+                }
+                for result in group_result.results
+            ]
+        }, HTTPStatus.OK
+
+
+def queue_crawl(spider):
+    """Record a crawl of the given spider as pending, then send it to the
+    workers. Return the id of its task.
+    """
+    task_id = uuid()
+    record_status(task_id, states.PENDING, spider=spider)
+    start_crawl.apply_async(args=(spider,), task_id=task_id)
+    return task_id
+
+
+def event_stream(events):
+    """Return a Server-Sent Events response that streams the given events."""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def acquire_stream():
+    """Count a crawl status stream as open, unless this process already has
+    CRAWL_STATUS_MAX_STREAMS open. Return whether it was counted.
+    """
+    global _open_streams
+    with _open_streams_lock:
+        if _open_streams >= current_app.config["CRAWL_STATUS_MAX_STREAMS"]:
+            return False
+        _open_streams += 1
+        return True
+
+
+def release_stream():
+    """Count a crawl status stream as closed."""
+    global _open_streams
+    with _open_streams_lock:
+        _open_streams -= 1
+
+
+def backend_status(task_id):
+    """Return the status of the given task from the Celery result backend,
+    for tasks whose status record has expired. Tasks unknown to the backend
+    are PENDING.
+    """
+    #returns an AsyncResult object, but naming the variable 'task' makes this more readable
+    task = start_crawl.AsyncResult(task_id)
+    response = {"status": task.status}
+    if task.status == "SUCCESS":
+        response["result"] = task.info
+    elif task.status == "FAILURE":
+        response["errors"] = str(task.info)
+    return response
+
+
+def format_event(event):
+    """Return the given event as a Server-Sent Event. None is sent as a
+    comment, which keeps idle connections open.
+    """
+    if event is None:
+        return ": heartbeat\n\n"
+    name, data = event
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
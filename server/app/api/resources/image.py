@@ -2,7 +2,8 @@
 
 
 import os
-from flask import request, current_app
+import mimetypes
+from flask import request, current_app, send_file, Response
 from flask_restful import Resource
 from werkzeug.utils import secure_filename
 from werkzeug.datastructures import FileStorage
@@ -10,7 +11,12 @@ from marshmallow import ValidationError
 from app.models import Image, Artist
 from app.extensions import db
 from http import HTTPStatus
-from app.api.helpers import allowed_file_extension, create_directory, create_filepath
+from app.api.helpers import allowed_file_extension
+from werkzeug.exceptions import RequestEntityTooLarge
+from app.api.image_store import parse_uploads, store_upload, stored_file_path
+from app.api.tasks import generate_image_derivatives
+from app.cache import cached, invalidates
+from app.conditional import conditional, row_version
 
 
 class ArtistImageListAPI(Resource):
@@ -21,20 +27,43 @@ class ArtistImageListAPI(Resource):
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _version(self, artist_id):
+        """Return the version of the artist's image resources."""
+        return row_version(Image, Image.artist_id == artist_id)
+
+    @conditional(weak=True)
+    @cached(Image.__tablename__, Artist.__tablename__)
     def get(self, artist_id):
         """Return all image resources for a specific artist."""
         artist = Artist.query.get(artist_id)
         if artist is None:
             return {"message": "Artist could not be found."}, HTTPStatus.NOT_FOUND
         images = [artist.image]
-        return self._schema.dumps(images, many=True), HTTPStatus.OK
+        return self._schema.dump(images, many=True), HTTPStatus.OK
 
+    @invalidates(Image.__tablename__)
     def put(self, artist_id):
         """Create or replace an image resource for a specific artist."""
         artist = Artist.query.get(artist_id)
         if artist is None:
             return {"message": "Artist could not be found."}, HTTPStatus.NOT_FOUND
-        file = request.files.get("artist_image")
+        try:
+            files, uploads = parse_uploads(request.environ)
+        except RequestEntityTooLarge:
+            return (
+                {
+                    "message": f"Image file is too large. The maximum size is {current_app.config['MAX_IMAGE_SIZE']} bytes."
+                },
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+        try:
+            return self._store_image(artist, files.get("artist_image"))
+        finally:
+            for upload in uploads:
+                upload.discard()
+
+    def _store_image(self, artist, file):
+        """Store the uploaded file as the image of the given artist."""
         if file is None:
             return (
                 {"message": "Could not find an image file in the request."},
@@ -45,35 +74,79 @@ class ArtistImageListAPI(Resource):
         if not allowed_file_extension(file.filename):
             return (
                 {
-                    "message": f"File extension not allowed. Valid extensions include: {list(current_app.config['ALLOWED_FILE_EXTENSIONS'])}"
+                    "message": f"File extension not allowed. Valid extensions include: {list(current_app.config['ALLOWED_EXTENSIONS'])}"
                 },
                 HTTPStatus.BAD_REQUEST,
             )
+        upload = file.stream
+        # the content decides the type, whatever the filename claims
+        if upload.extension is None:
+            return {"message": "File is not a PNG or JPEG image."}, HTTPStatus.BAD_REQUEST
         filename = secure_filename(file.filename)
-        create_directory(current_app.config["UPLOAD_DIRECTORY"])
+        digest = upload.digest
         artist_image = artist.image
+        # duplicate image, no action is needed
+        if artist_image is not None and artist_image.content_hash == digest:
+            return "", HTTPStatus.NO_CONTENT
+        path = store_upload(upload)
+        # images sharing the stored file share its resized copies
+        twin = Image.query.filter(
+            Image.content_hash == digest, Image.derivatives.isnot(None)
+        ).first()
+        derivatives = twin.derivatives if twin is not None else None
         # creating new image for artist
         if artist_image is None:
-            existing_image = Image.query.filter_by(original_filename=filename).first()
-            if existing_image is None:
-                version = 1
-            # another artist already has this image
-            # need to increment the version number when saving the image
-            else:
-                version = existing_image.version + 1
+            artist.image = Image(
+                original_filename=filename, path=path, content_hash=digest, derivatives=derivatives
+            )
         # replacing existing image
         else:
-            version = 1
-            # duplicate image, no action is needed
-            if artist_image.original_filename == filename:
-                return "", HTTPStatus.NO_CONTENT
-            else: #not a duplicate, need to delete the current image from filesystem to make room
-                if os.path.exists(artist.image.path):
-                    os.remove(artist.image.path)
-        destination = create_filepath(filename, version=version)
-        file.save(destination)
-        image = Image(original_filename=filename, path=destination, version=version)
-        artist.image = image
+            artist_image.original_filename = filename
+            artist_image.path = path
+            artist_image.content_hash = digest
+            artist_image.derivatives = derivatives
         db.session.commit()
+        if derivatives is None and current_app.config["IMAGE_DERIVATIVES_ENABLED"]:
+            generate_image_derivatives.delay(digest)
         return {}, HTTPStatus.NO_CONTENT
 
+
+class ImageFileAPI(Resource):
+    """Class to represent a stored image file or one of its resized copies.
+    Files are named after the hash of their content, so a file at a given
+    url never changes and can be cached by clients indefinitely.
+    """
+
+    def get(self, filename):
+        """Return the image file with the given name."""
+        path = stored_file_path(filename)
+        if path is None or not os.path.isfile(path):
+            return {"message": "Image file could not be found."}, HTTPStatus.NOT_FOUND
+        mode = current_app.config["IMAGE_SENDFILE_MODE"]
+        if mode is None:
+            response = send_file(
+                path, add_etags=False, cache_timeout=current_app.config["IMAGE_CACHE_MAX_AGE"]
+            )
+        else:
+            # the fronting proxy sends the file, so no worker streams its bytes
+            response = Response(mimetype=mimetypes.guess_type(filename)[0])
+            response.headers[mode] = self._proxy_location(mode, path)
+        response.set_etag(filename)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["IMAGE_CACHE_MAX_AGE"]
+        response.cache_control.immutable = True
+        if mode is None:
+            return response.make_conditional(
+                request, accept_ranges=True, complete_length=os.path.getsize(path)
+            )
+        return response.make_conditional(request)
+
+    def _proxy_location(self, mode, path):
+        """Return the value of the header that tells the fronting proxy
+        which file to send.
+        """
+        if mode == "X-Sendfile":
+            return os.path.abspath(path)
+        relative_path = os.path.relpath(path, current_app.config["UPLOAD_DIRECTORY"])
+        prefix = current_app.config["IMAGE_ACCEL_REDIRECT_PREFIX"].rstrip("/")
+        return f"{prefix}/{relative_path}"
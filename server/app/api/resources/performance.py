@@ -1,14 +1,20 @@
 """This module contains the performance resources."""
 
-from flask import request
+from datetime import datetime
+from flask import request, current_app
 from flask_restful import Resource
-from sqlalchemy import func
 from marshmallow import ValidationError
-from app.models import Performance, Artist
+from sqlalchemy.exc import IntegrityError
+from app.models import Performance, Artist, Venue
+from app.models.performance import CONTENT_FIELDS, content_hash
 from app.extensions import db
 from http import HTTPStatus
 from app.project_helpers import paginate
-from app.api.helpers import string_to_date
+from app.api.queries import filter_performances, parse_date_range
+from app.api.bulk import upsert_rows
+from app.models.events import touch
+from app.cache import cached, invalidates
+from app.conditional import conditional, row_version, collection_version
 
 
 class PerformanceAPI(Resource):
@@ -17,6 +23,12 @@ class PerformanceAPI(Resource):
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _version(self, performance_id):
+        """Return the version of a single performance resource."""
+        return row_version(Performance, Performance.id == performance_id)
+
+    @conditional()
+    @cached(Performance.__tablename__)
     def get(self, performance_id):
         """Return a single performance resource."""
         performance = Performance.query.get(performance_id)
@@ -24,6 +36,7 @@ class PerformanceAPI(Resource):
             return {"message": "Performance could not be found."}, HTTPStatus.NOT_FOUND
         return self._schema.dump(performance), HTTPStatus.OK
 
+    @invalidates(Performance.__tablename__)
     def put(self, performance_id):
         """Update a single performance resource."""
         json_data = request.get_json()
@@ -44,6 +57,7 @@ class PerformanceAPI(Resource):
         db.session.commit()
         return self._schema.dump(performance), HTTPStatus.NO_CONTENT
 
+    @invalidates(Performance.__tablename__)
     def delete(self, performance_id):
         """Delete a single performance resource."""
         performance = Performance.query.get(performance_id)
@@ -54,108 +68,240 @@ class PerformanceAPI(Resource):
         return {}, HTTPStatus.NO_CONTENT
 
 
-class PerformanceListAPI(Resource):
-    """Class to represent the collection of performance resources."""
+class PerformanceCollectionAPI(Resource):
+    """Base class for collections of performance resources. Every collection
+    can be filtered by date range and title through the query string.
+    """
 
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _query(self, artist_id=None, venue_id=None):
+        """Return a query for the performances that match the request's filters."""
+        start_date, end_date = parse_date_range(request.args)
+        return filter_performances(
+            artist_id=artist_id,
+            venue_id=venue_id,
+            start_date=start_date,
+            end_date=end_date,
+            title=request.args.get("title")
+        )
+
+    def _version(self, artist_id=None, venue_id=None):
+        """Return the version of the performances that match the request's filters."""
+        return collection_version(self._query(artist_id=artist_id, venue_id=venue_id))
+
+    def _paginate(self, artist_id=None, venue_id=None):
+        """Return a page of the performances that match the request's filters."""
+        return paginate(
+            Performance.__tablename__,
+            self._query(artist_id=artist_id, venue_id=venue_id),
+            self._schema,
+            keys=(Performance.start_datetime, Performance.id)
+        )
+
+
+class PerformanceListAPI(PerformanceCollectionAPI):
+    """Class to represent the collection of performance resources."""
+
+    def _version(self):
+        """Return the version of the performances that match the request's filters."""
+        return super()._version(
+            artist_id=request.args.get("artist_id", type=int),
+            venue_id=request.args.get("venue_id", type=int)
+        )
+
+    @conditional(weak=True)
+    @cached(Performance.__tablename__)
     def get(self):
-        """Return the collection of performance resources."""
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        # only provided with either start date or end date
-        if (
-            start_date is not None
-            and end_date is None
-            or start_date is None
-            and end_date is not None
-        ):
-            return (
-                {"message": "Please provide both a start and an end date."},
-                HTTPStatus.BAD_REQUEST,
-            )
-        # Both start and end dates provided
-        if start_date is not None and end_date is not None:
-            start_date = string_to_date(start_date, "%m/%d/%Y")
-            end_date = string_to_date(end_date, "%m/%d/%Y")
-            if start_date is None:
-                return {
-                    "message": {"start_date": "Incorrectly formatted date."}
-                }, HTTPStatus.BAD_REQUEST
-            elif end_date is None:
-                return {
-                    "message": {"end_date": "Incorrectly formatted date."}
-                }, HTTPStatus.BAD_REQUEST
-            # filter query by start and end date
-            query = Performance.query.filter(
-                func.Date(Performance.start_datetime) >= start_date,
-                func.Date(Performance.start_datetime) <= end_date
-            )
-        else:  # no query string parameters
-            query = Performance.query
-        return paginate(Performance.__tablename__, query, self._schema), HTTPStatus.OK
-        
+        """Return the collection of performance resources. The collection
+        can also be filtered by artist and venue.
+        """
+        return self._paginate(
+            artist_id=request.args.get("artist_id", type=int),
+            venue_id=request.args.get("venue_id", type=int)
+        ), HTTPStatus.OK
 
+    @invalidates(Performance.__tablename__)
     def post(self):
-        """Create a new performance resource."""
+        """Create a new performance resource. If the venue already hosts the
+        artist at the same time, that performance is updated instead, and
+        nothing is written if its content is unchanged.
+        """
         json_data = request.get_json()
         try:
             performance = self._schema.load(json_data)
         except ValidationError as err:
             return {"message": err.messages}, HTTPStatus.BAD_REQUEST
-        db.session.add(performance)
-        db.session.commit()
-        return self._schema.dump(performance), HTTPStatus.CREATED
+        existing_performance = Performance.query.filter_by(
+            venue_id=performance.venue_id,
+            artist_id=performance.artist_id,
+            start_datetime=performance.start_datetime
+        ).first()
+        if existing_performance is None:
+            db.session.add(performance)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                return {"message": "Performance already exists."}, HTTPStatus.CONFLICT
+            return self._schema.dump(performance), HTTPStatus.CREATED
+        values = {field: getattr(performance, field) for field in CONTENT_FIELDS}
+        if existing_performance.content_hash != content_hash(values):
+            for field, value in values.items():
+                setattr(existing_performance, field, value)
+            db.session.commit()
+        return self._schema.dump(existing_performance), HTTPStatus.OK
 
 
-# Todo: Figure out how to refactor this because this is essentially duplicate code
-class ArtistPerformanceListAPI(Resource):
-    """Class to represent the collection of performance resources by 
-    a specific artist.
+class PerformanceBulkAPI(Resource):
+    """Class to represent a batch of performance resources that are
+    sent along with their venues and artists.
     """
 
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    @invalidates(Performance.__tablename__, Artist.__tablename__, Venue.__tablename__)
+    def post(self):
+        """Create a batch of performance resources, along with the venues
+        and artists that do not exist yet, in a single transaction.
+        Every performance is reported as created, updated or unchanged.
+        """
+        json_data = request.get_json()
+        if not isinstance(json_data, list):
+            return {"message": "Expected a list of performances."}, HTTPStatus.BAD_REQUEST
+        max_performances = current_app.config["MAX_BULK_PERFORMANCES"]
+        if len(json_data) > max_performances:
+            return (
+                {"message": f"No more than {max_performances} performances can be sent at once."},
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            )
+        try:
+            items = self._schema.load(json_data, many=True)
+        except ValidationError as err:
+            return {"message": err.messages}, HTTPStatus.BAD_REQUEST
+        venue_ids, _ = upsert_rows(
+            Venue,
+            [
+                {
+                    "name": item["venue"].name,
+                    "street_address": item["venue"].street_address,
+                    "city": item["venue"].city,
+                    "state": item["venue"].state,
+                    "zip_code": item["venue"].zip_code
+                }
+                for item in items
+            ],
+            keys=("street_address",)
+        )
+        artist_ids, _ = upsert_rows(
+            Artist,
+            [
+                {
+                    "name": item["artist"].name,
+                    "bio": item["artist"].bio,
+                    "website": item["artist"].website
+                }
+                for item in items
+            ],
+            keys=("name",)
+        )
+        rows = [
+            {
+                "title": item["title"],
+                "description": item.get("description"),
+                "url": item["url"],
+                "start_datetime": item["start_datetime"],
+                "end_datetime": item["end_datetime"],
+                "venue_id": venue_ids[(item["venue"].street_address,)],
+                "artist_id": artist_ids[(item["artist"].name,)]
+            }
+            for item in items
+        ]
+        for row in rows:
+            row["content_hash"] = content_hash(row)
+        keys = ("venue_id", "artist_id", "start_datetime")
+        performance_ids, created = upsert_rows(Performance, rows, keys=keys)
+        natural_keys = [tuple(row[key] for key in keys) for row in rows]
+        statuses = self._classify(rows, natural_keys, performance_ids, created)
+        written_rows = [
+            row for row, natural_key in zip(rows, natural_keys) if statuses[natural_key] != "unchanged"
+        ]
+        touch(db.session, Artist, [row["artist_id"] for row in written_rows])
+        touch(db.session, Venue, [row["venue_id"] for row in written_rows])
+        db.session.commit()
+        results = []
+        for row, natural_key in zip(rows, natural_keys):
+            results.append({
+                "id": performance_ids[natural_key],
+                "status": statuses[natural_key],
+                "artist_id": row["artist_id"],
+                "venue_id": row["venue_id"]
+            })
+        return {"performances": results}, HTTPStatus.OK
+
+    def _classify(self, rows, natural_keys, performance_ids, created):
+        """Return a dictionary mapping the natural key of every row to whether
+        its performance was created, updated or unchanged. Performances whose
+        content hash differs from the row's are updated, the others are
+        not written at all.
+        """
+        statuses = {natural_key: "created" for natural_key in created}
+        existing_ids = {
+            performance_ids[natural_key]
+            for natural_key in natural_keys if natural_key not in created
+        }
+        stored_hashes = dict(
+            db.session.query(Performance.id, Performance.content_hash)
+            .filter(Performance.id.in_(existing_ids))
+        ) if existing_ids else {}
+        updates = {}
+        for row, natural_key in zip(rows, natural_keys):
+            if natural_key in created:
+                continue
+            performance_id = performance_ids[natural_key]
+            if stored_hashes[performance_id] == row["content_hash"]:
+                statuses.setdefault(natural_key, "unchanged")
+                continue
+            statuses[natural_key] = "updated"
+            updates[performance_id] = dict(
+                {field: row[field] for field in (*CONTENT_FIELDS, "content_hash")},
+                id=performance_id,
+                updated_at=datetime.utcnow()
+            )
+        if updates:
+            db.session.bulk_update_mappings(Performance, list(updates.values()))
+        return statuses
+
+
+class ArtistPerformanceListAPI(PerformanceCollectionAPI):
+    """Class to represent the collection of performance resources by 
+    a specific artist.
+    """
+
+    @conditional(weak=True)
+    @cached(Performance.__tablename__, Artist.__tablename__)
     def get(self, artist_id):
         """Return the collection of performance resources
         for a specific artist.
         """
-        artist = Artist.query.get(artist_id)
-        if artist is None:
+        if Artist.query.get(artist_id) is None:
             return {"message": "Artist could not be found."}, HTTPStatus.NOT_FOUND
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        # only provided with either start date or end date
-        if (
-            start_date is not None
-            and end_date is None
-            or start_date is None
-            and end_date is not None
-        ):
-            return (
-                {"message": "Please provide both a start and an end date."},
-                HTTPStatus.BAD_REQUEST,
-            )
-        # Both start and end dates provided
-        if start_date is not None and end_date is not None:
-            start_date = string_to_date(start_date, "%m/%d/%Y")
-            end_date = string_to_date(end_date, "%m/%d/%Y")
-            if start_date is None:
-                return {
-                    "message": {"start_date": "Incorrectly formatted date."}
-                }, HTTPStatus.BAD_REQUEST
-            elif end_date is None:
-                return {
-                    "message": {"end_date": "Incorrectly formatted date."}
-                }, HTTPStatus.BAD_REQUEST
-            # filter query by start and end date
-            query = Performance.query.filter(
-                func.Date(Performance.start_datetime) >= start_date,
-                func.Date(Performance.start_datetime) <= end_date
-            )
-        else:  # no query string parameters
-            query = Performance.query
-        return paginate(Performance.__tablename__, query, self._schema), HTTPStatus.OK
+        return self._paginate(artist_id=artist_id), HTTPStatus.OK
 
+
+class VenuePerformanceListAPI(PerformanceCollectionAPI):
+    """Class to represent the collection of performance resources at
+    a specific venue.
+    """
+
+    @conditional(weak=True)
+    @cached(Performance.__tablename__, Venue.__tablename__)
+    def get(self, venue_id):
+        """Return the collection of performance resources
+        for a specific venue.
+        """
+        if Venue.query.get(venue_id) is None:
+            return {"message": "Venue could not be found."}, HTTPStatus.NOT_FOUND
+        return self._paginate(venue_id=venue_id), HTTPStatus.OK
@@ -2,13 +2,17 @@
 
 
 import re
+from functools import partial
 from flask import request
 from flask_restful import Resource
 from marshmallow import ValidationError
-from app.models import Venue
+from app.models import Venue, Performance
 from app.extensions import db
 from http import HTTPStatus
 from app.project_helpers import paginate
+from app.api.queries import preload_performance_ids
+from app.cache import cached, invalidates
+from app.conditional import conditional, row_version, collection_version
 
 
 class VenueAPI(Resource):
@@ -17,6 +21,12 @@ class VenueAPI(Resource):
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _version(self, venue_id):
+        """Return the version of a single venue resource."""
+        return row_version(Venue, Venue.id == venue_id)
+
+    @conditional()
+    @cached(Venue.__tablename__, Performance.__tablename__)
     def get(self, venue_id):
         """Return a single venue resource."""
         venue = Venue.query.get(venue_id)
@@ -24,6 +34,7 @@ class VenueAPI(Resource):
             return {"message": "Venue could not be found."}, HTTPStatus.NOT_FOUND
         return self._schema.dump(venue), HTTPStatus.OK
 
+    @invalidates(Venue.__tablename__)
     def put(self, venue_id):
         """Update a single venue resource."""
         json_data = request.get_json()
@@ -42,6 +53,7 @@ class VenueAPI(Resource):
         db.session.commit()
         return self._schema.dump(venue), HTTPStatus.NO_CONTENT
 
+    @invalidates(Venue.__tablename__, Performance.__tablename__)
     def delete(self, venue_id):
         """Delete a single venue resource."""
         venue = Venue.query.get(venue_id)
@@ -60,6 +72,12 @@ class VenueByNameAPI(Resource):
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _version(self, name):
+        """Return the version of a single venue resource identified by its name."""
+        return row_version(Venue, Venue.name == name)
+
+    @conditional()
+    @cached(Venue.__tablename__, Performance.__tablename__)
     def get(self, name):
         """Return a single venue resource identified by its name."""
         venue = Venue.query.filter_by(name=name).first()
@@ -74,11 +92,24 @@ class VenueListAPI(Resource):
     def __init__(self, **kwargs):
         self._schema = kwargs["schema"]
 
+    def _version(self):
+        """Return the version of the collection of venue resources."""
+        return collection_version(Venue.query)
+
+    @conditional(weak=True)
+    @cached(Venue.__tablename__, Performance.__tablename__)
     def get(self):
         """Return all venue resources."""
         query = Venue.query
-        return paginate(Venue.__tablename__, query, self._schema), HTTPStatus.OK
+        return paginate(
+            Venue.__tablename__,
+            query,
+            self._schema,
+            keys=(Venue.name, Venue.id),
+            preload=partial(preload_performance_ids, column=Performance.venue_id)
+        ), HTTPStatus.OK
 
+    @invalidates(Venue.__tablename__)
     def post(self):
         """Create a new venue resource."""
         json_data = request.get_json()
@@ -3,6 +3,6 @@
 
 from app.api.schemas.artist import ArtistSchema
 from app.api.schemas.image import ImageSchema
-from app.api.schemas.performance import PerformanceSchema
+from app.api.schemas.performance import PerformanceSchema, PerformanceBulkSchema
 from app.api.schemas.user import UserSchema
 from app.api.schemas.venue import VenueSchema
@@ -1,9 +1,10 @@
 """This module contains the artist schema."""
 
 
-from flask import request
+from flask import request, url_for
 from app.extensions import ma
 from app.models import Artist
+from app.api.queries import performance_ids
 from marshmallow import post_load, ValidationError, validate, validates_schema
 
 
@@ -17,13 +18,20 @@ class ArtistSchema(ma.SQLAlchemySchema):
     name = ma.auto_field(required=True, validate=validate.Length(min=1, max=64))
     bio = ma.auto_field()
     website = ma.Url()
-    performances = ma.List(ma.HyperlinkRelated("api.performance", url_key="performance_id"))
+    performances = ma.Method("get_performances", dump_only=True)
     image = ma.HyperlinkRelated("api.images", url_key="artist_id")
 
     _links = ma.Hyperlinks({
         "uri": ma.URLFor("api.artist", artist_id="<id>"), "collection": ma.URLFor("api.artists")
     })
 
+    def get_performances(self, artist):
+        """Return the links to the artist's performances."""
+        return [
+            url_for("api.performance", performance_id=performance_id)
+            for performance_id in performance_ids(artist)
+        ]
+
     @validates_schema
     def validate_on_put_request(self, data, **kwargs):
         """Raise a ValidationError if certain fields are not sent
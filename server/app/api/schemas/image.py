@@ -1,6 +1,8 @@
 """This module contains the image schema."""
 
 
+import os
+from flask import url_for
 from app.extensions import ma
 from app.models import Image
 from marshmallow import post_load, ValidationError, validate
@@ -13,8 +15,23 @@ class ImageSchema(ma.SQLAlchemySchema):
         model = Image
 
     path = ma.auto_field(required=True, validate=validate.Length(min=1, max=256))
+    url = ma.Method("get_url", dump_only=True)
+    derivatives = ma.Method("get_derivatives", dump_only=True)
     artist = ma.HyperlinkRelated("api.artist", url_key="artist_id")
 
+    def get_url(self, image):
+        """Return the url of the image's stored file."""
+        return file_url(image.path)
+
+    def get_derivatives(self, image):
+        """Return the resized copies of the image along with their urls."""
+        if image.derivatives is None:
+            return None
+        return [
+            dict(derivative, url=file_url(derivative["path"]))
+            for derivative in image.derivatives
+        ]
+
     @post_load
     def make_object(self, data, **kwargs):
         """Return an image object from the validated data."""
@@ -22,3 +39,7 @@ class ImageSchema(ma.SQLAlchemySchema):
             raise ValidationError("No data was provided")
         return Image(**data)
 
+
+def file_url(path):
+    """Return the url of the stored image file at the given path."""
+    return url_for("api.image_file", filename=os.path.basename(path))
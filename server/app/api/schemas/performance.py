@@ -4,6 +4,8 @@
 from datetime import date
 from app.extensions import ma
 from app.models import Performance
+from app.api.schemas.artist import ArtistSchema
+from app.api.schemas.venue import VenueSchema
 from marshmallow import post_load, ValidationError, validate, validates_schema, validates
 
 
@@ -21,8 +23,9 @@ class PerformanceSchema(ma.SQLAlchemySchema):
     end_datetime = ma.auto_field(required=True, format="%m/%d/%Y %H:%M")
     artist_id = ma.auto_field(required=True, load_only=True)
     venue_id = ma.auto_field(required=True, load_only=True)
-    artist = ma.HyperlinkRelated("api.artist", url_key="artist_id")
-    venue = ma.HyperlinkRelated("api.venue", url_key="venue_id")
+    # built from the foreign keys so that the related rows are never loaded
+    artist = ma.URLFor("api.artist", artist_id="<artist_id>")
+    venue = ma.URLFor("api.venue", venue_id="<venue_id>")
 
     _links = ma.Hyperlinks(
         {
@@ -50,3 +53,26 @@ class PerformanceSchema(ma.SQLAlchemySchema):
         elif data["start_datetime"].date() == data["end_datetime"].date() \
                 and data["start_datetime"].time() > data["end_datetime"].time():
                 raise ValidationError("Start time must be before end time.")
+
+
+class PerformanceBulkSchema(PerformanceSchema):
+    """Class to deserialize performances sent in bulk, with their
+    venue and artist inline instead of referenced by id.
+    """
+
+    class Meta:
+        model = Performance
+        exclude = ("artist_id", "venue_id")
+
+    venue = ma.Nested(
+        VenueSchema(only=("name", "street_address", "city", "state", "zip_code")),
+        required=True
+    )
+    artist = ma.Nested(ArtistSchema(only=("name", "bio", "website")), required=True)
+
+    @post_load
+    def make_object(self, data, **kwargs):
+        """Return the validated data, which is written with set-based
+        statements instead of as performance objects.
+        """
+        return data
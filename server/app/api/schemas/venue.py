@@ -1,8 +1,10 @@
 """This module contains the venue schema."""
 
 
+from flask import url_for
 from app.extensions import ma
 from app.models import Venue
+from app.api.queries import performance_ids
 from marshmallow import post_load, ValidationError, validate
 
 
@@ -25,12 +27,19 @@ class VenueSchema(ma.SQLAlchemySchema):
     city = ma.auto_field(required=True, validate=validate.Length(min=1, max=64))
     state = ma.auto_field(required=True, validate=[validate.Length(equal=2), validate.OneOf(STATES)])
     zip_code = ma.auto_field(required=True, validate=validate.Length(min=5, max=10))
-    performances = ma.List(ma.HyperlinkRelated("api.performance", url_key="performance_id"))
+    performances = ma.Method("get_performances", dump_only=True)
 
     _links = ma.Hyperlinks({
         "uri": ma.URLFor("api.venue", venue_id="<id>"), "collection": ma.URLFor("api.venues")
     })
 
+    def get_performances(self, venue):
+        """Return the links to the performances at the venue."""
+        return [
+            url_for("api.performance", performance_id=performance_id)
+            for performance_id in performance_ids(venue)
+        ]
+
     @post_load
     def make_object(self, data, **kwargs):
         """Return a venue object from the validated data."""
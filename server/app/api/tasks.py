@@ -0,0 +1,57 @@
+"""This module contains Celery tasks for work that is kept off the
+request path of the API.
+"""
+
+
+import os
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+from app.celery_app import celery_app
+from app.extensions import db
+from app.models import Image, Artist
+from app.api.image_store import create_derivatives, sweep_orphaned_files
+from app.cache import bump_generations
+
+
+_app = None
+
+
+@contextmanager
+def app_context():
+    """Context manager that makes sure an application context is pushed,
+    creating the application in workers that were not started from wsgi.py.
+    """
+    global _app
+    if has_app_context():
+        yield
+        return
+    if _app is None:
+        from app import create_app
+        _app = create_app(os.environ.get("FLASK_CONFIG") or "default")
+    with _app.app_context():
+        yield
+
+
+@celery_app.task
+def generate_image_derivatives(content_hash):
+    """Write the resized copies of the stored image with the given hash
+    and record them on every image that uses it.
+    """
+    with app_context():
+        images = Image.query.filter_by(content_hash=content_hash).all()
+        if not images:
+            return []
+        derivatives = create_derivatives(images[0].path)
+        for image in images:
+            image.derivatives = derivatives
+        db.session.commit()
+        if current_app.config["RESPONSE_CACHE_ENABLED"]:
+            bump_generations((Image.__tablename__, Artist.__tablename__))
+        return derivatives
+
+
+@celery_app.task
+def sweep_orphaned_images():
+    """Delete the stored image files that no image references any more."""
+    with app_context():
+        return sweep_orphaned_files(current_app.config["IMAGE_SWEEP_GRACE_PERIOD"])
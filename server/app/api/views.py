@@ -13,31 +13,46 @@ from app.api.resources import (
     VenueByNameAPI,
     VenueListAPI,
     ArtistImageListAPI,
+    ImageFileAPI,
     PerformanceAPI,
     PerformanceListAPI,
+    PerformanceBulkAPI,
     ArtistPerformanceListAPI,
+    VenuePerformanceListAPI,
     UserAPI,
     UserListAPI,
     CrawlTaskAPI,
     CrawlTaskStatusAPI,
-    CrawlGroupAPI
+    CrawlTaskStatusStreamAPI,
+    CrawlGroupAPI,
+    CrawlGroupStatusAPI,
+    CacheStatsAPI
 )
 from app.api.schemas import (
     ArtistSchema,
     VenueSchema,
     ImageSchema,
     PerformanceSchema,
+    PerformanceBulkSchema,
     UserSchema
 )
+from app.representations import output_json
 
 #Instantiate Blueprint and Api objects
 api_blueprint = Blueprint("api", __name__, url_prefix="/api/v1")
 api = Api(api_blueprint)
+api.representation("application/json")(output_json)
+
+#endpoints that are reachable without an access token. Image files are
+#embedded in newsletter emails, and their names are unguessable hashes
+PUBLIC_ENDPOINTS = {"api.image_file"}
 
 
 @api_blueprint.before_request
 def before_request():
     """Before request hook for the api."""
+    if request.endpoint in PUBLIC_ENDPOINTS:
+        return None
     try:
         verify_jwt_in_request()
     except:
@@ -72,6 +87,11 @@ api.add_resource(
     resource_class_kwargs={"schema": ImageSchema()},
     endpoint="images"
 )
+api.add_resource(
+    ImageFileAPI,
+    "/images/<filename>",
+    endpoint="image_file"
+)
 
 #performance resources
 api.add_resource(
@@ -80,6 +100,12 @@ api.add_resource(
     resource_class_kwargs={"schema": PerformanceSchema()},
     endpoint="performances"
 )
+api.add_resource(
+    PerformanceBulkAPI,
+    "/performances/bulk",
+    resource_class_kwargs={"schema": PerformanceBulkSchema()},
+    endpoint="performances_bulk"
+)
 api.add_resource(
     PerformanceAPI,
     "/performances/<int:performance_id>",
@@ -92,6 +118,12 @@ api.add_resource(
     resource_class_kwargs={"schema": PerformanceSchema()},
     endpoint="artist_performances"
 )
+api.add_resource(
+    VenuePerformanceListAPI,
+    "/venues/<int:venue_id>/performances",
+    resource_class_kwargs={"schema": PerformanceSchema()},
+    endpoint="venue_performances"
+)
 
 
 #user resources
@@ -141,9 +173,26 @@ api.add_resource(
     "/crawl_status/<task_id>",
     endpoint="crawl_status"
 )
+api.add_resource(
+    CrawlTaskStatusStreamAPI,
+    "/crawl_status/<task_id>/stream",
+    endpoint="crawl_status_stream"
+)
 api.add_resource(
     CrawlGroupAPI,
     "/group_crawl",
     endpoint="group_crawl"
 )
+api.add_resource(
+    CrawlGroupStatusAPI,
+    "/group_crawl/<group_id>",
+    endpoint="group_crawl_status"
+)
+
 
+#response cache
+api.add_resource(
+    CacheStatsAPI,
+    "/cache_stats",
+    endpoint="cache_stats"
+)
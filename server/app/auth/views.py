@@ -8,10 +8,12 @@ from flask import Blueprint
 from flask_restful import Api
 from app.auth.resources import LoginAPI, RegisterAPI, LogoutAPI
 from app.api.schemas import UserSchema
+from app.representations import output_json
 
 
 auth_blueprint = Blueprint("auth", __name__, url_prefix="/auth")
 api = Api(auth_blueprint)
+api.representation("application/json")(output_json)
 
 
 api.add_resource(LoginAPI, "/login", endpoint="login")
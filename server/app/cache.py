@@ -0,0 +1,142 @@
+"""This module contains a Redis backed cache for the responses of the
+api resources.
+
+Entries are keyed on the endpoint, the view arguments, the query string
+and a generation counter for every table the response is built from.
+Writing to a table bumps its counter, so entries built from the old rows
+are never read again and are left to expire.
+"""
+
+
+import hashlib
+import time
+from functools import wraps
+from http import HTTPStatus
+from flask import current_app, request
+from redis.exceptions import RedisError
+from app.representations import encode_json, json_response
+
+
+KEY_PREFIX = "response_cache"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+
+
+def cached(*tables):
+    """Decorator for the GET method of a resource that caches its
+    successful responses. The tables are the ones the response is built from.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if not current_app.config["RESPONSE_CACHE_ENABLED"]:
+                return method(*args, **kwargs)
+            redis = current_app.redis
+            try:
+                key = cache_key(tables)
+                body = redis.get(key)
+                redis.hincrby(STATS_KEY, f"{request.endpoint}:{'misses' if body is None else 'hits'}")
+            except RedisError as err:
+                current_app.logger.warning("Response cache unavailable: %s", err)
+                return method(*args, **kwargs)
+            if body is not None:
+                return json_response(body, HTTPStatus.OK)
+            result = method(*args, **kwargs)
+            if not isinstance(result, tuple) or result[1] != HTTPStatus.OK:
+                return result
+            body = encode_json(result[0])
+            store(key, body)
+            return json_response(body, HTTPStatus.OK)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Decorator for the POST, PUT and DELETE methods of a resource that
+    bumps the generation of the given tables after a successful write.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            status = result[1] if isinstance(result, tuple) else HTTPStatus.OK
+            if current_app.config["RESPONSE_CACHE_ENABLED"] and status < HTTPStatus.BAD_REQUEST:
+                bump_generations(tables)
+            return result
+        return wrapper
+    return decorator
+
+
+def cache_key(tables):
+    """Return the cache key for the current request, given the tables
+    its response is built from.
+    """
+    generations = current_app.redis.mget(
+        [f"{KEY_PREFIX}:generation:{table}" for table in tables]
+    )
+    parts = [
+        ",".join(f"{table}={int(generation or 0)}" for table, generation in zip(tables, generations)),
+        ",".join(f"{name}={value}" for name, value in sorted(request.view_args.items())),
+        "&".join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True))),
+    ]
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{request.endpoint}:{digest}"
+
+
+def store(key, body):
+    """Store the given response body under the given key. Bodies larger
+    than RESPONSE_CACHE_MAX_ENTRY_SIZE are not stored, and the oldest
+    entries are evicted once there are more than RESPONSE_CACHE_MAX_ENTRIES.
+    """
+    config = current_app.config
+    if len(body) > config["RESPONSE_CACHE_MAX_ENTRY_SIZE"]:
+        return
+    redis = current_app.redis
+    try:
+        pipeline = redis.pipeline()
+        now = time.time()
+        pipeline.set(key, body, ex=config["RESPONSE_CACHE_TTL"])
+        pipeline.zadd(INDEX_KEY, {key: now})
+        # forget entries that have already expired
+        pipeline.zremrangebyscore(INDEX_KEY, 0, now - config["RESPONSE_CACHE_TTL"])
+        pipeline.zcard(INDEX_KEY)
+        entries = pipeline.execute()[-1]
+        overflow = entries - config["RESPONSE_CACHE_MAX_ENTRIES"]
+        if overflow > 0:
+            evicted = redis.zrange(INDEX_KEY, 0, overflow - 1)
+            pipeline.zremrangebyrank(INDEX_KEY, 0, overflow - 1)
+            pipeline.delete(*evicted)
+            pipeline.execute()
+    except RedisError as err:
+        current_app.logger.warning("Response could not be cached: %s", err)
+
+
+def bump_generations(tables):
+    """Increment the generation counter of each of the given tables."""
+    try:
+        pipeline = current_app.redis.pipeline()
+        for table in tables:
+            pipeline.incr(f"{KEY_PREFIX}:generation:{table}")
+        pipeline.execute()
+    except RedisError as err:
+        current_app.logger.warning("Response cache could not be invalidated: %s", err)
+
+
+def cache_stats():
+    """Return the number of cache hits and misses, in total and per endpoint,
+    along with the number of cached entries.
+    """
+    redis = current_app.redis
+    endpoints = {}
+    for field, count in redis.hgetall(STATS_KEY).items():
+        endpoint, outcome = field.decode("utf-8").rsplit(":", 1)
+        endpoints.setdefault(endpoint, {"hits": 0, "misses": 0})[outcome] = int(count)
+    hits = sum(counts["hits"] for counts in endpoints.values())
+    misses = sum(counts["misses"] for counts in endpoints.values())
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else None,
+        "entries": redis.zcard(INDEX_KEY),
+        "endpoints": endpoints
+    }
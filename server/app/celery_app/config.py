@@ -11,18 +11,33 @@ class CeleryConfig:
 
     CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/1")
     CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
+    # status records of crawl tasks, written as the crawls are queued and run
+    CRAWL_STATUS_REDIS_URL = os.environ.get("CRAWL_STATUS_REDIS_URL", "redis://localhost:6379/2")
+    CRAWL_STATUS_TTL = 86400
+    # crawls publish their progress from the reactor thread, so a slow Redis
+    # gives up after this many seconds instead of stalling the crawl
+    CRAWL_STATUS_REDIS_TIMEOUT = 1.0
     CELERY_TIMEZONE = "US/Eastern"
-    CELERY_INCLUDE =  ["app.performance_scraper.performance_scraper.tasks"]
+    CELERY_INCLUDE =  [
+        "app.performance_scraper.performance_scraper.tasks",
+        "app.api.tasks"
+    ]
     CELERYBEAT_SCHEDULE = {
         "crawl-every-sunday-morning": {
             "task": "app.performance_scraper.performance_scraper.tasks.scheduled_crawl",
             "schedule": crontab(hour=16, minute=5, day_of_week=0),
             "args": SPIDERS
+        },
+        "sweep-orphaned-images-every-night": {
+            "task": "app.api.tasks.sweep_orphaned_images",
+            "schedule": crontab(hour=3, minute=30)
         }
     }
     CELERYD_CONCURRENCY = 8
     CELERYD_PREFETCH_MULTIPLIER = 0
-    CELERYD_MAX_TASKS_PER_CHILD = 1
+    # crawls share one long-lived reactor per worker process, so processes are
+    # only recycled now and then to return memory
+    CELERYD_MAX_TASKS_PER_CHILD = 100
     
     
 
@@ -0,0 +1,130 @@
+"""This module contains a status record of each crawl task, kept in Redis
+by the API when a crawl is queued and by the worker as the crawl runs, so
+that the API can report the state of a crawl without waiting for it.
+Every change to a record is also published on the channel of its task.
+"""
+
+
+import json
+from app.celery_app.config import CeleryConfig
+from celery import states
+from redis import Redis
+
+
+KEY_PREFIX = "crawl_status"
+GROUP_KEY_PREFIX = "crawl_group"
+
+_redis = None
+
+
+def get_redis():
+    """Return the Redis client that holds the status records."""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(
+            CeleryConfig.CRAWL_STATUS_REDIS_URL,
+            socket_connect_timeout=CeleryConfig.CRAWL_STATUS_REDIS_TIMEOUT,
+            socket_timeout=CeleryConfig.CRAWL_STATUS_REDIS_TIMEOUT
+        )
+    return _redis
+
+
+def status_key(task_id):
+    """Return the Redis key of the status record of the given task."""
+    return f"{KEY_PREFIX}:{task_id}"
+
+
+def status_channel(task_id):
+    """Return the Redis channel the changes to the status record of the
+    given task are published on.
+    """
+    return f"{KEY_PREFIX}:{task_id}:events"
+
+
+def _update(task_id, event, mapping, data):
+    pipeline = get_redis().pipeline()
+    pipeline.hset(status_key(task_id), mapping=mapping)
+    pipeline.expire(status_key(task_id), CeleryConfig.CRAWL_STATUS_TTL)
+    pipeline.publish(status_channel(task_id), json.dumps({"event": event, "data": data}))
+    pipeline.execute()
+
+
+def record_status(task_id, status, **fields):
+    """Record the status of the given task, along with any other fields.
+    Fields that were recorded before are kept unless they are replaced.
+    """
+    mapping = {"status": status}
+    mapping.update({name: json.dumps(value) for name, value in fields.items()})
+    _update(task_id, "status", mapping, dict(fields, status=status))
+
+
+def publish_progress(task_id, progress):
+    """Record the progress counters of the crawl run by the given task."""
+    _update(task_id, "progress", {"progress": json.dumps(progress)}, progress)
+
+
+def get_status(task_id):
+    """Return the status record of the given task, or None if the task
+    has no record.
+    """
+    record = get_redis().hgetall(status_key(task_id))
+    if not record:
+        return None
+    status = {"status": record.pop(b"status").decode()}
+    status.update({name.decode(): json.loads(value) for name, value in record.items()})
+    return status
+
+
+def group_key(group_id):
+    """Return the Redis key of the summary of the given group crawl."""
+    return f"{GROUP_KEY_PREFIX}:{group_id}"
+
+
+def record_group_summary(group_id, summary):
+    """Record the summary document of the given group crawl."""
+    get_redis().set(group_key(group_id), json.dumps(summary), ex=CeleryConfig.CRAWL_STATUS_TTL)
+
+
+def get_group_summary(group_id):
+    """Return the summary document of the given group crawl, or None if
+    the group has no summary.
+    """
+    summary = get_redis().get(group_key(group_id))
+    if summary is None:
+        return None
+    return json.loads(summary)
+
+
+def follow_status(task_id, heartbeat=15.0):
+    """Return a generator of the events published for the given task, as
+    tuples of the event name and its data. The current record is generated
+    first, as a status event followed by a progress event if it has one.
+    None is generated every heartbeat seconds without events, and the
+    generator ends once the task has finished or its record has expired,
+    as it does when the worker running it is lost.
+    """
+    pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+    # subscribe before reading the record, so that no change is missed
+    pubsub.subscribe(status_channel(task_id))
+    try:
+        status = get_status(task_id)
+        if status is not None:
+            progress = status.pop("progress", None)
+            yield "status", status
+            if progress is not None:
+                yield "progress", progress
+            if status["status"] in states.READY_STATES:
+                return
+        while True:
+            message = pubsub.get_message(timeout=heartbeat)
+            if message is None:
+                if not get_redis().exists(status_key(task_id)):
+                    return
+                yield None
+                continue
+            event = json.loads(message["data"])
+            yield event["event"], event["data"]
+            if event["event"] == "status" and event["data"]["status"] in states.READY_STATES:
+                return
+    finally:
+        pubsub.close()
@@ -0,0 +1,87 @@
+"""This module contains support for conditional GET requests to the api
+resources.
+
+A resource opts in by decorating its GET method with conditional and
+implementing a _version method that takes the same arguments. The version
+is a cheap query over the updated_at columns of the rows the response is
+built from, so a client that already holds the current representation gets
+a 304 response without the resource being loaded or serialized.
+"""
+
+
+import hashlib
+from functools import wraps
+from http import HTTPStatus
+from flask import request, Response
+from werkzeug.http import http_date, quote_etag
+from sqlalchemy import func
+from app.extensions import db
+
+
+def conditional(weak=False):
+    """Decorator for the GET method of a resource that answers
+    If-None-Match and If-Modified-Since requests. Single resources get
+    strong ETags and collections, whose pages are not byte-for-byte
+    comparable across servers, get weak ones.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(resource, *args, **kwargs):
+            version = resource._version(*args, **kwargs)
+            if version is None:
+                return method(resource, *args, **kwargs)
+            etag, last_modified = make_etag(version), version[-1]
+            headers = {"ETag": quote_etag(etag, weak)}
+            if last_modified is not None:
+                headers["Last-Modified"] = http_date(last_modified)
+            if not_modified(etag, last_modified):
+                return Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+            result = method(resource, *args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == HTTPStatus.OK:
+                    result.headers.extend(headers)
+                return result
+            if result[1] != HTTPStatus.OK:
+                return result
+            return result[0], result[1], headers
+        return wrapper
+    return decorator
+
+
+def not_modified(etag, last_modified):
+    """Return True if the client's copy of the resource is current.
+    If-Modified-Since is only checked if If-None-Match is not sent.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def make_etag(version):
+    """Return an opaque entity tag for the given version of the
+    current endpoint's resource.
+    """
+    return hashlib.sha1(repr((request.endpoint, *version)).encode()).hexdigest()
+
+
+def row_version(model, *criteria):
+    """Return the id and updated_at of the row that matches the given
+    criteria, or None if there is no such row.
+    """
+    return db.session.query(model.id, model.updated_at).filter(*criteria).first()
+
+
+def collection_version(query):
+    """Return the number of rows in the given query and the latest
+    updated_at among them. The count changes when rows are deleted.
+    Collections have no Last-Modified date, since deleting a row that is
+    not the newest would leave it unchanged, so only If-None-Match is
+    answered for them.
+    """
+    model = query.column_descriptions[0]["entity"]
+    count, latest = query.order_by(None).with_entities(
+        func.count(), func.max(model.updated_at)
+    ).one()
+    return count, latest, None
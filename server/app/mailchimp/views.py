@@ -19,10 +19,12 @@ from app.mailchimp.resources import (
     SubscriberAPI
 )
 from app.mailchimp.schemas import CampaignSchema
+from app.representations import output_json
 
 
 mailchimp_blueprint = Blueprint("mailchimp", __name__, url_prefix="/api/v1/mailchimp")
 api = Api(mailchimp_blueprint)
+api.representation("application/json")(output_json)
 
 
 @mailchimp_blueprint.before_request
@@ -0,0 +1,34 @@
+"""This module contains WSGI middleware for the application."""
+
+
+import zlib
+from io import BytesIO
+from http import HTTPStatus
+from werkzeug.wrappers import Response
+
+
+class GzipRequestMiddleware:
+    """WSGI middleware that decompresses request bodies sent with
+    'Content-Encoding: gzip'. Bodies that decompress to more than
+    max_size bytes are rejected.
+    """
+
+    def __init__(self, wsgi_app, max_size):
+        self.wsgi_app = wsgi_app
+        self.max_size = max_size
+
+    def __call__(self, environ, start_response):
+        if environ.get("HTTP_CONTENT_ENCODING", "").lower() != "gzip":
+            return self.wsgi_app(environ, start_response)
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decompressor.decompress(environ["wsgi.input"].read(length), self.max_size + 1)
+        except zlib.error:
+            return Response(status=HTTPStatus.BAD_REQUEST)(environ, start_response)
+        if len(body) > self.max_size:
+            return Response(status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)(environ, start_response)
+        environ["wsgi.input"] = BytesIO(body)
+        environ["CONTENT_LENGTH"] = str(len(body))
+        del environ["HTTP_CONTENT_ENCODING"]
+        return self.wsgi_app(environ, start_response)
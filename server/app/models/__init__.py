@@ -8,3 +8,4 @@ from app.models.performance import Performance
 from app.models.campaign import Campaign
 
 
+from app.models import events
@@ -1,6 +1,7 @@
 """This module contains the artist model."""
 
 
+from datetime import datetime
 from app.extensions import db
 
 
@@ -12,6 +13,9 @@ class Artist(db.Model):
     name = db.Column(db.String(64), unique=True, index=True, nullable=False)
     bio = db.Column(db.Text(), nullable=True)
     website = db.Column(db.Text(), nullable=True)
+    updated_at = db.Column(
+        db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
     performances = db.relationship(
         "Performance", 
         backref="artist", 
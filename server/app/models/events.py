@@ -0,0 +1,56 @@
+"""This module contains SQLAlchemy event listeners that keep the
+updated_at column of artists and venues current when the performances
+and images that appear in their representations change, and keep the
+content hash of performances current.
+"""
+
+
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from app.models.artist import Artist
+from app.models.venue import Venue
+from app.models.image import Image
+from app.models.performance import Performance, CONTENT_FIELDS, content_hash
+
+
+@event.listens_for(Session, "after_flush")
+def touch_related_rows(session, flush_context):
+    """Set updated_at on the artists and venues whose performances or
+    images were created, changed or deleted during the flush.
+    """
+    artist_ids = set()
+    venue_ids = set()
+    for instance in session.new | session.dirty | session.deleted:
+        if isinstance(instance, Performance):
+            artist_ids.update(foreign_key_values(instance, "artist_id"))
+            venue_ids.update(foreign_key_values(instance, "venue_id"))
+        elif isinstance(instance, Image):
+            artist_ids.update(foreign_key_values(instance, "artist_id"))
+    touch(session, Artist, artist_ids)
+    touch(session, Venue, venue_ids)
+
+
+@event.listens_for(Performance, "before_insert")
+@event.listens_for(Performance, "before_update")
+def hash_performance_content(mapper, connection, performance):
+    """Set the content hash of a performance before it is written."""
+    performance.content_hash = content_hash(
+        {field: getattr(performance, field) for field in CONTENT_FIELDS}
+    )
+
+
+def touch(session, model, ids):
+    """Set updated_at on the rows of the given model with the given ids."""
+    ids = set(ids) - {None}
+    if ids:
+        session.execute(
+            model.__table__.update().where(model.id.in_(ids)).values(updated_at=datetime.utcnow())
+        )
+
+
+def foreign_key_values(instance, attribute):
+    """Return the current and previous values of the given foreign key."""
+    history = get_history(instance, attribute)
+    return set(history.added) | set(history.unchanged) | set(history.deleted)
@@ -1,6 +1,7 @@
 """This module contains the image model."""
 
 
+from datetime import datetime
 from app.extensions import db
 
 
@@ -9,10 +10,17 @@ class Image(db.Model):
 
     __tablename__ = "images"
     id = db.Column(db.Integer, primary_key=True)
-    path = db.Column(db.Text(), unique=True, index=True, nullable=False)
+    # images of artists that share the same bytes share the stored file
+    path = db.Column(db.Text(), index=True, nullable=False)
+    content_hash = db.Column(db.String(64), index=True, nullable=True)
+    # resized copies of the stored file, written by a Celery task after upload
+    derivatives = db.Column(db.JSON(none_as_null=True), nullable=True)
     original_filename = db.Column(db.Text(), index=True, nullable=False)
     version = db.Column(db.Integer, default=1, nullable=False)
     artist_id = db.Column(db.Integer, db.ForeignKey("artists.id"), nullable=False)
+    updated_at = db.Column(
+        db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     def __str__(self):
         """Return a string representation of the model."""
@@ -1,13 +1,38 @@
 """This module contains the performance model."""
 
 
+import hashlib
+import json
+from datetime import datetime
 from app.extensions import db
 
 
+# the fields that can change between crawls of the same performance
+CONTENT_FIELDS = ("title", "description", "url", "end_datetime")
+
+
+def content_hash(values):
+    """Return the SHA-256 hex digest of the content fields in the given mapping."""
+    document = json.dumps([values.get(field) for field in CONTENT_FIELDS], default=str)
+    return hashlib.sha256(document.encode("utf-8")).hexdigest()
+
+
 class Performance(db.Model):
     """Class to represent a performance."""
 
     __tablename__ = "performances"
+    __table_args__ = (
+        db.Index("ix_performances_start_datetime_id", "start_datetime", "id"),
+        db.Index("ix_performances_artist_id_start_datetime", "artist_id", "start_datetime"),
+        db.Index("ix_performances_venue_id_start_datetime", "venue_id", "start_datetime"),
+        # a venue hosts an artist once at a given time
+        db.UniqueConstraint(
+            "venue_id",
+            "artist_id",
+            "start_datetime",
+            name="uq_performances_venue_id_artist_id_start_datetime"
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128), nullable=False)
     description = db.Column(db.Text(), nullable=True)
@@ -16,6 +41,10 @@ class Performance(db.Model):
     end_datetime = db.Column(db.DateTime, nullable=False)
     artist_id = db.Column(db.Integer, db.ForeignKey("artists.id"), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey("venues.id"), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True)
+    updated_at = db.Column(
+        db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
 
     def __str__(self):
         """Return a string representation of the model."""
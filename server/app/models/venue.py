@@ -1,6 +1,7 @@
 """This module contains the SQLAlchemy model for a venue."""
 
 
+from datetime import datetime
 from app.extensions import db
 
 
@@ -14,6 +15,9 @@ class Venue(db.Model):
     city = db.Column(db.String(64), nullable=False)
     state = db.Column(db.String(2), nullable=False)
     zip_code = db.Column(db.String(10), nullable=False)
+    updated_at = db.Column(
+        db.DateTime, index=True, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
     performances = db.relationship(
         "Performance", 
         backref="venue", 
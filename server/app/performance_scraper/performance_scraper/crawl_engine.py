@@ -0,0 +1,121 @@
+"""This module contains the engine that runs Scrapy crawls for the Celery
+tasks.
+
+A Twisted reactor cannot be restarted once it has stopped, so running it
+inside every task meant a fresh worker process had to be forked, and
+Scrapy, its middlewares and the spiders imported again, for every crawl.
+The engine instead runs one reactor in a background thread for the life
+of the worker process, and tasks submit their crawls to it and block
+until they finish.
+"""
+
+
+import threading
+from datetime import datetime
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from twisted.internet import defer, reactor
+from twisted.python.failure import Failure
+
+
+class CrawlEngine:
+    """Class to represent a long-lived reactor thread that crawls are
+    submitted to. The thread is started by the first crawl, so it runs
+    in the worker process the crawl was sent to.
+    """
+
+    def __init__(self, settings):
+        self._settings = settings
+        self._runner = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        """Return True if the reactor thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the reactor thread if it is not running yet."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            configure_logging(self._settings)
+            self._runner = CrawlerRunner(self._settings)
+            self._thread = threading.Thread(
+                target=reactor.run,
+                kwargs={"installSignalHandlers": False},
+                name="crawl-reactor",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the running crawls and the reactor thread."""
+        if not self.running:
+            return
+        def shutdown():
+            stopping = self._runner.stop()
+            stopping.addBoth(lambda _: reactor.stop())
+        reactor.callFromThread(shutdown)
+        self._thread.join(timeout)
+
+    def crawl(self, *spiders, timeout=None, **kwargs):
+        """Run the given spiders at the same time and block until they all
+        finish. Keyword arguments are passed to every spider. Return a
+        dictionary mapping each spider's name to its crawl stats. Raises the
+        error of the first crawl that failed, or TimeoutError if the crawls
+        did not finish within timeout seconds, in which case they are
+        stopped.
+        """
+        self.start()
+        finished = threading.Event()
+        outcome = {}
+
+        def run():
+            crawlers = [self._runner.create_crawler(spider) for spider in spiders]
+            outcome["crawlers"] = crawlers
+            crawls = defer.DeferredList(
+                [self._runner.crawl(crawler, **kwargs) for crawler in crawlers],
+                fireOnOneErrback=True,
+                consumeErrors=True
+            )
+            crawls.addCallback(lambda _: outcome.update(stats={
+                crawler.spidercls.name: serializable_stats(crawler.stats.get_stats())
+                for crawler in crawlers
+            }))
+            crawls.addErrback(lambda failure: outcome.update(failure=failure.value.subFailure))
+            crawls.addBoth(lambda _: finished.set())
+
+        def submit():
+            # errors raised while creating the crawlers are returned to the caller
+            try:
+                run()
+            except Exception:
+                outcome["failure"] = Failure()
+                finished.set()
+
+        reactor.callFromThread(submit)
+        if not finished.wait(timeout):
+            # read in the reactor thread, after submit has created the crawlers
+            reactor.callFromThread(lambda: stop_crawlers(outcome.get("crawlers", ())))
+            raise TimeoutError(f"Crawl of {', '.join(map(str, spiders))} did not finish in time.")
+        if "failure" in outcome:
+            outcome["failure"].raiseException()
+        return outcome["stats"]
+
+
+def stop_crawlers(crawlers):
+    """Stop the given crawlers, so that a crawl that timed out does not keep
+    running in the reactor after its task has given up on it.
+    """
+    for crawler in crawlers:
+        crawler.stop()
+
+
+def serializable_stats(stats):
+    """Return the given crawl stats with their dates in ISO format."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in stats.items()
+    }
@@ -0,0 +1,87 @@
+"""This module contains a cache that maps the names of venues and artists
+to their ids in the Flask API for the length of a crawl.
+"""
+
+
+import logging
+from collections import OrderedDict
+from redis import Redis
+from redis.exceptions import RedisError
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name):
+    """Return the given name with its case and whitespace normalized."""
+    return " ".join(name.split()).casefold()
+
+
+class EntityCache:
+    """Class to represent a bounded LRU cache of API ids, keyed on the kind
+    of entity and its normalized name. An id of None records that the API
+    has no such entity. If a Redis client is given, ids are also shared
+    with other crawler processes for ttl seconds. Missing entities are
+    only cached locally, since another process may create them.
+    """
+
+    key_prefix = "entity_cache"
+
+    def __init__(self, max_size=1024, redis=None, ttl=86400):
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._redis = redis
+        self._ttl = ttl
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Return a new EntityCache configured from the given Scrapy settings."""
+        redis_url = settings.get("ENTITY_CACHE_REDIS_URL")
+        return cls(
+            max_size=settings.getint("ENTITY_CACHE_SIZE"),
+            redis=Redis.from_url(redis_url) if redis_url else None,
+            ttl=settings.getint("ENTITY_CACHE_TTL")
+        )
+
+    def get(self, kind, name):
+        """Return a tuple of whether the entity is cached and its id."""
+        key = (kind, normalize_name(name))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+        if self._redis is None:
+            return False, None
+        try:
+            entity_id = self._redis.get(self._redis_key(key))
+        except RedisError as err:
+            logger.warning("Entity cache unavailable: %s", err)
+            return False, None
+        if entity_id is None:
+            return False, None
+        self._store(key, int(entity_id))
+        return True, int(entity_id)
+
+    def set(self, kind, name, entity_id):
+        """Cache the id of the entity, or None if the API has no such entity."""
+        key = (kind, normalize_name(name))
+        self._store(key, entity_id)
+        if self._redis is None or entity_id is None:
+            return
+        try:
+            self._redis.set(self._redis_key(key), entity_id, ex=self._ttl)
+        except RedisError as err:
+            logger.warning("Entity cache unavailable: %s", err)
+
+    def _store(self, key, entity_id):
+        """Store an entry locally, evicting the least recently used one
+        if the cache is full.
+        """
+        self._entries[key] = entity_id
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def _redis_key(self, key):
+        """Return the Redis key for the given entry."""
+        kind, name = key
+        return f"{self.key_prefix}:{kind}:{name}"
@@ -0,0 +1,89 @@
+"""This module contains a Scrapy extension that publishes the progress of
+crawls run by Celery tasks, so that clients can follow a crawl without
+polling its status.
+"""
+
+
+import logging
+import time
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+from redis.exceptions import RedisError
+from app.celery_app.task_status import publish_progress
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlProgress(object):
+    """Class to represent the progress counters of a crawl. They are
+    published every CRAWL_PROGRESS_INTERVAL seconds while they change, and
+    once more when the spider closes. Only spiders started by a Celery task,
+    which sets their task_id, are followed.
+    """
+
+    def __init__(self, stats, interval):
+        self._stats = stats
+        self._interval = interval
+        self._task_id = None
+        self._started = None
+        self._last_published = None
+        self._loop = None
+        self.counters = {"items_scraped": 0, "items_dropped": 0}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        interval = crawler.settings.getfloat("CRAWL_PROGRESS_INTERVAL")
+        if not interval:
+            raise NotConfigured
+        extension = cls(crawler.stats, interval)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(extension.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_opened(self, spider):
+        self._task_id = getattr(spider, "task_id", None)
+        if self._task_id is None:
+            return
+        self._started = time.monotonic()
+        self._loop = task.LoopingCall(self.publish, spider)
+        self._loop.start(self._interval)
+
+    def item_scraped(self, item, spider):
+        self.counters["items_scraped"] += 1
+
+    def item_dropped(self, item, spider):
+        self.counters["items_dropped"] += 1
+
+    def spider_closed(self, spider, reason):
+        if self._task_id is None:
+            return
+        if self._loop.running:
+            self._loop.stop()
+        self.publish(spider, finish_reason=reason)
+
+    def progress(self, spider):
+        """Return the current counters of the crawl."""
+        return dict(
+            self.counters,
+            items_stored=self._stats.get_value("api_batch/items_sent", 0, spider=spider),
+            errors=self._stats.get_value("log_count/ERROR", 0, spider=spider),
+            elapsed_seconds=round(time.monotonic() - self._started, 1)
+        )
+
+    def publish(self, spider, **fields):
+        """Publish the counters of the crawl if they changed since they were
+        last published, or if there are other fields to publish.
+        """
+        progress = self.progress(spider)
+        counters = {name: value for name, value in progress.items() if name != "elapsed_seconds"}
+        if counters == self._last_published and not fields:
+            return
+        self._last_published = counters
+        try:
+            publish_progress(self._task_id, dict(progress, spider=spider.name, **fields))
+        except RedisError as err:
+            logger.warning("Could not publish the progress of the crawl: %s", err)
@@ -0,0 +1,72 @@
+"""This module contains a persistent store of the fingerprints of the
+performances scraped by a spider, so that performances which have not
+changed since the last crawl are not sent to the Flask API again.
+"""
+
+
+import hashlib
+import json
+from app.performance_scraper.performance_scraper.json_store import JSONFileStore
+
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def item_key(item):
+    """Return the key of a performance item. Several performances can share
+    a url, so the key also includes the start time and the artist.
+    """
+    return "|".join((item["url"], item["start_datetime"], item["artist"]["name"]))
+
+
+def item_fingerprint(item):
+    """Return a hash of every field of a performance item."""
+    document = json.dumps(dict(item), sort_keys=True, default=str)
+    return hashlib.sha1(document.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore(JSONFileStore):
+    """Class to represent the fingerprints of the performances a spider
+    stored in the Flask API, keyed on item_key. Only the performances seen
+    in the current crawl are kept when the store is saved, so past
+    performances are forgotten.
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._seen = set()
+
+    @classmethod
+    def from_spider(cls, spider):
+        """Return the store of the given spider, in the directory named by
+        its INCREMENTAL_CRAWL_DIRECTORY setting.
+        """
+        return super().from_spider(spider, "INCREMENTAL_CRAWL_DIRECTORY")
+
+    def check(self, item):
+        """Return whether the item is new, changed or unchanged since it
+        was last stored.
+        """
+        key = item_key(item)
+        self._seen.add(key)
+        fingerprint = self._data.get(key)
+        if fingerprint is None:
+            return NEW
+        if fingerprint == item_fingerprint(item):
+            return UNCHANGED
+        return CHANGED
+
+    def set(self, item):
+        """Record the fingerprint of an item that was stored."""
+        key = item_key(item)
+        self._seen.add(key)
+        self._set(key, item_fingerprint(item))
+
+    def save(self):
+        """Forget the performances that were not seen, then write the store."""
+        for key in set(self._data) - self._seen:
+            del self._data[key]
+            self._changed = True
+        super().save()
@@ -1,20 +1,30 @@
 """This module contains a class that talks to the Flask API."""
 
 
+import gzip
 import requests
 import json
 from http import HTTPStatus
 from app.performance_scraper.performance_scraper.flask_api.exceptions import FlaskAPIException
+from app.performance_scraper.performance_scraper.flask_api.session import create_session
 
 
 class FlaskAPIClient:
-    """Class to send requests to the Flask API."""
+    """Class to send requests to the Flask API. Connections are kept alive
+    in a pooled session, which is shared with the auth manager if no
+    session is given. Timeouts are a (connect, read) tuple in seconds.
+    """
 
     api_prefix = "http://127.0.0.1:5000/api/v1/"
 
-    def __init__(self, token=None, auth_manager=None):
+    def __init__(self, token=None, auth_manager=None, session=None, timeout=None, gzip_requests=False):
         self._token = token
         self.auth_manager = auth_manager
+        if session is None:
+            session = auth_manager.session if auth_manager is not None else create_session()
+        self._session = session
+        self._timeout = timeout
+        self._gzip_requests = gzip_requests
 
     def create_venue(self, payload):
         """Send a POST request to the API to create a venue resource.
@@ -51,6 +61,13 @@ class FlaskAPIClient:
         """
         return self._internal_call("POST", "performances", payload=payload)
 
+    def create_performances(self, payload):
+        """Send a POST request to the API to create a batch of performance
+        resources, with their venues and artists inline. Returns the id and
+        status of every performance in the batch.
+        """
+        return self._internal_call("POST", "performances/bulk", payload=payload)
+
     def _get_headers(self):
         """Return the headers necessary for making requests
         to the api.
@@ -73,17 +90,21 @@ class FlaskAPIClient:
         json_response = None
         headers = self._get_headers()
         if payload is not None:
-            if payload.get("artist_image") is not None:
+            if isinstance(payload, dict) and payload.get("artist_image") is not None:
                 headers.pop("Content-Type")
                 data = {"files": payload}
+            elif self._gzip_requests:
+                headers["Content-Encoding"] = "gzip"
+                data = {"data": gzip.compress(json.dumps(payload).encode())}
             else:
                 data = {"json": payload}
         while retries > 0:
             try:
-                response = requests.request(
+                response = self._session.request(
                     method,
                     self.api_prefix + url,
                     headers=headers,
+                    timeout=self._timeout,
                     **data,
                 )
                 response.raise_for_status()
@@ -0,0 +1,152 @@
+"""This module contains a class that talks to the Flask API without
+blocking the Twisted reactor.
+"""
+
+
+import os
+import gzip
+import json
+import treq
+from http import HTTPStatus
+from twisted.internet import defer, reactor, threads
+from twisted.web.client import HTTPConnectionPool, ResponseNeverReceived
+from app.performance_scraper.performance_scraper.flask_api.exceptions import FlaskAPIException
+
+
+class AsyncFlaskAPIClient:
+    """Class to send requests to the Flask API. It has the same methods as
+    FlaskAPIClient, but every method returns a Deferred that fires with
+    the result. No more than max_concurrency requests are sent at once,
+    and each one fails after timeout seconds.
+    """
+
+    api_prefix = "http://127.0.0.1:5000/api/v1/"
+
+    def __init__(self, token=None, auth_manager=None, max_concurrency=8, timeout=None, gzip_requests=False):
+        self._token = token
+        self.auth_manager = auth_manager
+        self._timeout = timeout
+        self._gzip_requests = gzip_requests
+        self._semaphore = defer.DeferredSemaphore(max_concurrency)
+        self._pool = HTTPConnectionPool(reactor)
+        self._pool.maxPersistentPerHost = max_concurrency
+
+    def create_venue(self, payload):
+        """Send a POST request to the API to create a venue resource.
+        Returns the newly created resource.
+        """
+        return self._internal_call("POST", "venues", payload=payload)
+
+    def get_venue_by_name(self, name):
+        """Send a GET request to the API to retrieve a venue by name."""
+        return self._internal_call("GET", f"venues/{name}")
+
+    def create_artist(self, payload):
+        """Send a POST request to the API to create an artist resource.
+        Returns the newly created resource.
+        """
+        return self._internal_call("POST", "artists", payload=payload)
+
+    def get_artist_by_name(self, name):
+        """Send a GET request to the API to retrieve an artist by name."""
+        return self._internal_call("GET", f"artists/{name}")
+
+    def upload_artist_image(self, artist_id, image_file):
+        """Send a PUT request to the API to replace an artist's image. If an image 
+        doesn't exist, then one is created. Returns None. The image file
+        must stay open until the returned Deferred fires.
+        """
+        return self._internal_call(
+            "PUT", f"artists/{artist_id}/images", 
+            payload={"artist_image": image_file}
+        )
+
+    def create_performance(self, payload):
+        """Send a POST request to the API to create a performance resource.
+        Returns the newly created resource.
+        """
+        return self._internal_call("POST", "performances", payload=payload)
+
+    def create_performances(self, payload):
+        """Send a POST request to the API to create a batch of performance
+        resources, with their venues and artists inline. Returns the id and
+        status of every performance in the batch.
+        """
+        return self._internal_call("POST", "performances/bulk", payload=payload)
+
+    def close(self):
+        """Close the persistent connections to the API. Returns a Deferred."""
+        return self._pool.closeCachedConnections()
+
+    @defer.inlineCallbacks
+    def _get_headers(self):
+        """Return the headers necessary for making requests
+        to the api.
+        """
+        if self._token is None and self.auth_manager is not None:
+            self._token = yield threads.deferToThread(self.auth_manager.login)
+        if self._token is not None:
+            headers = {"Authorization": f"Bearer {self._token}"}
+        else:
+            headers = {}
+        headers["Content-Type"] = "application/json"
+        headers["Accept"] = "application/json"
+        return headers
+
+    def _internal_call(self, method, url, payload=None):
+        """Method for making calls to the API once a request slot is free."""
+        return self._semaphore.run(self._send, method, url, payload)
+
+    @defer.inlineCallbacks
+    def _send(self, method, url, payload):
+        """Send a request to the API and return its decoded JSON response."""
+        retries = 5
+        reconnects = 1
+        while True:
+            headers = yield self._get_headers()
+            data = {}
+            if payload is not None:
+                if isinstance(payload, dict) and payload.get("artist_image") is not None:
+                    headers.pop("Content-Type")
+                    image_file = payload["artist_image"]
+                    image_file.seek(0)
+                    data = {"files": {"artist_image": (os.path.basename(image_file.name), image_file)}}
+                elif self._gzip_requests:
+                    headers["Content-Encoding"] = "gzip"
+                    data = {"data": gzip.compress(json.dumps(payload).encode())}
+                else:
+                    data = {"data": json.dumps(payload).encode()}
+            try:
+                response = yield treq.request(
+                    method,
+                    self.api_prefix + url,
+                    headers=headers,
+                    pool=self._pool,
+                    timeout=self._timeout,
+                    **data
+                )
+            except ResponseNeverReceived:
+                # the API closed a pooled connection before the request was sent
+                if reconnects == 0:
+                    raise
+                reconnects -= 1
+                continue
+            content = yield response.content()
+            #token is expired, need to retrieve a new one a try again
+            if response.code == HTTPStatus.UNAUTHORIZED and self.auth_manager is not None and retries > 0:
+                self._token = yield threads.deferToThread(self.auth_manager.login)
+                retries -= 1
+                continue
+            break
+        try:
+            json_response = json.loads(content)
+        except ValueError:  # a put request will not return a JSON response
+            json_response = None
+        if response.code >= HTTPStatus.BAD_REQUEST:
+            # attempt to retrieve error message if any other error occurred
+            try:
+                message = json_response["message"]
+            except (TypeError, KeyError):
+                message = "An error occurred during your request. No error message could be found."
+            raise FlaskAPIException(response.code, f"{self.api_prefix + url}:\n {message}")
+        return json_response
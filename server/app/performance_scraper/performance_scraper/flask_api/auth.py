@@ -8,18 +8,23 @@ import json
 from http import HTTPStatus
 from scrapy.utils.project import get_project_settings
 from app.performance_scraper.performance_scraper.flask_api.exceptions import FlaskAPIException
+from app.performance_scraper.performance_scraper.flask_api.session import create_session
 
 
 class AuthManager:
-    """Class to authenticate with the Flask API."""
+    """Class to authenticate with the Flask API. Its pooled session can
+    be shared with the API client.
+    """
 
     api_prefix = "http://127.0.0.1:5000/auth/"
 
-    def __init__(self, username, password, email, cache_path):
+    def __init__(self, username, password, email, cache_path, session=None, timeout=None):
         self.username = username
         self.password = password
         self.email = email
         self.cache_path = cache_path
+        self.session = session if session is not None else create_session()
+        self._timeout = timeout
     
     def login(self):
         """Send a POST request to the login endpoint of the API.
@@ -29,10 +34,11 @@ class AuthManager:
         """
         payload = {"username": self.username, "password": self.password}
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_prefix + "login",
                 json=payload,
-                headers=self._get_headers()
+                headers=self._get_headers(),
+                timeout=self._timeout
             )
             response.raise_for_status()
             token = response.json()["access_token"]
@@ -57,10 +63,11 @@ class AuthManager:
         """
         payload = {"username": self.username, "password": self.password, "email": self.email}
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_prefix + "register",
                 json=payload,
-                headers=self._get_headers()
+                headers=self._get_headers(),
+                timeout=self._timeout
             )
             response.raise_for_status()
             token = response.json()["access_token"]
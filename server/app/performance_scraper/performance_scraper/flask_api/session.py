@@ -0,0 +1,23 @@
+"""This module contains the HTTP session shared by the clients of the Flask API."""
+
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size=10):
+    """Return a requests session that keeps up to pool_size
+    connections to the API alive between calls.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_timeout(settings):
+    """Return the connect and read timeouts for calls to the API
+    from the given Scrapy settings.
+    """
+    return (settings.getfloat("API_CONNECT_TIMEOUT"), settings.getfloat("API_READ_TIMEOUT"))
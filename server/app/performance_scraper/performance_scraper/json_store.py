@@ -0,0 +1,55 @@
+"""This module contains a small persistent key-value store that spiders
+use to remember things from one crawl to the next.
+"""
+
+
+import json
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+class JSONFileStore:
+    """Class to represent a mapping that is stored as a JSON object in
+    the given file. Nothing is stored if the path is None.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._data = {}
+        self._changed = False
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path) as store_file:
+                    self._data = json.load(store_file)
+            except (OSError, ValueError) as err:
+                logger.warning("%s could not be read: %s", path, err)
+
+    @classmethod
+    def from_spider(cls, spider, setting):
+        """Return the store of the given spider, in the directory named
+        by the given setting.
+        """
+        directory = spider.settings.get(setting)
+        if not directory:
+            return cls(None)
+        return cls(os.path.join(directory, f"{spider.name}.json"))
+
+    def _set(self, key, value):
+        """Store the value under the given key."""
+        if self._data.get(key) != value:
+            self._data[key] = value
+            self._changed = True
+
+    def save(self):
+        """Atomically write the store to its file if it changed."""
+        if self._path is None or not self._changed:
+            return
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        temporary_path = f"{self._path}.tmp"
+        with open(temporary_path, "w") as store_file:
+            json.dump(self._data, store_file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self._path)
+        self._changed = False
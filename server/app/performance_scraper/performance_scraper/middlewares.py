@@ -5,7 +5,19 @@
 # See documentation in:
 # http://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import logging
+from urllib.parse import urlparse
+from redis import Redis
+from redis.exceptions import RedisError
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import reactor
+from twisted.internet.task import deferLater
+from app.performance_scraper.performance_scraper.rate_limit import DistributedLimiter
+
+
+logger = logging.getLogger(__name__)
 
 
 class PerformanceScraperSpiderMiddleware(object):
@@ -101,3 +113,156 @@ class PerformanceScraperDownloaderMiddleware(object):
 
     def spider_opened(self, spider):
         spider.logger.info('Spider opened: %s' % spider.name)
+
+
+class SplashRenderStatsMiddleware(object):
+    """Downloader middleware that records how long Splash polled for the
+    selector each spider waits for, so crawl durations can be compared
+    with the fixed waits that were used before.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls(crawler.stats)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    def process_response(self, request, response, spider):
+        data = getattr(response, "data", None)
+        if isinstance(data, dict) and "waited" in data:
+            outcome = "ready" if data.get("ready") else "timed_out"
+            self.stats.inc_value(f"splash/render/{outcome}", spider=spider)
+            self.stats.inc_value("splash/render/wait_seconds", data["waited"], spider=spider)
+        return response
+
+    def spider_closed(self, spider):
+        renders = sum(
+            self.stats.get_value(f"splash/render/{outcome}", 0, spider=spider)
+            for outcome in ("ready", "timed_out")
+        )
+        if renders:
+            spider.logger.info(
+                "Splash waited %.1fs over %d renders (%.1fs with a fixed %ss wait)",
+                self.stats.get_value("splash/render/wait_seconds", 0, spider=spider),
+                renders,
+                renders * spider.settings.getfloat("SPLASH_RENDER_TIMEOUT"),
+                spider.settings.getfloat("SPLASH_RENDER_TIMEOUT"),
+            )
+
+
+class DistributedRateLimitMiddleware(object):
+    """Downloader middleware that holds requests back until the request
+    rate of their domain, and the number of pages being rendered by Splash,
+    are within the limits shared by every crawler process. Requests are let
+    through if Redis cannot be reached, and are then only throttled by the
+    download delay of their process.
+    """
+
+    def __init__(self, limiter, stats, poll_interval):
+        self.limiter = limiter
+        self.stats = stats
+        self.poll_interval = poll_interval
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        redis_url = settings.get("RATE_LIMIT_REDIS_URL")
+        if not redis_url:
+            raise NotConfigured
+        timeout = settings.getfloat("RATE_LIMIT_REDIS_TIMEOUT")
+        limiter = DistributedLimiter(
+            Redis.from_url(redis_url, socket_connect_timeout=timeout, socket_timeout=timeout),
+            rate=settings.getfloat("RATE_LIMIT_REQUESTS_PER_SECOND"),
+            burst=settings.getint("RATE_LIMIT_BURST"),
+            domain_rates=settings.getdict("RATE_LIMIT_DOMAIN_RATES"),
+            max_renders=settings.getint("SPLASH_MAX_CONCURRENT_RENDERS"),
+            render_lease=settings.getfloat("SPLASH_RENDER_LEASE")
+        )
+        return cls(limiter, crawler.stats, settings.getfloat("SPLASH_SLOT_POLL_INTERVAL"))
+
+    def process_request(self, request, spider):
+        # SplashMiddleware sends Splash requests through the middlewares again
+        # as requests to Splash, with a copy of the meta of their first pass.
+        # The flag is taken out once the request is answered, so retries of
+        # the request are limited again.
+        if request.meta.get("rate_limited"):
+            return None
+        request.meta["rate_limited"] = True
+        waiting = self.wait_for_token(request, spider)
+        if "splash" not in request.meta:
+            return waiting
+        # the render slot is only taken once the request may be sent, so
+        # that Splash is not kept waiting on the rate limit
+        if waiting is None:
+            return self.wait_for_render_slot(request, spider)
+        return waiting.addCallback(lambda _: self.wait_for_render_slot(request, spider))
+
+    def process_response(self, request, response, spider):
+        request.meta.pop("rate_limited", None)
+        self.release_render_slot(request, spider)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        request.meta.pop("rate_limited", None)
+        self.release_render_slot(request, spider)
+
+    def wait_for_token(self, request, spider):
+        """Return a Deferred that fires once the request may be sent, or
+        None if it may be sent straight away.
+        """
+        if request.meta.get("_splash_processed"):
+            # retries of requests to Splash are limited on the page they render
+            domain = urlparse(request.meta["splash"]["args"]["url"]).hostname
+        else:
+            domain = urlparse_cached(request).hostname
+        try:
+            wait = self.limiter.reserve(domain)
+        except RedisError as err:
+            self._redis_failed(err, spider)
+            return None
+        if wait <= 0:
+            return None
+        self.stats.inc_value("rate_limit/delayed", spider=spider)
+        self.stats.inc_value("rate_limit/wait_seconds", wait, spider=spider)
+        return deferLater(reactor, wait, lambda: None)
+
+    def wait_for_render_slot(self, request, spider, waited=0):
+        """Return a Deferred that fires once the request has a Splash render
+        slot and may be sent, or None if it may be sent straight away.
+        """
+        try:
+            token = self.limiter.acquire_render_slot()
+        except RedisError as err:
+            self._redis_failed(err, spider)
+            return None
+        if token is None:
+            return deferLater(
+                reactor, self.poll_interval, self.wait_for_render_slot,
+                request, spider, waited + self.poll_interval
+            )
+        request.meta["splash_render_slot"] = token
+        if waited:
+            self.stats.inc_value("rate_limit/splash/delayed", spider=spider)
+            self.stats.inc_value("rate_limit/splash/wait_seconds", waited, spider=spider)
+        return None
+
+    def release_render_slot(self, request, spider):
+        """Free the Splash render slot held by the request, if it has one.
+        The slot is taken out of its meta, so retries of the request take
+        a slot of their own.
+        """
+        token = request.meta.pop("splash_render_slot", None)
+        if token is None:
+            return
+        try:
+            self.limiter.release_render_slot(token)
+        except RedisError as err:
+            self._redis_failed(err, spider)
+
+    def _redis_failed(self, err, spider):
+        if not self.stats.get_value("rate_limit/redis_errors", spider=spider):
+            logger.warning("Could not reach the shared rate limits: %s", err)
+        self.stats.inc_value("rate_limit/redis_errors", spider=spider)
@@ -1,34 +1,93 @@
 """This module contains a Scrapy pipeline class for sending data to the Flask API."""
 
 
+import json
+import logging
+import os
+import time
 from http import HTTPStatus
+from twisted.internet import defer, task
+from twisted.python.failure import Failure
+from twisted.internet.error import ConnectError
+from twisted.web.client import ResponseFailed, ResponseNeverReceived
 from scrapy.exceptions import CloseSpider, DropItem
 from scrapy.pipelines.images import ImagesPipeline
 from scrapy.http import Request
-from app.performance_scraper.performance_scraper.flask_api.api_client import FlaskAPIClient
+from app.performance_scraper.performance_scraper.flask_api.async_api_client import AsyncFlaskAPIClient
 from app.performance_scraper.performance_scraper.flask_api.auth import AuthManager
 from app.performance_scraper.performance_scraper.flask_api.exceptions import FlaskAPIException
+from app.performance_scraper.performance_scraper.flask_api.session import create_session, get_timeout
+from app.performance_scraper.performance_scraper.entity_cache import EntityCache, normalize_name
+from app.performance_scraper.performance_scraper.fingerprints import FingerprintStore, UNCHANGED
+
+
+logger = logging.getLogger(__name__)
+
+# failures of a call to the Flask API that a batch can be retried after
+API_FAILURES = (FlaskAPIException, ConnectError, ResponseFailed, ResponseNeverReceived)
+
+
+def create_api_client(settings):
+    """Return an AsyncFlaskAPIClient authenticated with the credentials
+    in the given Scrapy settings.
+    """
+    auth_manager = AuthManager(
+        username=settings.get("SCRAPY_USERNAME"),
+        password=settings.get("SCRAPY_PASSWORD"),
+        email=settings.get("SCRAPY_EMAIL"),
+        cache_path=settings.get("TOKEN_FILE_PATH"),
+        session=create_session(settings.getint("API_POOL_SIZE")),
+        timeout=get_timeout(settings)
+    )
+    token = auth_manager.get_cached_token()
+    return AsyncFlaskAPIClient(
+        token=token,
+        auth_manager=auth_manager,
+        max_concurrency=settings.getint("API_CONCURRENT_REQUESTS"),
+        timeout=settings.getfloat("API_READ_TIMEOUT"),
+        gzip_requests=settings.getbool("API_GZIP_REQUESTS")
+    )
 
 
 class APIPipeline(object):
-    """Class to send data to the Flask API."""
+    """Class to send data to the Flask API. Calls to the API do not block
+    the reactor, so many items can be stored at once. The ids of venues
+    and artists are cached, so each one is looked up or created once
+    per crawl.
+    """
 
-    def __init__(self, api_client):
+    entity_kinds = ("venue", "artist")
+
+    def __init__(self, api_client, entity_cache=None, stats=None):
         self._api_client = api_client
+        self._entity_cache = entity_cache if entity_cache is not None else EntityCache()
+        self._stats = stats
+        self._resolving = {}
 
     @classmethod
     def from_crawler(cls, crawler):
         """Return a new APIPipeline instance."""
-        auth_manager = AuthManager(
-            username=crawler.settings.get("SCRAPY_USERNAME"),
-            password=crawler.settings.get("SCRAPY_PASSWORD"),
-            email=crawler.settings.get("SCRAPY_EMAIL"),
-            cache_path=crawler.settings.get("TOKEN_FILE_PATH"),
+        return cls(
+            api_client=create_api_client(crawler.settings),
+            entity_cache=EntityCache.from_settings(crawler.settings),
+            stats=crawler.stats
         )
-        token = auth_manager.get_cached_token()
-        api_client = FlaskAPIClient(token=token, auth_manager=auth_manager)
-        return cls(api_client=api_client)
 
+    def close_spider(self, spider):
+        """Record the hit rates of the entity cache and close the
+        connections to the Flask API.
+        """
+        if self._stats is not None:
+            for kind in self.entity_kinds:
+                hits = self._stats.get_value(f"entity_cache/{kind}/hits", 0, spider=spider)
+                misses = self._stats.get_value(f"entity_cache/{kind}/misses", 0, spider=spider)
+                if hits + misses:
+                    self._stats.set_value(
+                        f"entity_cache/{kind}/hit_rate", hits / (hits + misses), spider=spider
+                    )
+        return self._api_client.close()
+
+    @defer.inlineCallbacks
     def process_item(self, performance_item, spider):
         """Send scraped data to the Flask API to be stored."""
         if not performance_item:
@@ -38,32 +97,76 @@ class APIPipeline(object):
         image_item = artist_item.pop("image", None)
 
         # attempt to get venue resource from API. If it doesn't exist, create it
-        venue_resource = self.retrieve_venue_info(venue_item)
-        if venue_resource is None:
-            venue_resource = self.store_venue_info(venue_item)
+        venue_id = yield self.resolve_entity(
+            "venue", venue_item, self.retrieve_venue_info, self.store_venue_info, spider
+        )
 
         # attempt to get artist resource  from API. If it doesn't exist, create it
-        artist_resource = self.retrieve_artist_info(artist_item)
-        if artist_resource is None:
-            artist_resource = self.store_artist_info(artist_item)
+        artist_id = yield self.resolve_entity(
+            "artist", artist_item, self.retrieve_artist_info, self.store_artist_info, spider
+        )
 
         # update artist's image
         if image_item is not None:
-            self.store_artist_image(
-                artist_resource["id"], 
+            yield self.store_artist_image(
+                artist_id, 
                 spider.settings.get("IMAGE_DOWNLOAD_DIRECTORY") + "/" + image_item["path"]
             )
         # update performance item to include venue and artist id's that will
         # need to be sent in the payload to the API
-        performance_item["venue_id"] = venue_resource["id"]
-        performance_item["artist_id"] = artist_resource["id"]
-        self.store_performance_info(dict(performance_item))
+        performance_item["venue_id"] = venue_id
+        performance_item["artist_id"] = artist_id
+        yield self.store_performance_info(dict(performance_item))
         return performance_item
 
+    @defer.inlineCallbacks
+    def resolve_entity(self, kind, item, retrieve, store, spider):
+        """Return the id of a venue or artist. It is taken from the entity
+        cache if possible, otherwise it is retrieved from the Flask API and
+        created if it doesn't exist. Items that need an entity that is
+        already being resolved wait for it instead of calling the API again.
+        """
+        cached, entity_id = self._entity_cache.get(kind, item["name"])
+        if cached and entity_id is not None:
+            self._inc_stat(f"entity_cache/{kind}/hits", spider)
+            return entity_id
+        key = (kind, normalize_name(item["name"]))
+        if key in self._resolving:
+            self._inc_stat(f"entity_cache/{kind}/hits", spider)
+            waiter = defer.Deferred()
+            self._resolving[key].append(waiter)
+            entity_id = yield waiter
+            return entity_id
+        self._inc_stat(f"entity_cache/{kind}/misses", spider)
+        self._resolving[key] = []
+        try:
+            resource = None
+            # entities cached as missing are created without looking them up again
+            if not cached:
+                resource = yield retrieve(item)
+            if resource is None:
+                self._entity_cache.set(kind, item["name"], None)
+                resource = yield store(item)
+        except Exception:
+            failure = Failure()
+            for waiter in self._resolving.pop(key):
+                waiter.errback(failure)
+            raise
+        self._entity_cache.set(kind, item["name"], resource["id"])
+        for waiter in self._resolving.pop(key):
+            waiter.callback(resource["id"])
+        return resource["id"]
+
+    def _inc_stat(self, key, spider):
+        """Increment a value in the crawl stats, if they are collected."""
+        if self._stats is not None:
+            self._stats.inc_value(key, spider=spider)
+
+    @defer.inlineCallbacks
     def retrieve_venue_info(self, venue_item):
         """Return a venue resource by making a call to the Flask API."""
         try:
-            venue_resource = self._api_client.get_venue_by_name(venue_item["name"])
+            venue_resource = yield self._api_client.get_venue_by_name(venue_item["name"])
         except FlaskAPIException as api_exception:
             if api_exception.http_status == HTTPStatus.NOT_FOUND:
                 venue_resource = None
@@ -77,10 +180,11 @@ class APIPipeline(object):
         """Store the venue's information by making a call to the Flask API."""
         return self._api_client.create_venue(venue_item)
 
+    @defer.inlineCallbacks
     def retrieve_artist_info(self, artist_item):
         """Return an artist resource by making a call to the Flask API."""
         try:
-            artist_resource = self._api_client.get_artist_by_name(artist_item["name"])
+            artist_resource = yield self._api_client.get_artist_by_name(artist_item["name"])
         except FlaskAPIException as api_exception:
             if api_exception.http_status == HTTPStatus.NOT_FOUND:
                 artist_resource = None
@@ -95,16 +199,202 @@ class APIPipeline(object):
         # Create artist resource. Returns None if artist already exists
         return self._api_client.create_artist(artist_item)
 
+    @defer.inlineCallbacks
     def store_artist_image(self, artist_id, image):
         """Store the artist's image by making a call to the Flask API."""
         # attempt to update artist's image if one was found on the scraped website
         with open(image, "rb") as image_file:
-            self._api_client.upload_artist_image(artist_id, image_file)
+            yield self._api_client.upload_artist_image(artist_id, image_file)
     
     def store_performance_info(self, performance_item):
         """Store the performance information by making a call to the Flask API."""
-        self._api_client.create_performance(performance_item)
+        return self._api_client.create_performance(performance_item)
+
+
+class BatchAPIPipeline(APIPipeline):
+    """Class to send scraped data to the Flask API in batches.
+
+    Items are buffered and sent to the bulk performance endpoint once
+    API_BATCH_SIZE items are waiting, once the oldest waiting item is
+    API_BATCH_TIMEOUT seconds old, and when the spider closes. Several
+    batches can be in flight at once. Items of a batch that could not be
+    stored are appended to the dead letter file.
+
+    If INCREMENTAL_CRAWL is set, items that hash the same as when they were
+    last stored are not sent at all.
+    """
+
+    def __init__(self, api_client, stats, settings):
+        super().__init__(api_client, stats=stats)
+        self._batch_size = settings.getint("API_BATCH_SIZE")
+        self._batch_timeout = settings.getfloat("API_BATCH_TIMEOUT")
+        self._dead_letter_path = settings.get("API_DEAD_LETTER_PATH")
+        self._retry_dead_letters = settings.getbool("API_RETRY_DEAD_LETTERS")
+        self._image_directory = settings.get("IMAGE_DOWNLOAD_DIRECTORY")
+        self._incremental = settings.getbool("INCREMENTAL_CRAWL")
+        self._fingerprints = None
+        self._items = []
+        self._oldest_item_time = None
+        self._flush_loop = None
+        self._pending_flushes = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """Return a new BatchAPIPipeline instance."""
+        return cls(
+            api_client=create_api_client(crawler.settings),
+            stats=crawler.stats,
+            settings=crawler.settings
+        )
+
+    def open_spider(self, spider):
+        """Queue the items of earlier failed batches, if retrying them
+        is enabled, and start checking for stale batches.
+        """
+        if self._incremental:
+            self._fingerprints = FingerprintStore.from_spider(spider)
+        if self._retry_dead_letters:
+            self._items.extend(self.read_dead_letters())
+            if self._items:
+                self._oldest_item_time = time.monotonic()
+        self._flush_loop = task.LoopingCall(self.flush_stale_items, spider)
+        self._flush_loop.start(min(self._batch_timeout, 1), now=False)
+
+    @defer.inlineCallbacks
+    def close_spider(self, spider):
+        """Stop checking for stale batches, send the remaining items
+        and wait for every batch in flight.
+        """
+        if self._flush_loop is not None and self._flush_loop.running:
+            self._flush_loop.stop()
+        self.flush(spider)
+        yield defer.DeferredList(list(self._pending_flushes))
+        if self._fingerprints is not None:
+            self._fingerprints.save()
+        yield super().close_spider(spider)
+
+    def process_item(self, performance_item, spider):
+        """Add the scraped item to the current batch. If the batch is full,
+        it is sent to the Flask API and the returned Deferred fires with the
+        item once the batch is stored.
+        """
+        if not performance_item:
+            raise DropItem("Performance Item is Empty")
+        if self._fingerprints is not None:
+            change = self._fingerprints.check(performance_item)
+            self._stats.inc_value(f"incremental/items_{change}", spider=spider)
+            if change == UNCHANGED:
+                return performance_item
+        if not self._items:
+            self._oldest_item_time = time.monotonic()
+        self._items.append(dict(performance_item))
+        if len(self._items) >= self._batch_size:
+            return self.flush(spider).addCallback(lambda _: performance_item)
+        return performance_item
+
+    def flush_stale_items(self, spider):
+        """Send the current batch if its oldest item has waited too long."""
+        if self._items and time.monotonic() - self._oldest_item_time >= self._batch_timeout:
+            self.flush(spider)
+
+    def flush(self, spider):
+        """Send the current batch to the Flask API. Returns a Deferred that
+        fires once the batch is stored or written to the dead letter file.
+        """
+        items, self._items = self._items, []
+        if not items:
+            return defer.succeed(None)
+        deferred = self.send_batch(items, spider)
+        self._pending_flushes.add(deferred)
+        deferred.addBoth(self._flush_finished, deferred)
+        return deferred
+
+    def _flush_finished(self, result, deferred):
+        """Stop tracking a batch that is no longer in flight."""
+        self._pending_flushes.discard(deferred)
+        return result
+
+    @defer.inlineCallbacks
+    def send_batch(self, items, spider):
+        """Send a batch of items to the Flask API and record how long it took."""
+        start = time.monotonic()
+        try:
+            response = yield self._api_client.create_performances(
+                [self.make_document(item) for item in items]
+            )
+        except API_FAILURES as err:
+            logger.error("Could not send a batch of %d items: %s", len(items), err)
+            self.write_dead_letters(items, str(err))
+            self._stats.inc_value("api_batch/items_failed", len(items), spider=spider)
+            return
+        results = response["performances"]
+        if self._fingerprints is not None:
+            for item in items:
+                self._fingerprints.set(item)
+        yield self.store_artist_images(items, results, spider)
+        elapsed = time.monotonic() - start
+        self._stats.inc_value("api_batch/flushes", spider=spider)
+        self._stats.inc_value("api_batch/items_sent", len(items), spider=spider)
+        for result in results:
+            self._stats.inc_value(f"api_batch/items_{result['status']}", spider=spider)
+        self._stats.inc_value("api_batch/flush_seconds_total", elapsed, spider=spider)
+        self._stats.set_value("api_batch/flush_seconds_last", elapsed, spider=spider)
+        self._stats.max_value("api_batch/flush_seconds_max", elapsed, spider=spider)
+        if elapsed > 0:
+            self._stats.set_value(
+                "api_batch/items_per_second_last", len(items) / elapsed, spider=spider
+            )
+
+    def make_document(self, item):
+        """Return the document sent to the bulk performance endpoint for
+        the given item, which has its venue and artist inline.
+        """
+        document = {
+            key: value for key, value in item.items() if key not in ("venue", "artist")
+        }
+        document["venue"] = dict(item["venue"])
+        document["artist"] = {
+            key: value for key, value in item["artist"].items() if key != "image"
+        }
+        return document
+
+    def store_artist_images(self, items, results, spider):
+        """Store the images of the batch's artists, once per artist.
+        Returns a Deferred that fires once every upload has finished.
+        """
+        uploads = []
+        stored_artist_ids = set()
+        for item, result in zip(items, results):
+            image_item = item["artist"].get("image")
+            artist_id = result["artist_id"]
+            if image_item is None or "path" not in image_item or artist_id in stored_artist_ids:
+                continue
+            stored_artist_ids.add(artist_id)
+            upload = self.store_artist_image(artist_id, self._image_directory + "/" + image_item["path"])
+            upload.addErrback(self._image_failed, artist_id, spider)
+            uploads.append(upload)
+        return defer.DeferredList(uploads)
+
+    def _image_failed(self, failure, artist_id, spider):
+        """Log an artist image that could not be stored."""
+        failure.trap(OSError, *API_FAILURES)
+        logger.warning("Could not store the image of artist %s: %s", artist_id, failure.value)
+        self._stats.inc_value("api_batch/images_failed", spider=spider)
+
+    def write_dead_letters(self, items, reason):
+        """Append the given items to the dead letter file."""
+        with open(self._dead_letter_path, "a") as dead_letter_file:
+            for item in items:
+                dead_letter_file.write(json.dumps({"reason": reason, "item": item}) + "\n")
 
+    def read_dead_letters(self):
+        """Return the items in the dead letter file and empty it."""
+        if not os.path.exists(self._dead_letter_path):
+            return []
+        with open(self._dead_letter_path) as dead_letter_file:
+            items = [json.loads(line)["item"] for line in dead_letter_file if line.strip()]
+        os.remove(self._dead_letter_path)
+        return items
 
 
 class ArtistImagePipeline(ImagesPipeline):
@@ -0,0 +1,86 @@
+"""This module contains request rate limits and a Splash render limit that
+are kept in Redis, so that they hold across every crawler process instead
+of for each process on its own.
+"""
+
+
+import time
+import uuid
+
+
+# Reserves a token from the bucket of a domain, which refills at ARGV[1]
+# tokens a second up to ARGV[2] tokens. The bucket may go into debt, so
+# the caller is told how long to wait for its token instead of retrying.
+RESERVE_TOKEN = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate) - 1
+redis.call("HMSET", KEYS[1], "tokens", tokens, "updated", now)
+redis.call("EXPIRE", KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+if tokens >= 0 then
+    return "0"
+end
+return tostring(-tokens / rate)
+"""
+
+# Takes one of ARGV[1] render slots for ARGV[3], if one is free. Slots are
+# leased until ARGV[2], so that those held by a crashed process are freed.
+ACQUIRE_SLOT = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[4])
+if redis.call("ZCARD", KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call("ZADD", KEYS[1], ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class DistributedLimiter:
+    """Class to represent the request rate limits of every domain and the
+    limit on concurrent Splash renders, shared through Redis. Each domain
+    gets rate requests a second, in bursts of at most burst requests, unless
+    domain_rates gives it a rate of its own.
+    """
+
+    key_prefix = "rate_limit"
+
+    def __init__(self, redis, rate, burst, domain_rates=None, max_renders=4, render_lease=120):
+        self._redis = redis
+        self._rate = rate
+        self._burst = burst
+        self._domain_rates = domain_rates or {}
+        self._max_renders = max_renders
+        self._render_lease = render_lease
+        self._reserve_token = redis.register_script(RESERVE_TOKEN)
+        self._acquire_slot = redis.register_script(ACQUIRE_SLOT)
+
+    def reserve(self, domain):
+        """Reserve a request to the given domain. Return the number of
+        seconds to wait before sending it.
+        """
+        rate = self._domain_rates.get(domain, self._rate)
+        wait = self._reserve_token(
+            keys=[f"{self.key_prefix}:domain:{domain}"],
+            args=[rate, self._burst, time.time()]
+        )
+        return float(wait)
+
+    def acquire_render_slot(self):
+        """Return the token of a free Splash render slot, or None if every
+        slot is taken.
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        acquired = self._acquire_slot(
+            keys=[f"{self.key_prefix}:splash"],
+            args=[self._max_renders, now + self._render_lease, token, now]
+        )
+        return token if acquired else None
+
+    def release_render_slot(self, token):
+        """Free the Splash render slot with the given token."""
+        self._redis.zrem(f"{self.key_prefix}:splash", token)
@@ -0,0 +1,78 @@
+"""This module contains a persistent store of how often the plain html of
+the pages matching a url pattern had what their spider needed, so that
+later crawls send pages straight to the cheapest path that usually works.
+"""
+
+
+import re
+from urllib.parse import urlparse
+from app.performance_scraper.performance_scraper.json_store import JSONFileStore
+
+
+PLAIN = "plain"
+SPLASH = "splash"
+
+
+def url_pattern(url):
+    """Return the pattern of the given url: its host and path, with the last
+    path segment and every segment that contains a digit replaced by '*'.
+    Detail pages of the same kind share a pattern.
+    """
+    parsed = urlparse(url)
+    segments = [segment for segment in parsed.path.split("/") if segment][:-1]
+    segments = ["*" if re.search(r"\d", segment) else segment for segment in segments]
+    return "/".join([parsed.netloc.lower(), *segments, "*"])
+
+
+class RenderDecisionStore(JSONFileStore):
+    """Class to represent the rendering decisions of a spider, keyed on
+    url pattern. Each pattern counts the plain pages that had the selectors
+    their callback needs as hits and those that did not as misses. A pattern
+    is only rendered with Splash once it has at least min_misses misses and
+    more misses than hits, so that one odd page does not decide for the
+    rest. Counts are halved once they reach max_count, so that recent pages
+    outweigh old ones when a website changes.
+    """
+
+    max_count = 50
+
+    def __init__(self, path, min_misses=3):
+        super().__init__(path)
+        self._min_misses = min_misses
+
+    @classmethod
+    def from_spider(cls, spider):
+        """Return the store of the given spider, in the directory named by
+        its RENDER_DECISIONS_DIRECTORY setting.
+        """
+        store = super().from_spider(spider, "RENDER_DECISIONS_DIRECTORY")
+        store._min_misses = spider.settings.getint("RENDER_DECISION_MIN_MISSES", 3)
+        return store
+
+    def _counts(self, url):
+        counts = self._data.get(url_pattern(url))
+        # patterns stored before counts were kept are started over
+        if not isinstance(counts, dict):
+            return {"hits": 0, "misses": 0}
+        return counts
+
+    def get(self, url):
+        """Return the decision for the pattern of the given url, or None if
+        no page of the pattern was parsed yet.
+        """
+        counts = self._counts(url)
+        if counts["misses"] >= self._min_misses and counts["misses"] > counts["hits"]:
+            return SPLASH
+        if counts["hits"] or counts["misses"]:
+            return PLAIN
+        return None
+
+    def record(self, url, hit):
+        """Count a plain page of the pattern of the given url as a hit if it
+        had the selectors its callback needs, otherwise as a miss.
+        """
+        counts = dict(self._counts(url))
+        counts["hits" if hit else "misses"] += 1
+        if counts["hits"] + counts["misses"] >= self.max_count:
+            counts = {name: count // 2 for name, count in counts.items()}
+        self._set(url_pattern(url), counts)
@@ -48,23 +48,98 @@ DOWNLOADER_MIDDLEWARES = {
    "scrapy_splash.SplashMiddleware": 725,
    "scrapy.downloadermiddlewares.httpcompression.HttpCompressionMiddleware": 810,
    "app.performance_scraper.performance_scraper.middlewares.PerformanceScraperDownloaderMiddleware": 543,
+   # runs before SplashMiddleware, so requests are limited on their own domain
+   "app.performance_scraper.performance_scraper.middlewares.DistributedRateLimitMiddleware": 600,
+   # runs after SplashMiddleware has decoded the rendered responses
+   "app.performance_scraper.performance_scraper.middlewares.SplashRenderStatsMiddleware": 700,
 }
 
 SPLASH_URL = "http://0.0.0.0:8050"
+# pages rendered by Splash are ready once the selector their spider waits for
+# matches, which is polled for at most SPLASH_RENDER_TIMEOUT seconds
+SPLASH_RENDER_TIMEOUT = 15.0
+SPLASH_POLL_INTERVAL = 0.25
+SPLASH_RESOURCE_TIMEOUT = 10.0
+# how often the pages of each url pattern needed Splash in earlier crawls. A
+# pattern goes straight to Splash once it has RENDER_DECISION_MIN_MISSES misses
+# and more misses than hits, and every RENDER_REPROBE_INTERVAL-th of its pages
+# is still tried without Splash
+RENDER_DECISIONS_DIRECTORY = BASEDIR + "/render_decisions"
+RENDER_DECISION_MIN_MISSES = 3
+RENDER_REPROBE_INTERVAL = 10
 DUPEFILTER_CLASS = "scrapy_splash.SplashAwareDupeFilter"
 HTTPCACHE_STORAGE = "scrapy_splash.SplashAwareFSCacheStorage"
 
+# Incremental crawling. Pages are cached between crawls and revalidated with
+# their ETag and Last-Modified headers, and performances that hash the same
+# as when they were last stored are not sent to the Flask API
+INCREMENTAL_CRAWL = True
+INCREMENTAL_CRAWL_DIRECTORY = BASEDIR + "/fingerprints"
+HTTPCACHE_ENABLED = INCREMENTAL_CRAWL
+HTTPCACHE_POLICY = "scrapy.extensions.httpcache.RFC2616Policy"
+HTTPCACHE_DIR = BASEDIR + "/httpcache"
+# store responses without caching headers too, so they can be revalidated
+HTTPCACHE_ALWAYS_STORE = True
+HTTPCACHE_IGNORE_HTTP_CODES = [500, 502, 503, 504, 408, 429]
+
+
+# Publish the progress of crawls started by Celery tasks every
+# CRAWL_PROGRESS_INTERVAL seconds
+EXTENSIONS = {
+   "app.performance_scraper.performance_scraper.extensions.CrawlProgress": 500
+}
+CRAWL_PROGRESS_INTERVAL = 1.0
+# crawls started by Celery tasks are stopped, and their task fails, after
+# this many seconds, so that a hung crawl does not hold its worker process
+CRAWL_TIMEOUT = 2 * 60 * 60 #2 hours
 
 # Configure item pipelines
 ITEM_PIPELINES = {
    "app.performance_scraper.performance_scraper.pipelines.ArtistImagePipeline": 1,
-   "app.performance_scraper.performance_scraper.pipelines.APIPipeline": 300
+   "app.performance_scraper.performance_scraper.pipelines.BatchAPIPipeline": 300
 }
 
+# Batches of items sent to the bulk performance endpoint of the Flask API
+API_BATCH_SIZE = 50
+API_BATCH_TIMEOUT = 10 #seconds
+API_DEAD_LETTER_PATH = BASEDIR + "/dead_letters.jsonl"
+API_RETRY_DEAD_LETTERS = False
+# Calls to the Flask API that can be in flight at once
+API_CONCURRENT_REQUESTS = 8
+# Connections and timeouts (in seconds) of the clients of the Flask API
+API_POOL_SIZE = 10
+API_CONNECT_TIMEOUT = 3.05
+API_READ_TIMEOUT = 30
+API_GZIP_REQUESTS = False
+
+# Ids of venues and artists cached during a crawl. Set a Redis url
+# to share them between crawler processes.
+ENTITY_CACHE_SIZE = 1024
+ENTITY_CACHE_REDIS_URL = None
+ENTITY_CACHE_TTL = 86400 #1 day
+
 IMAGES_STORE = BASEDIR + "/artist_images"
 IMAGES_URLS_FIELD = "image"
 IMAGES_RESULT_FIELD = "path"
 
+# Limits shared through Redis by every crawler process, on top of the
+# download delay of each one. Each domain gets RATE_LIMIT_REQUESTS_PER_SECOND
+# requests a second in bursts of up to RATE_LIMIT_BURST, unless it has a rate
+# in RATE_LIMIT_DOMAIN_RATES, and at most SPLASH_MAX_CONCURRENT_RENDERS pages
+# are rendered by Splash at once. Unset the Redis url to turn them off.
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+# the limits are checked on the reactor thread, so a slow Redis gives up
+# after this many seconds and requests are let through
+RATE_LIMIT_REDIS_TIMEOUT = 0.25
+RATE_LIMIT_REQUESTS_PER_SECOND = 0.5
+RATE_LIMIT_BURST = 2
+RATE_LIMIT_DOMAIN_RATES = {}
+# should not be more than the --slots Splash was started with
+SPLASH_MAX_CONCURRENT_RENDERS = 5
+# render slots of crashed processes are freed after this many seconds
+SPLASH_RENDER_LEASE = 90
+SPLASH_SLOT_POLL_INTERVAL = 0.5
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 AUTOTHROTTLE_ENABLED = True
 # The initial download delay
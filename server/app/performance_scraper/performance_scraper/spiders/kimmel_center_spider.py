@@ -3,36 +3,27 @@
 
 from datetime import datetime, timedelta
 from scrapy.spiders import CrawlSpider
-from scrapy_splash import SplashRequest
 from scrapy.exceptions import CloseSpider
 from app.performance_scraper.performance_scraper.items import PerformanceItem, ArtistItem, ImageItem
 from app.performance_scraper.performance_scraper.venues import kimmel_center_item
+from app.performance_scraper.performance_scraper.splash import SplashRenderMixin
 
 
-class KimmelCenterSpider(CrawlSpider):
+class KimmelCenterSpider(SplashRenderMixin, CrawlSpider):
     """Spider to crawl the Kimmel Center's website."""
 
     name = "kimmel_center"
     domain = "https://www.kimmelcenter.org"
     start_urls = [f"{domain}/events-and-tickets/#?genre=jazz%20%26%20blues&query="]
-    lua_script = """
-    function main(splash, args)
-    assert(splash:go(args.url))
-    assert(splash:wait(args.wait))
-    return splash:html()   
-    end
-    """
+    # some events have no banner, so only the title tells whether the page was
+    # rendered by the server. parse_event has pages without a genre link
+    # rendered, since the genre decides whether the event is kept
+    render_policy = {"parse_event": ("h2.pdp-header-title",)}
 
     def start_requests(self):
         """Send requests to the Splash API."""
         for url in self.start_urls:
-            yield SplashRequest(
-                url=url,
-                method="GET",
-                endpoint="execute",
-                callback=self.parse,
-                args={"wait": 15.0, "lua_source": self.lua_script}
-            )
+            yield self.splash_request(url, self.parse, wait_for="div.event-content")
 
     def parse(self, response):
         """Parse the html for performance information and 
@@ -47,12 +38,10 @@ class KimmelCenterSpider(CrawlSpider):
                 start_datetime = self.format_datetime(date, time)
                 if start_datetime >= datetime.now() and start_datetime < datetime.now() + timedelta(weeks=4):
                     event_link = event.css("div.event-details > a").attrib["href"]
-                    yield SplashRequest(
-                        url=self.domain + event_link,
-                        method="GET",
-                        endpoint="execute",
-                        callback=self.parse_event,
-                        args={"wait": 15.0, "lua_source": self.lua_script},
+                    yield self.render_request(
+                        self.domain + event_link,
+                        self.parse_event,
+                        wait_for="h2.pdp-header-title",
                         cb_kwargs={"start_datetime": start_datetime}
                     )
                 else:
@@ -67,6 +56,8 @@ class KimmelCenterSpider(CrawlSpider):
     def parse_event(self, response, start_datetime, format="%m/%d/%Y %H:%M"):
         """Parse the html for a single event page and yield a Performance Item."""
         event_type = response.css("a.cta-link.pdp-also-link::text").get()
+        if event_type is None:
+            self.needs_render(response)
         #only want to parse html for jazz events
         if event_type is not None and event_type.replace(" ", "") == "[Jazz&Blues]":
             image_item = ImageItem()
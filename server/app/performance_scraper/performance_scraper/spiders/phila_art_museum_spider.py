@@ -3,35 +3,23 @@
 
 from datetime import datetime, timedelta
 from scrapy.spiders import CrawlSpider
-from scrapy_splash import SplashRequest
 from app.performance_scraper.performance_scraper.items import PerformanceItem, ArtistItem, ImageItem
 from app.performance_scraper.performance_scraper.venues import art_museum_item
+from app.performance_scraper.performance_scraper.splash import SplashRenderMixin
 
 
-class ArtMuseumSpider(CrawlSpider):
+class ArtMuseumSpider(SplashRenderMixin, CrawlSpider):
     """Spider to crawl the Philadelphia Art Museum's website."""
 
     name = "art_museum"
     domain = "https://www.philamuseum.org"
     start_urls = [f"{domain}/calendar/view-all/all/performances"]
-    lua_script = """
-    function main(splash, args)
-    assert(splash:go(args.url))
-    assert(splash:wait(args.wait))
-    return splash:html()   
-    end
-    """
+    render_policy = {"parse_event": ("h1.headline span", "figure.hero img")}
 
     def start_requests(self):
         """Send requests to the Splash API."""
         for url in self.start_urls:
-            yield SplashRequest(
-                url=url,
-                callback=self.parse,
-                method="GET",
-                endpoint="execute",
-                args={"wait": 15.0, "lua_source": self.lua_script},
-            )
+            yield self.splash_request(url, self.parse, wait_for="div.column.scroll-item")
 
     def parse(self, response):
         """Parse the html for performance information and 
@@ -50,12 +38,10 @@ class ArtMuseumSpider(CrawlSpider):
                     # the link is relative
                     event_link = event.css("div.card-image a").attrib["href"]
                     full_url = self.domain + event_link
-                    yield SplashRequest(
-                        url=full_url,
-                        callback=self.parse_event,
-                        method="GET",
-                        endpoint="execute",
-                        args={"wait": 15.0, "lua_source": self.lua_script},
+                    yield self.render_request(
+                        full_url,
+                        self.parse_event,
+                        wait_for="h1.headline span",
                         cb_kwargs={
                             "start_datetime": start_datetime,
                             "end_datetime": end_datetime,
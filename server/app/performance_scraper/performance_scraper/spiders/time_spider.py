@@ -3,48 +3,31 @@
 
 from datetime import datetime, timedelta
 from scrapy.spiders import CrawlSpider
-from scrapy_splash import SplashRequest
 from app.performance_scraper.performance_scraper.items import ArtistItem, PerformanceItem
 from app.performance_scraper.performance_scraper.venues import time_item
+from app.performance_scraper.performance_scraper.splash import SplashRenderMixin
 
 
 # Time's website uses a Wix widget that uses javascript to display events dynamically
-class TimeSpider(CrawlSpider):
+class TimeSpider(SplashRenderMixin, CrawlSpider):
     """Spider to crawl Time's website."""
 
     name = "time"
     start_urls = ["https://www.timerestaurant.net/music-events"]
-    lua_script = """
-    function main(splash, args)
-    assert(splash:go(args.url))
-    assert(splash:wait(args.wait))
-    return splash:html()   
-    end
-    """
+    # the Wix widget is loaded from Wix's own hosts
+    splash_allowed_domains = ("wix.com", "wixapps.net", "wixstatic.com", "parastorage.com")
 
     def start_requests(self):
         """Send requests to the Splash API."""
         for url in self.start_urls:
-            yield SplashRequest(
-                url=url,
-                callback=self.parse,
-                method="GET",
-                endpoint="execute",
-                args={"wait": 15, "lua_source": self.lua_script},
-            )
+            yield self.splash_request(url, self.parse, wait_for="#comp-iokgucluiframe")
 
     def parse(self, response):
         """Parse the html for performance information and 
         yield PerformanceItem instances.
         """
         event_list_link = response.css("#comp-iokgucluiframe").attrib["src"]
-        yield SplashRequest(
-                url=event_list_link,
-                callback=self.parse_event_list,
-                method="GET",
-                endpoint="execute",
-                args={"wait": 15, "lua_source": self.lua_script},
-            )
+        yield self.splash_request(event_list_link, self.parse_event_list, wait_for="table.day")
         
     def parse_event_list(self, response):
         """Callback method to parse the event list for information and 
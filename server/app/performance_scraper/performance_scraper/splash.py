@@ -0,0 +1,201 @@
+"""This module contains the shared Splash rendering used by the spiders
+that crawl websites which display their events with javascript.
+
+Instead of waiting a fixed number of seconds, the Lua script polls the
+page for a CSS selector declared by the spider and returns as soon as it
+matches, or once SPLASH_RENDER_TIMEOUT has passed. Images are not loaded
+and requests to third-party hosts are aborted while the page renders.
+
+Spiders can also declare the selectors a callback needs in render_policy.
+Pages for those callbacks are first downloaded with a plain request and
+only rendered with Splash if the selectors are missing, or if the callback
+calls needs_render because something else its decisions depend on is
+missing. The outcomes are
+counted per url pattern, and patterns that mostly miss go straight to Splash
+in later crawls, except for every RENDER_REPROBE_INTERVAL-th page, which is
+still tried without Splash in case the website changed.
+"""
+
+
+from urllib.parse import urlparse
+from scrapy import Request
+from scrapy_splash import SplashRequest
+from app.performance_scraper.performance_scraper.render_decisions import (
+    RenderDecisionStore,
+    SPLASH,
+    url_pattern,
+)
+
+
+LUA_SCRIPT = """
+function is_allowed(host, domains)
+    for _, domain in ipairs(domains) do
+        if host == domain or host:sub(-(#domain + 1)) == "." .. domain then
+            return true
+        end
+    end
+    return false
+end
+
+function main(splash, args)
+    splash.images_enabled = false
+    splash.resource_timeout = args.resource_timeout
+    if args.block_third_party then
+        splash:on_request(function(request)
+            local host = request.url:match("^%a+://([^/:]+)")
+            if host ~= nil and not is_allowed(host:lower(), args.allowed_domains) then
+                request:abort()
+            end
+        end)
+    end
+    assert(splash:go(args.url))
+    local waited = 0
+    while waited < args.render_timeout do
+        if splash:select(args.wait_for) ~= nil then
+            return {html = splash:html(), ready = true, waited = waited}
+        end
+        assert(splash:wait(args.poll_interval))
+        waited = waited + args.poll_interval
+    end
+    return {html = splash:html(), ready = false, waited = waited}
+end
+"""
+
+
+class RenderRequired(Exception):
+    """Raised by needs_render when a page downloaded without Splash has to
+    be rendered before it can be parsed.
+    """
+
+
+def first_party_domain(url):
+    """Return the host of the given url without a leading 'www.'."""
+    host = urlparse(url).hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+
+class SplashRenderMixin:
+    """Mixin for spiders that render pages with Splash. Spiders can set
+    splash_allowed_domains to the third-party hosts, such as the CDNs of
+    a website builder, that their pages need in order to render, and
+    render_policy to a mapping of callback names to the CSS selectors that
+    must be in a page for it to be parsed without Splash.
+    """
+
+    splash_allowed_domains = ()
+    splash_block_third_party = True
+    render_policy = {}
+    _render_decisions = None
+    _render_reprobes = None
+
+    @property
+    def render_decisions(self):
+        """Return the spider's store of rendering decisions."""
+        if self._render_decisions is None:
+            self._render_decisions = RenderDecisionStore.from_spider(self)
+        return self._render_decisions
+
+    def closed(self, reason):
+        """Persist the rendering decisions made during the crawl."""
+        if self._render_decisions is not None:
+            self._render_decisions.save()
+
+    def render_request(self, url, callback, wait_for, **kwargs):
+        """Return the cheapest request that the spider's render policy allows
+        for the given url: a plain request if the callback's selectors may be
+        in the server's html, otherwise a Splash request.
+        """
+        required = self.render_policy.get(callback.__name__)
+        if required is None or (self.render_decisions.get(url) == SPLASH and not self._reprobe(url)):
+            self._inc_render_stat("splash")
+            return self.splash_request(url, callback, wait_for, **kwargs)
+        return Request(
+            url,
+            callback=self._parse_plain,
+            cb_kwargs=kwargs.pop("cb_kwargs", {}),
+            meta={"render_fallback": {"callback": callback, "wait_for": wait_for, "kwargs": kwargs}},
+            **kwargs
+        )
+
+    def _parse_plain(self, response, **cb_kwargs):
+        """Parse a page downloaded without Splash if it has every selector
+        its callback needs, otherwise request it again through Splash.
+        """
+        fallback = response.meta["render_fallback"]
+        callback = fallback["callback"]
+        if all(response.css(selector) for selector in self.render_policy[callback.__name__]):
+            try:
+                results = list(callback(response, **cb_kwargs) or ())
+            except RenderRequired:
+                results = None
+            if results is not None:
+                self.render_decisions.record(response.url, True)
+                self._inc_render_stat("plain")
+                yield from results
+                return
+        self.render_decisions.record(response.url, False)
+        self._inc_render_stat("splash_fallback")
+        yield self.splash_request(
+            response.url,
+            callback,
+            fallback["wait_for"],
+            cb_kwargs=cb_kwargs,
+            **fallback["kwargs"]
+        )
+
+    def needs_render(self, response):
+        """Stop parsing the given response and render its page with Splash
+        instead, if it was downloaded without Splash. Callbacks call this when
+        their page lacks something that only some pages render with javascript.
+        """
+        if "render_fallback" in response.meta:
+            raise RenderRequired(response.url)
+
+    def _reprobe(self, url):
+        """Return whether the given url, whose pattern is rendered with
+        Splash, should be tried without Splash again.
+        """
+        if self._render_reprobes is None:
+            self._render_reprobes = {}
+        pattern = url_pattern(url)
+        self._render_reprobes[pattern] = self._render_reprobes.get(pattern, 0) + 1
+        interval = self.settings.getint("RENDER_REPROBE_INTERVAL", 10)
+        if interval > 0 and self._render_reprobes[pattern] % interval == 0:
+            self._inc_render_stat("reprobe")
+            return True
+        return False
+
+    def _inc_render_stat(self, path):
+        """Increment the count of pages that took the given rendering path."""
+        self.crawler.stats.inc_value(f"render/{path}", spider=self)
+
+    def splash_request(self, url, callback, wait_for, **kwargs):
+        """Return a request that renders the given url with Splash and
+        is ready as soon as the wait_for CSS selector matches.
+        """
+        settings = self.settings
+        render_timeout = settings.getfloat("SPLASH_RENDER_TIMEOUT")
+        args = {
+            "lua_source": LUA_SCRIPT,
+            "wait_for": wait_for,
+            "render_timeout": render_timeout,
+            "poll_interval": settings.getfloat("SPLASH_POLL_INTERVAL"),
+            "resource_timeout": settings.getfloat("SPLASH_RESOURCE_TIMEOUT"),
+            "block_third_party": self.splash_block_third_party,
+            "allowed_domains": [first_party_domain(url), *self.splash_allowed_domains],
+            # leave Splash enough time to load the page on top of the polling
+            "timeout": render_timeout + settings.getfloat("SPLASH_RESOURCE_TIMEOUT") + 10,
+        }
+        # rendered pages have no validators, so caching them saves nothing
+        meta = dict(kwargs.pop("meta", {}), dont_cache=True)
+        return SplashRequest(
+            url=url,
+            callback=callback,
+            method="GET",
+            endpoint="execute",
+            args=args,
+            meta=meta,
+            **kwargs
+        )
@@ -3,34 +3,59 @@ programatically."""
 
 
 import traceback
-from scrapy.crawler import CrawlerProcess, CrawlerRunner
+from datetime import datetime
 from scrapy.utils.project import get_project_settings
-from scrapy.utils.log import configure_logging
-from twisted.internet import reactor
-from app.celery_app import celery_app 
+from app.celery_app import celery_app
+from app.celery_app.task_status import record_group_summary, record_status
+from app.performance_scraper.performance_scraper.crawl_engine import CrawlEngine
 from celery.exceptions import Ignore
+from celery.signals import task_received, worker_process_shutdown
 from celery import states
 
 
 SETTINGS = get_project_settings()
 
+# the totals of each crawl that are summed for a group crawl
+TOTALS = ("items", "new_rows", "dropped")
+
+# the reactor of each worker process is started by its first crawl
+ENGINE = CrawlEngine(SETTINGS)
+
+
+@worker_process_shutdown.connect
+def stop_engine(**kwargs):
+    """Stop the crawls and the reactor of a worker process that is exiting."""
+    ENGINE.stop(timeout=30)
+
+
+@task_received.connect
+def record_received(request, **kwargs):
+    """Record that a worker received a crawl task from the broker."""
+    if request.name == start_crawl.name:
+        record_status(request.id, states.RECEIVED)
+
 
 @celery_app.task(bind=True)
 def start_crawl(self, spider):
     """Start a crawl using the given spider's name
-    passed as a string.
+    passed as a string. Returns the crawl stats. A crawl that is part of a
+    group crawl returns its error instead of failing, so that the group is
+    still summarized.
     """
-    configure_logging()
     self.update_state(
         state="PROGRESS",
         meta={"spider": spider}
     )
+    record_status(self.request.id, "PROGRESS", spider=spider)
     try:
-        runner = CrawlerRunner(SETTINGS)
-        defferred = runner.crawl(spider)
-        defferred.addBoth(lambda x: reactor.stop())
-        reactor.run()
+        stats = ENGINE.crawl(
+            spider, timeout=SETTINGS.getfloat("CRAWL_TIMEOUT"), task_id=self.request.id
+        )
     except Exception as ex:
+        errors = f"{type(ex).__name__}: {ex}"
+        record_status(self.request.id, states.FAILURE, errors=errors)
+        if self.request.chord:
+            return {"errors": errors}
         self.update_state(
             state=states.FAILURE,
             meta={
@@ -39,13 +64,55 @@ def start_crawl(self, spider):
                 "spider": spider
             })
         raise Ignore()
+    record_status(self.request.id, states.SUCCESS, result=stats[spider])
+    return stats[spider]
+
+
+@celery_app.task
+def summarize_group_crawl(results, group_id, spiders, task_ids):
+    """Record the summary of a group crawl, once all of its crawls have
+    finished, from the results of their tasks in the order of spiders.
+    """
+    summary = {"status": states.SUCCESS, "spiders": {}, "totals": dict.fromkeys(TOTALS, 0)}
+    for spider, task_id, result in zip(spiders, task_ids, results):
+        if "errors" in result:
+            summary["status"] = states.FAILURE
+            summary["spiders"][spider] = {
+                "task_id": task_id, "status": states.FAILURE, "errors": result["errors"]
+            }
+            continue
+        totals = spider_totals(result)
+        summary["spiders"][spider] = dict(totals, task_id=task_id, status=states.SUCCESS)
+        for name in TOTALS:
+            summary["totals"][name] += totals[name]
+    # the crawls ran in parallel, so the group took as long as the longest
+    durations = [
+        crawl["duration_seconds"] for crawl in summary["spiders"].values()
+        if crawl.get("duration_seconds") is not None
+    ]
+    summary["totals"]["duration_seconds"] = max(durations, default=None)
+    record_group_summary(group_id, summary)
+    return summary
+
+
+def spider_totals(stats):
+    """Return the totals of a crawl from its stats."""
+    duration = None
+    if "start_time" in stats and "finish_time" in stats:
+        elapsed = (
+            datetime.fromisoformat(stats["finish_time"])
+            - datetime.fromisoformat(stats["start_time"])
+        )
+        duration = elapsed.total_seconds()
+    return {
+        "items": stats.get("item_scraped_count", 0),
+        "new_rows": stats.get("api_batch/items_created", 0),
+        "dropped": stats.get("item_dropped_count", 0),
+        "duration_seconds": duration
+    }
+
 
-    
 @celery_app.task
 def scheduled_crawl(*spiders):
     """Start the weekly scheduled crawl, using all spiders."""
-    process = CrawlerProcess(SETTINGS)
-    for spider in spiders:
-        process.crawl(spider)
-    process.start()
-    
+    ENGINE.crawl(*spiders, timeout=SETTINGS.getfloat("CRAWL_TIMEOUT"))
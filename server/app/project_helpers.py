@@ -1,27 +1,134 @@
 """This module contains helper functions to be used across the project."""
 
 
+import json
+import binascii
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from datetime import datetime
+from http import HTTPStatus
 from flask import request, url_for, current_app
+from flask_restful import abort
+from sqlalchemy import inspect, tuple_
 
 
-def paginate(tablename, query, schema):
-    """Return a paginated collection of resources."""
-    page = request.args.get("page", default=1, type=int)
+def paginate(tablename, query, schema, keys=None, preload=None):
+    """Return a paginated collection of resources.
+
+    If a 'cursor' query string parameter is sent, the collection is
+    paginated by seeking on the given key columns instead of by page
+    number. The key columns default to the primary key of the queried model.
+    If given, preload is called with the resources of the page before they
+    are serialized, so related data can be loaded for the whole page at once.
+    """
     per_page = request.args.get(
         "per_page", current_app.config["DEFAULT_RESOURCES_PER_PAGE"], type=int
     )
+    if "cursor" in request.args:
+        if keys is None:
+            keys = inspect(query.column_descriptions[0]["entity"]).primary_key
+        return keyset_paginate(tablename, query, schema, keys, per_page, preload)
+    page = request.args.get("page", default=1, type=int)
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    if preload is not None:
+        preload(pagination.items)
     prev = None
     if pagination.has_prev:
-        prev = url_for(request.endpoint, page=page - 1)
+        prev = page_url(page=page - 1)
     next = None
     if pagination.has_next:
-        next = url_for(request.endpoint, page=page + 1)
+        next = page_url(page=page + 1)
     return {
-        tablename: schema.dumps(pagination.items, many=True),
+        tablename: schema.dump(pagination.items, many=True),
         "prev": prev,
         "next": next,
         "total": pagination.total
     }
 
-    
\ No newline at end of file
+
+def keyset_paginate(tablename, query, schema, keys, per_page, preload=None):
+    """Return a collection of resources that is paginated by seeking
+    past the key values stored in the request's cursor. The total
+    number of resources is only counted if 'include_total' is sent.
+    """
+    direction, values = decode_cursor(request.args["cursor"], keys)
+    collection = query
+    if values is not None:
+        if direction == "next":
+            query = query.filter(tuple_(*keys) > tuple_(*values))
+        else:
+            query = query.filter(tuple_(*keys) < tuple_(*values))
+    if direction == "next":
+        ordering = [key.asc() for key in keys]
+    else:
+        ordering = [key.desc() for key in keys]
+    # fetch one extra row to find out if there is another page
+    items = query.order_by(None).order_by(*ordering).limit(per_page + 1).all()
+    has_more = len(items) > per_page
+    items = items[:per_page]
+    if direction == "prev":
+        items.reverse()
+    if preload is not None:
+        preload(items)
+    prev = None
+    next = None
+    if items:
+        if (direction == "next" and values is not None) or (direction == "prev" and has_more):
+            prev = page_url(cursor=encode_cursor("prev", keys, items[0]))
+        if (direction == "next" and has_more) or (direction == "prev" and values is not None):
+            next = page_url(cursor=encode_cursor("next", keys, items[-1]))
+    response = {
+        tablename: schema.dump(items, many=True),
+        "prev": prev,
+        "next": next
+    }
+    if request.args.get("include_total", default=False, type=is_true):
+        response["total"] = collection.order_by(None).count()
+    return response
+
+
+def encode_cursor(direction, keys, item):
+    """Return an opaque cursor pointing at the given item's key values."""
+    values = []
+    for key in keys:
+        value = getattr(item, key.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    data = json.dumps({"d": direction, "v": values}).encode()
+    return urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor, keys):
+    """Return the direction and key values stored in the given cursor.
+    An empty cursor points at the first page.
+    """
+    if not cursor:
+        return "next", None
+    try:
+        data = json.loads(urlsafe_b64decode(cursor.encode()))
+        direction, values = data["d"], data["v"]
+        if direction not in ("next", "prev") or len(values) != len(keys):
+            raise ValueError
+        values = [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else value
+            for key, value in zip(keys, values)
+        ]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        abort(HTTPStatus.BAD_REQUEST, message={"cursor": "Invalid cursor."})
+    return direction, values
+
+
+def page_url(**params):
+    """Return the url for another page of the current collection, keeping
+    the current view arguments and query string parameters.
+    """
+    args = request.args.to_dict()
+    args.pop("page", None)
+    args.pop("cursor", None)
+    args.update(params)
+    return url_for(request.endpoint, **request.view_args, **args)
+
+
+def is_true(value):
+    """Return True if the given query string value is truthy."""
+    return value.lower() in ("1", "true", "yes")
@@ -0,0 +1,56 @@
+"""This module contains the function that encodes the JSON bodies of
+API responses. The fastest available JSON library is used: orjson,
+then ujson, then the standard library's json module.
+"""
+
+
+from flask import make_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+import json
+
+
+if orjson is not None:
+    ENCODER = "orjson"
+
+    def encode_json(data):
+        """Return the given data encoded as JSON bytes."""
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+elif ujson is not None:
+    ENCODER = "ujson"
+
+    def encode_json(data):
+        """Return the given data encoded as JSON bytes."""
+        return ujson.dumps(data, ensure_ascii=False).encode("utf-8")
+
+else:
+    ENCODER = "json"
+
+    def encode_json(data):
+        """Return the given data encoded as JSON bytes."""
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """Return a JSON response for the given data. Used as the
+    'application/json' representation of the Flask-RESTful APIs.
+    """
+    return json_response(encode_json(data), code, headers)
+
+
+def json_response(body, code, headers=None):
+    """Return a response for the given, already encoded, JSON body."""
+    response = make_response(body, code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
@@ -0,0 +1 @@
+"""This package contains scripts for benchmarking parts of the project."""
@@ -0,0 +1,93 @@
+"""This module benchmarks the per-item latency of the Flask API client.
+
+A stand-in API that answers every call with a small JSON document is
+served locally over HTTP/1.1. For every item the client makes the calls
+the old pipeline made: look up the venue, look up the artist and create
+the performance. The old client opened a new connection per call with
+requests.request; the new one reuses the connections of a pooled session.
+
+Usage (from the server directory):
+    python -m benchmarks.api_client_keepalive
+"""
+
+
+import argparse
+import json
+import socket
+import threading
+import requests
+from werkzeug.serving import make_server, WSGIRequestHandler
+from app.performance_scraper.performance_scraper.flask_api.api_client import FlaskAPIClient
+from app.performance_scraper.performance_scraper.flask_api.session import create_session
+from benchmarks.utils import time_call
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Request handler that keeps HTTP/1.1 connections open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # the headers and body are written separately, which would
+        # otherwise wait on delayed acknowledgements
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def stand_in_api(environ, start_response):
+    """WSGI application that answers every call to the API."""
+    environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+    body = json.dumps({"id": 1, "name": "stand-in"}).encode()
+    start_response(
+        "200 OK", [("Content-Type", "application/json"), ("Content-Length", str(len(body)))]
+    )
+    return [body]
+
+
+def store_item(client, performance_item):
+    """Make the calls the old pipeline made for a single item."""
+    client.get_venue_by_name("Chris' Jazz Cafe")
+    client.get_artist_by_name("stand-in")
+    client.create_performance(performance_item)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    server = make_server(
+        "127.0.0.1", 0, stand_in_api, threaded=True, request_handler=KeepAliveRequestHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    performance_item = {
+        "title": "Performance",
+        "url": "https://www.example.com/events/1",
+        "start_datetime": "04/12/2020 20:00",
+        "end_datetime": "04/12/2020 22:00",
+        "venue_id": 1,
+        "artist_id": 1
+    }
+    # the requests module has the same request method as a session,
+    # but opens a new connection for every call
+    clients = (
+        ("new connection per call", FlaskAPIClient(token="token", session=requests)),
+        ("pooled session", FlaskAPIClient(token="token", session=create_session())),
+        ("pooled session, gzip", FlaskAPIClient(token="token", session=create_session(), gzip_requests=True)),
+    )
+    for name, client in clients:
+        client.api_prefix = f"http://127.0.0.1:{server.server_port}/api/v1/"
+        duration = time_call(
+            lambda: [store_item(client, performance_item) for _ in range(args.items)],
+            repeat=args.repeat
+        )
+        print(f"{name}: {duration / args.items:.3f} ms per item")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
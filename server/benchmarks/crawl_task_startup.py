@@ -0,0 +1,95 @@
+"""This module benchmarks the startup latency of a crawl task: the time
+from the task starting until its spider is opened.
+
+The old task ran the reactor itself, so Celery had to give every crawl
+a fresh child process. That is simulated by forking a process from this
+one, which has already imported the tasks module like the Celery master
+has, and running the old task body in it. The new task submits the crawl
+to the long-lived reactor of the CrawlEngine. Both crawl a spider that
+sends no requests, so only the startup cost is measured.
+
+Usage (from the server directory):
+    python -m benchmarks.crawl_task_startup
+"""
+
+
+import argparse
+import os
+import statistics
+import time
+from scrapy import Spider, signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from app.performance_scraper.performance_scraper.tasks import SETTINGS
+from app.performance_scraper.performance_scraper.crawl_engine import CrawlEngine
+
+
+class StartupSpider(Spider):
+    """Spider that records when it was opened and sends no requests."""
+
+    name = "startup"
+    opened_at = None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.record_opened, signal=signals.spider_opened)
+        return spider
+
+    def record_opened(self, spider):
+        StartupSpider.opened_at = time.perf_counter()
+
+
+def old_task_startup():
+    """Return the startup latency in milliseconds of the old task, run in
+    a freshly forked process.
+    """
+    read_end, write_end = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        from twisted.internet import reactor
+        configure_logging(SETTINGS)
+        runner = CrawlerRunner(SETTINGS)
+        deferred = runner.crawl(StartupSpider)
+        deferred.addBoth(lambda _: reactor.stop())
+        reactor.run()
+        os.write(write_end, repr(StartupSpider.opened_at).encode())
+        os._exit(0)
+    os.close(write_end)
+    opened_at = float(os.read(read_end, 64))
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    return (opened_at - start) * 1000
+
+
+def new_task_startup(engine):
+    """Return the startup latency in milliseconds of a crawl submitted
+    to the running engine.
+    """
+    start = time.perf_counter()
+    engine.crawl(StartupSpider)
+    return (StartupSpider.opened_at - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    SETTINGS.set("LOG_LEVEL", "WARNING")
+    SETTINGS.set("TELNETCONSOLE_ENABLED", False)
+    old = [old_task_startup() for _ in range(args.repeat)]
+    print(f"fresh process per task: {statistics.median(old):.1f} ms median startup")
+
+    engine = CrawlEngine(SETTINGS)
+    first = new_task_startup(engine)
+    new = [new_task_startup(engine) for _ in range(args.repeat)]
+    engine.stop()
+    print(f"persistent reactor, first task: {first:.1f} ms startup")
+    print(f"persistent reactor: {statistics.median(new):.1f} ms median startup")
+
+
+if __name__ == "__main__":
+    main()
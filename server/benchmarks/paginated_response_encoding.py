@@ -0,0 +1,76 @@
+"""This module benchmarks encoding pages of performance resources.
+
+It compares the old response pipeline, where the schema dumps the page to
+a JSON string that Flask-RESTful then encodes a second time, against
+dumping the page to Python structures once and encoding them with the
+fast encoder from app.representations.
+
+Usage (from the server directory):
+    python -m benchmarks.paginated_response_encoding
+"""
+
+
+import argparse
+import json
+from datetime import datetime, timedelta
+from app.api.schemas import PerformanceSchema
+from app.models import Artist, Venue, Performance
+from app.representations import ENCODER, encode_json
+from benchmarks.utils import create_benchmark_app, time_call
+
+
+PAGE_SIZES = (50, 500, 5000)
+
+
+def build_page(size):
+    """Return a list of unsaved performances with their artists and venues."""
+    venue = Venue(id=1, name="Chris' Jazz Cafe")
+    page = []
+    for number in range(size):
+        start_datetime = datetime(2020, 4, 1, 20) + timedelta(days=number)
+        page.append(
+            Performance(
+                id=number + 1,
+                title=f"Performance {number}",
+                description="An evening of jazz standards and originals. " * 4,
+                url=f"https://www.example.com/events/{number}",
+                start_datetime=start_datetime,
+                end_datetime=start_datetime + timedelta(hours=2),
+                artist=Artist(id=number + 1, name=f"artist {number}"),
+                venue=venue
+            )
+        )
+    return page
+
+
+def double_encoded(schema, page):
+    """Return the response body built by the old pipeline."""
+    body = {"performances": schema.dumps(page, many=True), "prev": None, "next": None}
+    return (json.dumps(body) + "\n").encode("utf-8")
+
+
+def single_encoded(schema, page):
+    """Return the response body built by the new pipeline."""
+    body = {"performances": schema.dump(page, many=True), "prev": None, "next": None}
+    return encode_json(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app("sqlite://")
+    schema = PerformanceSchema()
+    print(f"encoder: {ENCODER}")
+    with app.test_request_context():
+        for size in PAGE_SIZES:
+            page = build_page(size)
+            for name, encode in (("double encoded", double_encoded), ("single encoded", single_encoded)):
+                size_in_bytes = len(encode(schema, page))
+                duration = time_call(lambda: encode(schema, page), repeat=args.repeat)
+                print(f"{size} items, {name}: {size_in_bytes} bytes, {duration:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""This module benchmarks filtering performances by a range of dates.
+
+It compares the old filter, which wraps start_datetime in a DATE() call,
+against half-open timestamp bounds that can use the start_datetime indexes.
+
+The database must be an empty scratch database. Its tables are created
+for the run and dropped afterwards.
+
+Usage (from the server directory):
+    python -m benchmarks.performance_date_filter --database-uri postgresql://.../scratch --rows 1000000
+"""
+
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, text
+from app.extensions import db
+from app.models import Artist, Venue, Performance
+from app.api.helpers import date_range_bounds
+from benchmarks.utils import create_benchmark_app, scratch_tables, time_call
+
+
+BATCH_SIZE = 10000
+
+
+def seed(rows, artists=2000, venues=50):
+    """Insert the given number of performances spread over two years."""
+    db.session.execute(
+        Artist.__table__.insert(), [{"name": f"artist {number}"} for number in range(artists)]
+    )
+    db.session.execute(
+        Venue.__table__.insert(),
+        [
+            {
+                "name": f"venue {number}",
+                "street_address": f"{number} Broad St.",
+                "city": "Philadelphia",
+                "state": "PA",
+                "zip_code": "19102"
+            }
+            for number in range(venues)
+        ]
+    )
+    first_day = datetime(2020, 1, 1)
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, rows - offset)):
+            start_datetime = first_day + timedelta(minutes=random.randrange(2 * 365 * 24 * 60))
+            batch.append({
+                "title": "benchmark performance",
+                "url": "http://www.example.com",
+                "start_datetime": start_datetime,
+                "end_datetime": start_datetime + timedelta(hours=2),
+                "artist_id": random.randint(1, artists),
+                "venue_id": random.randint(1, venues)
+            })
+        db.session.execute(Performance.__table__.insert(), batch)
+    db.session.commit()
+
+
+def date_function_query(start_date, end_date):
+    """Return the query that filters with DATE(start_datetime)."""
+    return Performance.query.filter(
+        func.Date(Performance.start_datetime) >= start_date,
+        func.Date(Performance.start_datetime) <= end_date
+    )
+
+
+def half_open_query(start_date, end_date):
+    """Return the query that filters with half-open timestamp bounds."""
+    start_datetime, end_datetime = date_range_bounds(start_date, end_date)
+    return Performance.query.filter(
+        Performance.start_datetime >= start_datetime,
+        Performance.start_datetime < end_datetime
+    )
+
+
+def explain(query):
+    """Return the database's query plan for the given query."""
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN" if db.engine.name == "postgresql" else "EXPLAIN QUERY PLAN"
+    return "\n".join(
+        " ".join(str(column) for column in row)
+        for row in db.session.execute(text(f"{prefix} {statement}"))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--database-uri", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app(args.database_uri)
+    with app.app_context(), scratch_tables():
+        seed(args.rows)
+        db.session.execute(text("ANALYZE"))
+        # a typical one week newsletter window
+        start_date, end_date = date(2021, 3, 1), date(2021, 3, 7)
+        for name, build_query in (
+            ("DATE(start_datetime)", date_function_query),
+            ("half-open bounds", half_open_query),
+        ):
+            query = build_query(start_date, end_date)
+            count = query.count()
+            duration = time_call(
+                lambda: query.order_by(Performance.start_datetime).limit(50).all(),
+                repeat=args.repeat
+            )
+            print(f"{name}: {duration:.2f} ms for the first page of {count} rows")
+            print(explain(query))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""This module contains helper functions shared by the benchmark scripts."""
+
+
+import statistics
+import time
+from contextlib import contextmanager
+from sqlalchemy import inspect
+from app import create_app
+from app.extensions import db
+
+
+def create_benchmark_app(database_uri):
+    """Return an application instance with testing configurations
+    that is connected to the given database.
+    """
+    app = create_app(config_name="testing")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_uri
+    return app
+
+
+@contextmanager
+def scratch_tables():
+    """Context manager that creates the application's tables for a benchmark
+    and drops them afterwards. Raises SystemExit if the database already has
+    tables, so that a real database is never wiped.
+    """
+    existing = inspect(db.engine).get_table_names()
+    if existing:
+        raise SystemExit(
+            f"Refusing to run against a database with tables ({', '.join(existing)}). "
+            "Point --database-uri at an empty scratch database."
+        )
+    db.create_all()
+    try:
+        yield
+    finally:
+        db.session.remove()
+        db.drop_all()
+
+
+def time_call(func, repeat=5):
+    """Call the given function repeatedly and return the median
+    duration of a single call in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
@@ -26,14 +26,36 @@ class BaseConfig:
 
     CSRF_ENABLED = True #check later to see if this is really needed
     DEFAULT_RESOURCES_PER_PAGE = 50
+    MAX_BULK_PERFORMANCES = 500
+    MAX_DECOMPRESSED_REQUEST_SIZE = 16 * 1024 * 1024 #16 MB
 
     UPLOAD_DIRECTORY = BASEDIR + "/app/static/artist_images"
     ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
+    MAX_IMAGE_SIZE = 10 * 1024 * 1024 #10 MB
+    IMAGE_DERIVATIVES_ENABLED = True
+    IMAGE_CACHE_MAX_AGE = 365 * 24 * 60 * 60 #1 year
+    # unreferenced image files stored or reused more recently are not swept
+    IMAGE_SWEEP_GRACE_PERIOD = 60 * 60 #1 hour
+    # None to stream image files from Python, or "X-Accel-Redirect"/"X-Sendfile"
+    # to let a fronting nginx or Apache/lighttpd send them
+    IMAGE_SENDFILE_MODE = os.environ.get("IMAGE_SENDFILE_MODE")
+    IMAGE_ACCEL_REDIRECT_PREFIX = "/protected/artist_images"
 
     REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
     REDIS_PORT = os.environ.get("REDIS_PORT", 6379)
     REDIS_DB = os.environ.get("REDIS_DB", 0)
 
+    # each open crawl status stream holds a worker thread until its crawl ends,
+    # so a process serves at most this many at once and answers the rest with
+    # 503. Keep it below the threads of a worker, or raise it for gevent or
+    # eventlet workers, whose streams only hold a greenlet
+    CRAWL_STATUS_MAX_STREAMS = 4
+
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_TTL = 3600 #1 hour
+    RESPONSE_CACHE_MAX_ENTRIES = 10000
+    RESPONSE_CACHE_MAX_ENTRY_SIZE = 1024 * 1024 #1 MB
+
     @staticmethod
     def init_app(app):
         pass
@@ -50,6 +72,8 @@ class TestingConfig(BaseConfig):
 
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite://"
+    RESPONSE_CACHE_ENABLED = False
+    IMAGE_DERIVATIVES_ENABLED = False
 
 
 class ProductionConfig(BaseConfig):
@@ -2,7 +2,7 @@
 
 
 from pytest import mark
-from flask_app.utils import get_headers
+from flask_app.utils import get_headers, count_queries
 
 
 def test_getting_single_artist_by_authorized_user(flask_test_client, auth, user, artist):
@@ -93,19 +93,19 @@ def test_getting_list_of_artists_by_authorized_user(flask_test_client, json, aut
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"artists", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["artists"]), list)
-    assert set(json.loads(response.json["artists"])[0].keys()) == expected_fields
+    assert isinstance(response.json["artists"], list)
+    assert set(response.json["artists"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["artists"])[0]["id"] == artist.id
-    assert json.loads(response.json["artists"])[0]["name"] == artist.name
-    assert json.loads(response.json["artists"])[0]["bio"] == artist.bio
-    assert json.loads(response.json["artists"])[0]["website"] == artist.website
-    assert json.loads(response.json["artists"])[0]["performances"] == []
-    assert json.loads(response.json["artists"])[0]["image"] is None
-    assert json.loads(response.json["artists"])[0]["_links"]["uri"] == f"/api/v1/artists/{artist.id}"    
-    assert json.loads(response.json["artists"])[0]["_links"]["collection"] == "/api/v1/artists"
+    assert response.json["artists"][0]["id"] == artist.id
+    assert response.json["artists"][0]["name"] == artist.name
+    assert response.json["artists"][0]["bio"] == artist.bio
+    assert response.json["artists"][0]["website"] == artist.website
+    assert response.json["artists"][0]["performances"] == []
+    assert response.json["artists"][0]["image"] is None
+    assert response.json["artists"][0]["_links"]["uri"] == f"/api/v1/artists/{artist.id}"    
+    assert response.json["artists"][0]["_links"]["collection"] == "/api/v1/artists"
 
 
 def test_getting_list_of_artists_without_token_must_fail(flask_test_client):
@@ -133,3 +133,127 @@ def test_artist_not_found(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Artist could not be found."
+
+
+def test_seeking_through_list_of_artists_with_cursor(flask_test_client, json, auth, user, db):
+    """Test to ensure that the next and prev cursors returned by the api
+    walk through a list of artist resources in order of name.
+    """
+    from app.models import Artist
+    db.session.add_all([Artist(name=f"artist {number}") for number in range(3)])
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/artists",
+        headers=get_headers(token),
+        query_string={"cursor": "", "per_page": 2}
+    )
+    assert response.status == "200 OK"
+    assert [artist["name"] for artist in response.json["artists"]] == ["artist 0", "artist 1"]
+    assert response.json["prev"] is None
+    assert response.json["next"] is not None
+
+    response = flask_test_client.get(response.json["next"], headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert [artist["name"] for artist in response.json["artists"]] == ["artist 2"]
+    assert response.json["prev"] is not None
+    assert response.json["next"] is None
+
+    response = flask_test_client.get(response.json["prev"], headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert [artist["name"] for artist in response.json["artists"]] == ["artist 0", "artist 1"]
+    assert response.json["prev"] is None
+
+
+def test_getting_list_of_artists_does_not_query_per_artist(flask_test_client, auth, user, db, venue):
+    """Test to ensure that the performances and images of a page of artists
+    are loaded in bulk instead of with extra queries for every artist.
+    """
+    from datetime import datetime
+    from app.models import Artist, Image, Performance
+    for number in range(5):
+        artist = Artist(name=f"artist {number}")
+        artist.image = Image(path=f"/static/artist_{number}.jpg", original_filename=f"artist_{number}.jpg")
+        db.session.add(
+            Performance(
+                title=f"title {number}",
+                url="http://www.jazzclub.com",
+                start_datetime=datetime(2020, 4, 12, 20),
+                end_datetime=datetime(2020, 4, 12, 22),
+                artist=artist,
+                venue=venue
+            )
+        )
+    db.session.commit()
+    db.session.expire_all()
+    token = auth.register(user.username, "password", user.email)
+    with count_queries(db) as statements:
+        response = flask_test_client.get(f"/api/v1/artists", headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert all(len(artist["performances"]) == 1 for artist in response.json["artists"])
+    # the user of the token, collection version, artists, their images
+    # and their performance ids
+    assert len(statements) == 5
+
+
+def test_getting_unchanged_artist_returns_not_modified(flask_test_client, auth, user, artist):
+    """Test to ensure that a 304 status is returned if the client's copy
+    of an artist resource is current.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(f"/api/v1/artists/{artist.id}", headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert not response.headers["ETag"].startswith("W/")
+    last_modified = response.headers["Last-Modified"]
+
+    headers = get_headers(token)
+    headers["If-None-Match"] = response.headers["ETag"]
+    response = flask_test_client.get(f"/api/v1/artists/{artist.id}", headers=headers)
+    assert response.status == "304 NOT MODIFIED"
+    assert response.data == b""
+
+    headers = get_headers(token)
+    headers["If-Modified-Since"] = last_modified
+    response = flask_test_client.get(f"/api/v1/artists/{artist.id}", headers=headers)
+    assert response.status == "304 NOT MODIFIED"
+
+
+def test_getting_list_of_artists_ignores_if_modified_since(flask_test_client, auth, user, db, artist):
+    """Test to ensure that collections are only answered with a 304 status
+    for If-None-Match, since deleting a row that is not the newest does not
+    change the latest updated_at.
+    """
+    from app.models import Artist
+    db.session.add(Artist(name="newer artist"))
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get("/api/v1/artists", headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert "Last-Modified" not in response.headers
+
+    db.session.delete(artist)
+    db.session.commit()
+    headers = get_headers(token)
+    headers["If-Modified-Since"] = "Fri, 01 Jan 2100 00:00:00 GMT"
+    response = flask_test_client.get("/api/v1/artists", headers=headers)
+    assert response.status == "200 OK"
+    assert [artist["name"] for artist in response.json["artists"]] == ["newer artist"]
+
+
+def test_getting_artist_after_its_performances_change_returns_new_etag(
+    flask_test_client, auth, user, db, artist, performance
+):
+    """Test to ensure that deleting one of an artist's performances
+    changes the artist's ETag.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(f"/api/v1/artists/{artist.id}", headers=get_headers(token))
+    etag = response.headers["ETag"]
+    db.session.delete(performance)
+    db.session.commit()
+    headers = get_headers(token)
+    headers["If-None-Match"] = etag
+    response = flask_test_client.get(f"/api/v1/artists/{artist.id}", headers=headers)
+    assert response.status == "200 OK"
+    assert response.json["performances"] == []
+    assert response.headers["ETag"] != etag
@@ -1,6 +1,8 @@
 """This module contains tests for sending GET requests to the image endpoints."""
 
 
+import hashlib
+import os
 from pytest import mark
 from flask_app.utils import get_headers
 
@@ -10,7 +12,7 @@ def test_getting_list_of_images_by_authorized_user(flask_test_client, json, auth
     """
     artist.image = image
     expected_fields = {
-        "path", "artist"
+        "path", "url", "derivatives", "artist"
     }
     token = auth.register(user.username, "password", user.email)
     response = flask_test_client.get(
@@ -19,10 +21,10 @@ def test_getting_list_of_images_by_authorized_user(flask_test_client, json, auth
     )
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
-    assert isinstance(json.loads(response.json), list)
-    assert json.loads(response.json)[0].keys() == expected_fields
-    assert json.loads(response.json)[0]["path"] == artist.image.path
-    assert json.loads(response.json)[0]["artist"] == f"/api/v1/artists/{artist.id}"
+    assert isinstance(response.json, list)
+    assert response.json[0].keys() == expected_fields
+    assert response.json[0]["path"] == artist.image.path
+    assert response.json[0]["artist"] == f"/api/v1/artists/{artist.id}"
 
 
 def test_getting_list_of_images_without_token_must_fail(flask_test_client, artist):
@@ -51,3 +53,74 @@ def test_artist_not_found(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Artist could not be found."
+
+
+def store_image_file(directory, data, extension="jpg"):
+    """Write the given bytes to the content-addressed path of the image
+    store in the given directory and return the file's name.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    filename = f"{digest}.{extension}"
+    os.makedirs(os.path.join(directory, digest[:2], digest[2:4]))
+    with open(os.path.join(directory, digest[:2], digest[2:4], filename), "wb") as file:
+        file.write(data)
+    return filename
+
+
+def test_getting_image_file(flask_app, flask_test_client, tmp_path):
+    """Test to ensure that image files are served without a token, with
+    immutable caching headers, conditional requests and byte ranges.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    data = b"\xff\xd8\xff\xe0image bytes"
+    filename = store_image_file(str(tmp_path), data)
+    response = flask_test_client.get(f"/api/v1/images/{filename}")
+    assert response.status == "200 OK"
+    assert response.content_type == "image/jpeg"
+    assert response.data == data
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == flask_app.config["IMAGE_CACHE_MAX_AGE"]
+
+    response = flask_test_client.get(
+        f"/api/v1/images/{filename}", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status == "304 NOT MODIFIED"
+
+    response = flask_test_client.get(f"/api/v1/images/{filename}", headers={"Range": "bytes=0-3"})
+    assert response.status == "206 PARTIAL CONTENT"
+    assert response.data == data[:4]
+    assert response.headers["Content-Range"] == f"bytes 0-3/{len(data)}"
+
+
+@mark.parametrize(
+    "mode, expected",
+    [
+        ("X-Accel-Redirect", "/protected/artist_images/{digest[0]}{digest[1]}/{digest[2]}{digest[3]}/{filename}"),
+        ("X-Sendfile", "{directory}/{digest[0]}{digest[1]}/{digest[2]}{digest[3]}/{filename}")
+    ]
+)
+def test_getting_image_file_through_proxy(flask_app, flask_test_client, tmp_path, mode, expected):
+    """Test to ensure that the sending of image files can be left
+    to a fronting proxy.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    flask_app.config["IMAGE_SENDFILE_MODE"] = mode
+    filename = store_image_file(str(tmp_path), b"image bytes")
+    response = flask_test_client.get(f"/api/v1/images/{filename}")
+    assert response.status == "200 OK"
+    assert response.content_type == "image/jpeg"
+    assert response.data == b""
+    assert response.headers[mode] == expected.format(
+        directory=tmp_path, digest=filename, filename=filename
+    )
+
+
+@mark.parametrize("filename", ["unknown.jpg", f"{'a' * 64}.jpg", f"{'a' * 64}_150.webp"])
+def test_getting_unknown_image_file_must_fail(flask_app, flask_test_client, tmp_path, filename):
+    """Test to ensure that a 404 response is returned for files
+    that are not in the image store.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    response = flask_test_client.get(f"/api/v1/images/{filename}")
+    assert response.status == "404 NOT FOUND"
+    assert response.json["message"] == "Image file could not be found."
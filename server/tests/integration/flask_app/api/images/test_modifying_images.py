@@ -1,9 +1,14 @@
 """This module contains tests for modifying image resources."""
 
 
+import hashlib
+import os
+from io import BytesIO
 from pytest import mark
+from PIL import Image as PillowImage
 from flask_app.utils import get_headers
-from app.models import Image
+from app.models import Image, Artist
+from app.api import tasks
 
 
 def test_create_new_artist_image_with_valid_data(flask_test_client, auth, user, json, db, artist):
@@ -108,3 +113,144 @@ def test_update_image_with_unknown_field_must_fail(flask_test_client, auth, user
     assert response.status == "400 BAD REQUEST"
     assert response.content_type == "application/json"
     assert response.json["message"]["new_field"] == ["Unknown field."]
+
+
+# leading bytes of a JPEG file
+JPEG_HEADER = b"\xff\xd8\xff\xe0"
+
+
+def upload_image(flask_test_client, token, artist_id, data, filename="artist.jpg"):
+    """Upload the given bytes as the image of an artist."""
+    headers = get_headers(token)
+    headers.pop("Content-Type")
+    return flask_test_client.put(
+        f"/api/v1/artists/{artist_id}/images",
+        headers=headers,
+        data={"artist_image": (BytesIO(data), filename)},
+        content_type="multipart/form-data"
+    )
+
+
+def stored_files(directory):
+    """Return the paths of all files under the given directory."""
+    return sorted(
+        os.path.join(root, filename)
+        for root, _, filenames in os.walk(directory)
+        for filename in filenames
+    )
+
+
+def test_images_are_stored_by_content_hash(flask_app, flask_test_client, auth, user, db, artist, tmp_path):
+    """Test that identical images of different artists share one stored
+    file, and that re-uploading an artist's image writes nothing.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    other_artist = Artist(name="other artist")
+    db.session.add(other_artist)
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+
+    assert upload_image(flask_test_client, token, artist.id, JPEG_HEADER + b"image bytes").status == "204 NO CONTENT"
+    assert upload_image(flask_test_client, token, other_artist.id, JPEG_HEADER + b"image bytes").status == "204 NO CONTENT"
+    files = stored_files(tmp_path)
+    assert len(files) == 1
+    digest = hashlib.sha256(JPEG_HEADER + b"image bytes").hexdigest()
+    assert files[0] == os.path.join(str(tmp_path), digest[:2], digest[2:4], f"{digest}.jpg")
+    assert artist.image.path == other_artist.image.path == files[0]
+    assert artist.image.content_hash == digest
+
+    modified_time = os.stat(files[0]).st_mtime_ns
+    updated_at = artist.image.updated_at
+    assert upload_image(flask_test_client, token, artist.id, JPEG_HEADER + b"image bytes").status == "204 NO CONTENT"
+    assert os.stat(files[0]).st_mtime_ns == modified_time
+    assert artist.image.updated_at == updated_at
+
+
+def test_replaced_image_file_is_swept_when_unreferenced(
+    flask_app, flask_test_client, auth, user, db, artist, tmp_path
+):
+    """Test that replacing an artist's image leaves the old stored file in
+    place, and that the sweep deletes it once it is past the grace period.
+    """
+    from app.api.image_store import sweep_orphaned_files
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    token = auth.register(user.username, "password", user.email)
+    upload_image(flask_test_client, token, artist.id, JPEG_HEADER + b"first image")
+    first_path = artist.image.path
+    upload_image(flask_test_client, token, artist.id, JPEG_HEADER + b"second image")
+    assert os.path.exists(first_path)
+
+    assert sweep_orphaned_files(grace_period=3600) == []
+    assert sweep_orphaned_files(grace_period=0) == [first_path]
+    assert stored_files(tmp_path) == [artist.image.path]
+
+
+def test_image_type_is_sniffed_from_its_content(flask_app, flask_test_client, auth, user, artist, tmp_path):
+    """Test that uploads are stored with the extension of their actual
+    type, and that files which are not images are rejected.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    token = auth.register(user.username, "password", user.email)
+    png = b"\x89PNG\r\n\x1a\n" + b"image bytes"
+    assert upload_image(flask_test_client, token, artist.id, png, "artist.jpg").status == "204 NO CONTENT"
+    assert artist.image.path.endswith(".png")
+
+    response = upload_image(flask_test_client, token, artist.id, b"not an image", "artist.png")
+    assert response.status == "400 BAD REQUEST"
+    assert response.json["message"] == "File is not a PNG or JPEG image."
+    assert stored_files(tmp_path) == [artist.image.path]
+
+
+def test_image_larger_than_maximum_size_must_fail(flask_app, flask_test_client, auth, user, artist, tmp_path):
+    """Test that an upload larger than MAX_IMAGE_SIZE is rejected without
+    leaving any file behind, including uploads spilled to disk.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    flask_app.config["MAX_IMAGE_SIZE"] = 1024 * 1024
+    token = auth.register(user.username, "password", user.email)
+    data = JPEG_HEADER + b"x" * (1024 * 1024)
+    response = upload_image(flask_test_client, token, artist.id, data)
+    assert response.status == "413 REQUEST ENTITY TOO LARGE"
+    assert artist.image is None
+    assert stored_files(tmp_path) == []
+
+
+def test_upload_queues_generation_of_resized_copies(
+    flask_app, flask_test_client, auth, user, db, artist, tmp_path, monkeypatch
+):
+    """Test that the resized copies of an uploaded image are generated by a
+    Celery task, and that images sharing its file share the copies.
+    """
+    flask_app.config["UPLOAD_DIRECTORY"] = str(tmp_path)
+    flask_app.config["IMAGE_DERIVATIVES_ENABLED"] = True
+    queued = []
+    monkeypatch.setattr(tasks.generate_image_derivatives, "delay", queued.append)
+    other_artist = Artist(name="other artist")
+    db.session.add(other_artist)
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+    data = BytesIO()
+    PillowImage.new("RGB", (800, 400)).save(data, "PNG")
+
+    upload_image(flask_test_client, token, artist.id, data.getvalue(), "artist.png")
+    assert queued == [artist.image.content_hash]
+    tasks.generate_image_derivatives(queued[0])
+    sizes = {
+        (derivative["width"], derivative["format"]): PillowImage.open(derivative["path"]).size
+        for derivative in artist.image.derivatives
+    }
+    assert sizes == {
+        (150, "webp"): (150, 75), (150, "jpg"): (150, 75),
+        (300, "webp"): (300, 150), (300, "jpg"): (300, 150),
+        (600, "webp"): (600, 300), (600, "jpg"): (600, 300),
+    }
+
+    upload_image(flask_test_client, token, other_artist.id, data.getvalue(), "artist.png")
+    assert len(queued) == 1
+    assert other_artist.image.derivatives == artist.image.derivatives
+    response = flask_test_client.get(
+        f"/api/v1/artists/{other_artist.id}/images", headers=get_headers(token)
+    )
+    assert [derivative["path"] for derivative in response.json[0]["derivatives"]] == [
+        derivative["path"] for derivative in artist.image.derivatives
+    ]
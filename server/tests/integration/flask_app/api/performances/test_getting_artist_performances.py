@@ -32,40 +32,40 @@ def test_getting_list_of_artist_performances_by_authorized_user(
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["performances"]), list)
-    assert set(json.loads(response.json["performances"])[0].keys()) == expected_fields
+    assert isinstance(response.json["performances"], list)
+    assert set(response.json["performances"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["performances"])[0]["id"] == performance.id
-    assert json.loads(response.json["performances"])[0]["title"] == performance.title
+    assert response.json["performances"][0]["id"] == performance.id
+    assert response.json["performances"][0]["title"] == performance.title
     assert (
-        json.loads(response.json["performances"])[0]["description"]
+        response.json["performances"][0]["description"]
         == performance.description
     )
-    assert json.loads(response.json["performances"])[0]["url"] == performance.url
+    assert response.json["performances"][0]["url"] == performance.url
     assert (
-        json.loads(response.json["performances"])[0]["start_datetime"]
+        response.json["performances"][0]["start_datetime"]
         == performance.start_datetime.strftime("%m/%d/%Y %H:%M")
     )
     assert (
-        json.loads(response.json["performances"])[0]["end_datetime"]
+        response.json["performances"][0]["end_datetime"]
         == performance.end_datetime.strftime("%m/%d/%Y %H:%M")
     )
     assert (
-        json.loads(response.json["performances"])[0]["venue"]
+        response.json["performances"][0]["venue"]
         == f"/api/v1/venues/{performance.venue.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["artist"]
+        response.json["performances"][0]["artist"]
         == f"/api/v1/artists/{performance.artist.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["uri"]
+        response.json["performances"][0]["_links"]["uri"]
         == f"/api/v1/performances/{performance.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["collection"]
+        response.json["performances"][0]["_links"]["collection"]
         == "/api/v1/performances"
     )
 
@@ -98,40 +98,40 @@ def test_filtering_list_of_artist_performances_by_date(
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["performances"]), list)
-    assert set(json.loads(response.json["performances"])[0].keys()) == expected_fields
+    assert isinstance(response.json["performances"], list)
+    assert set(response.json["performances"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["performances"])[0]["id"] == performance.id
-    assert json.loads(response.json["performances"])[0]["title"] == performance.title
+    assert response.json["performances"][0]["id"] == performance.id
+    assert response.json["performances"][0]["title"] == performance.title
     assert (
-        json.loads(response.json["performances"])[0]["description"]
+        response.json["performances"][0]["description"]
         == performance.description
     )
-    assert json.loads(response.json["performances"])[0]["url"] == performance.url
+    assert response.json["performances"][0]["url"] == performance.url
     assert (
-        json.loads(response.json["performances"])[0]["start_datetime"]
+        response.json["performances"][0]["start_datetime"]
         == performance.start_datetime.strftime("%m/%d/%Y %H:%M")
     )
     assert (
-        json.loads(response.json["performances"])[0]["end_datetime"]
+        response.json["performances"][0]["end_datetime"]
         == performance.end_datetime.strftime("%m/%d/%Y %H:%M")
     )
     assert (
-        json.loads(response.json["performances"])[0]["venue"]
+        response.json["performances"][0]["venue"]
         == f"/api/v1/venues/{performance.venue.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["artist"]
+        response.json["performances"][0]["artist"]
         == f"/api/v1/artists/{performance.artist.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["uri"]
+        response.json["performances"][0]["_links"]["uri"]
         == f"/api/v1/performances/{performance.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["collection"]
+        response.json["performances"][0]["_links"]["collection"]
         == "/api/v1/performances"
     )
 
@@ -229,3 +229,30 @@ def test_artist_not_found(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Artist could not be found."
+
+
+def test_getting_list_of_artist_performances_excludes_other_artists(
+    flask_test_client, json, auth, user, db, venue, performance
+):
+    """Test to ensure that only the performances of the given artist
+    are returned.
+    """
+    from app.models import Artist, Performance
+    other_artist = Artist(name="other artist")
+    other_performance = Performance(
+        title="other title",
+        url="http://www.jazzclub.com",
+        start_datetime=performance.start_datetime,
+        end_datetime=performance.end_datetime,
+        artist=other_artist,
+        venue=venue,
+    )
+    db.session.add(other_performance)
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/artists/{other_artist.id}/performances", headers=get_headers(token)
+    )
+    assert response.status == "200 OK"
+    assert response.json["total"] == 1
+    assert response.json["performances"][0]["id"] == other_performance.id
@@ -2,7 +2,7 @@
 
 
 from pytest import mark
-from flask_app.utils import get_headers
+from flask_app.utils import get_headers, count_queries
 
 
 def test_getting_single_performance_by_authorized_user(
@@ -83,38 +83,38 @@ def test_getting_list_of_performances_by_authorized_user(
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["performances"]), list)
-    assert set(json.loads(response.json["performances"])[0].keys()) == expected_fields
+    assert isinstance(response.json["performances"], list)
+    assert set(response.json["performances"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["performances"])[0]["id"] == performance.id
-    assert json.loads(response.json["performances"])[0]["title"] == performance.title
+    assert response.json["performances"][0]["id"] == performance.id
+    assert response.json["performances"][0]["title"] == performance.title
     assert (
-        json.loads(response.json["performances"])[0]["description"]
+        response.json["performances"][0]["description"]
         == performance.description
     )
-    assert json.loads(response.json["performances"])[0]["url"] == performance.url
-    assert json.loads(response.json["performances"])[0][
+    assert response.json["performances"][0]["url"] == performance.url
+    assert response.json["performances"][0][
         "start_datetime"
     ] == performance.start_datetime.strftime("%m/%d/%Y %H:%M")
-    assert json.loads(response.json["performances"])[0][
+    assert response.json["performances"][0][
         "end_datetime"
     ] == performance.end_datetime.strftime("%m/%d/%Y %H:%M")
     assert (
-        json.loads(response.json["performances"])[0]["venue"]
+        response.json["performances"][0]["venue"]
         == f"/api/v1/venues/{performance.venue.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["artist"]
+        response.json["performances"][0]["artist"]
         == f"/api/v1/artists/{performance.artist.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["uri"]
+        response.json["performances"][0]["_links"]["uri"]
         == f"/api/v1/performances/{performance.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["collection"]
+        response.json["performances"][0]["_links"]["collection"]
         == "/api/v1/performances"
     )
 
@@ -145,38 +145,38 @@ def test_filtering_list_of_performances_by_date(
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["performances"]), list)
-    assert set(json.loads(response.json["performances"])[0].keys()) == expected_fields
+    assert isinstance(response.json["performances"], list)
+    assert set(response.json["performances"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["performances"])[0]["id"] == performance.id
-    assert json.loads(response.json["performances"])[0]["title"] == performance.title
+    assert response.json["performances"][0]["id"] == performance.id
+    assert response.json["performances"][0]["title"] == performance.title
     assert (
-        json.loads(response.json["performances"])[0]["description"]
+        response.json["performances"][0]["description"]
         == performance.description
     )
-    assert json.loads(response.json["performances"])[0]["url"] == performance.url
-    assert json.loads(response.json["performances"])[0][
+    assert response.json["performances"][0]["url"] == performance.url
+    assert response.json["performances"][0][
         "start_datetime"
     ] == performance.start_datetime.strftime("%m/%d/%Y %H:%M")
-    assert json.loads(response.json["performances"])[0][
+    assert response.json["performances"][0][
         "end_datetime"
     ] == performance.end_datetime.strftime("%m/%d/%Y %H:%M")
     assert (
-        json.loads(response.json["performances"])[0]["venue"]
+        response.json["performances"][0]["venue"]
         == f"/api/v1/venues/{performance.venue.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["artist"]
+        response.json["performances"][0]["artist"]
         == f"/api/v1/artists/{performance.artist.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["uri"]
+        response.json["performances"][0]["_links"]["uri"]
         == f"/api/v1/performances/{performance.id}"
     )
     assert (
-        json.loads(response.json["performances"])[0]["_links"]["collection"]
+        response.json["performances"][0]["_links"]["collection"]
         == "/api/v1/performances"
     )
 
@@ -268,3 +268,125 @@ def test_performance_not_found(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Performance could not be found."
+
+
+def test_getting_list_of_performances_with_cursor(
+    flask_test_client, json, auth, user, performance
+):
+    """Test to ensure that a list of performance resources can be
+    retrieved by seeking with a cursor instead of a page number.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/performances",
+        headers=get_headers(token),
+        query_string={"cursor": "", "per_page": 10},
+    )
+    assert response.status == "200 OK"
+    assert response.content_type == "application/json"
+    assert set(response.json.keys()) == {"performances", "prev", "next"}
+    assert response.json["prev"] is None
+    assert response.json["next"] is None
+    assert response.json["performances"][0]["id"] == performance.id
+
+
+def test_getting_list_of_performances_with_cursor_and_total(
+    flask_test_client, auth, user, performance
+):
+    """Test to ensure that the total number of performance resources is
+    only counted in cursor mode when it is asked for.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/performances",
+        headers=get_headers(token),
+        query_string={"cursor": "", "include_total": "true"},
+    )
+    assert response.status == "200 OK"
+    assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
+    assert response.json["total"] == 1
+
+
+def test_getting_list_of_performances_with_invalid_cursor_must_fail(
+    flask_test_client, auth, user
+):
+    """Test that a 400 http status is returned when an invalid
+    cursor is sent to the api.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/performances",
+        headers=get_headers(token),
+        query_string={"cursor": "not a cursor"},
+    )
+    assert response.status == "400 BAD REQUEST"
+    assert response.content_type == "application/json"
+    assert response.json["message"]["cursor"] == "Invalid cursor."
+
+
+def test_filtering_list_of_performances_by_date_includes_whole_end_date(
+    flask_test_client, auth, user, db, performance, json
+):
+    """Test to ensure that performances starting late on the end date are
+    included when filtering by date, while those on the next day are not.
+    """
+    from datetime import datetime
+    performance.start_datetime = datetime(2020, 4, 12, 23, 59)
+    db.session.commit()
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/performances",
+        headers=get_headers(token),
+        query_string={"start_date": "04/11/2020", "end_date": "04/12/2020"},
+    )
+    assert response.status == "200 OK"
+    assert response.json["total"] == 1
+    response = flask_test_client.get(
+        f"/api/v1/performances",
+        headers=get_headers(token),
+        query_string={"start_date": "04/13/2020", "end_date": "04/14/2020"},
+    )
+    assert response.status == "200 OK"
+    assert response.json["total"] == 0
+
+
+def test_getting_list_of_performances_does_not_load_artists_or_venues(
+    flask_test_client, auth, user, db, performance
+):
+    """Test to ensure that the artist and venue links of a page of performances
+    are built without loading the artists and venues.
+    """
+    db.session.expire_all()
+    token = auth.register(user.username, "password", user.email)
+    with count_queries(db) as statements:
+        response = flask_test_client.get(f"/api/v1/performances", headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert response.json["performances"][0]["artist"] == f"/api/v1/artists/{performance.artist_id}"
+    # the user of the token, collection version and performances
+    assert len(statements) == 3
+
+
+def test_getting_unchanged_list_of_performances_returns_not_modified(
+    flask_test_client, auth, user, db, performance
+):
+    """Test to ensure that a collection of performances gets a weak ETag
+    and that a 304 status is returned until the collection changes.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(f"/api/v1/performances", headers=get_headers(token))
+    assert response.status == "200 OK"
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    headers = get_headers(token)
+    headers["If-None-Match"] = etag
+    with count_queries(db) as statements:
+        response = flask_test_client.get(f"/api/v1/performances", headers=headers)
+    assert response.status == "304 NOT MODIFIED"
+    assert len(statements) == 1
+
+    db.session.delete(performance)
+    db.session.commit()
+    response = flask_test_client.get(f"/api/v1/performances", headers=headers)
+    assert response.status == "200 OK"
+    assert response.json["performances"] == []
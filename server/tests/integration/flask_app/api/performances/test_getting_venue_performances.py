@@ -0,0 +1,84 @@
+"""This module contains tests for sending GET requests to the performances subcollection
+of a venue.
+"""
+
+
+from flask_app.utils import get_headers
+
+
+def test_getting_list_of_venue_performances_by_authorized_user(
+    flask_test_client, json, auth, user, venue, performance
+):
+    """Test to ensure that a list of performance resources at a venue can be
+    successfully retrieved.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/venues/{venue.id}/performances", headers=get_headers(token)
+    )
+    assert response.status == "200 OK"
+    assert response.content_type == "application/json"
+    assert set(response.json.keys()) == {"performances", "prev", "next", "total"}
+    assert response.json["total"] == 1
+    assert response.json["performances"][0]["id"] == performance.id
+    assert (
+        response.json["performances"][0]["venue"]
+        == f"/api/v1/venues/{venue.id}"
+    )
+
+
+def test_filtering_list_of_venue_performances_by_date_and_title(
+    flask_test_client, json, auth, user, venue, performance
+):
+    """Test to ensure that the performances at a venue can be filtered
+    by date and title.
+    """
+    token = auth.register(user.username, "password", user.email)
+    query_string = {
+        "start_date": performance.start_datetime.strftime("%m/%d/%Y"),
+        "end_date": performance.end_datetime.strftime("%m/%d/%Y"),
+        "title": performance.title.upper(),
+    }
+    response = flask_test_client.get(
+        f"/api/v1/venues/{venue.id}/performances",
+        headers=get_headers(token),
+        query_string=query_string,
+    )
+    assert response.status == "200 OK"
+    assert response.json["total"] == 1
+
+    query_string["title"] = "no such title"
+    response = flask_test_client.get(
+        f"/api/v1/venues/{venue.id}/performances",
+        headers=get_headers(token),
+        query_string=query_string,
+    )
+    assert response.status == "200 OK"
+    assert response.json["total"] == 0
+
+
+def test_getting_list_of_venue_performances_without_token_must_fail(
+    flask_test_client, venue
+):
+    """Test to ensure that an unauthorized user (no token) cannot get
+    performance resources
+    """
+    response = flask_test_client.get(
+        f"/api/v1/venues/{venue.id}/performances", headers=get_headers()  # no token
+    )
+    assert response.status == "401 UNAUTHORIZED"
+    assert response.content_type == "application/json"
+    assert response.json["message"] == "Access token is invalid or expired."
+
+
+def test_venue_not_found(flask_test_client, auth, user):
+    """Test to ensure that a 404 response is returned
+    if a venue resource does not exist.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.get(
+        f"/api/v1/venues/100/performances", headers=get_headers(token)
+    )
+    assert response.status == "404 NOT FOUND"
+    assert response.content_type == "application/json"
+    assert response.json["message"] == "Venue could not be found."
@@ -74,6 +74,40 @@ def test_create_new_performance_with_valid_data(
 
 
 #need to consider putting this in a separate file
+def test_create_existing_performance_updates_it_only_if_changed(
+    flask_test_client, auth, user, performance, json, db
+):
+    """Test that sending a performance with the venue, artist and start time
+    of a stored one updates it instead of creating a duplicate, and that
+    nothing is written if its content is unchanged.
+    """
+    performance_object = {
+        "title": performance.title,
+        "description": performance.description,
+        "url": performance.url,
+        "start_datetime": performance.start_datetime.strftime("%m/%d/%Y %H:%M"),
+        "end_datetime": performance.end_datetime.strftime("%m/%d/%Y %H:%M"),
+        "venue_id": performance.venue_id,
+        "artist_id": performance.artist_id,
+    }
+    updated_at = performance.updated_at
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.post(
+        "/api/v1/performances", headers=get_headers(token), data=json.dumps(performance_object)
+    )
+    assert response.status == "200 OK"
+    assert response.json["id"] == performance.id
+    assert performance.updated_at == updated_at
+
+    performance_object["title"] = "Changed title"
+    response = flask_test_client.post(
+        "/api/v1/performances", headers=get_headers(token), data=json.dumps(performance_object)
+    )
+    assert response.status == "200 OK"
+    assert performance.title == "Changed title"
+    assert Performance.query.count() == 1
+
+
 @mark.parametrize(
     "test_input, expected",
     [
@@ -502,3 +536,102 @@ def test_delete_performance_not_found_must_fail(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Performance could not be found."
+
+
+def test_create_performances_in_bulk(flask_test_client, auth, user, artist, venue, json, db):
+    """Test that a batch of performances can be created along with the
+    venues and artists that do not exist yet, and that sending the
+    same batch again does not create duplicates.
+    """
+    new_venue = {
+        "name": "New Jazz Club",
+        "street_address": "100 Market St.",
+        "city": "Philadelphia",
+        "state": "PA",
+        "zip_code": "19106",
+    }
+    performance_objects = [
+        {
+            "title": "Existing artist at an existing venue",
+            "url": "http://www.testperformance.com",
+            "start_datetime": "04/12/2020 10:00",
+            "end_datetime": "04/12/2020 12:00",
+            "venue": {
+                "name": venue.name,
+                "street_address": venue.street_address,
+                "city": venue.city,
+                "state": venue.state,
+                "zip_code": venue.zip_code,
+            },
+            "artist": {"name": artist.name},
+        },
+        {
+            "title": "New artist at a new venue",
+            "description": "New test performance description.",
+            "url": "http://www.testperformance.com",
+            "start_datetime": "04/13/2020 10:00",
+            "end_datetime": "04/13/2020 12:00",
+            "venue": new_venue,
+            "artist": {"name": "new artist", "website": "http://www.newartist.com"},
+        },
+    ]
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.post(
+        "/api/v1/performances/bulk",
+        headers=get_headers(token),
+        data=json.dumps(performance_objects),
+    )
+    assert response.status == "200 OK"
+    results = response.json["performances"]
+    assert [result["status"] for result in results] == ["created", "created"]
+    assert results[0]["artist_id"] == artist.id
+    assert results[0]["venue_id"] == venue.id
+    assert results[1]["artist_id"] != artist.id
+    assert results[1]["venue_id"] != venue.id
+    assert Performance.query.count() == 2
+
+    response = flask_test_client.post(
+        "/api/v1/performances/bulk",
+        headers=get_headers(token),
+        data=json.dumps(performance_objects),
+    )
+    assert response.status == "200 OK"
+    assert [result["status"] for result in response.json["performances"]] == [
+        "unchanged",
+        "unchanged",
+    ]
+    assert [result["id"] for result in response.json["performances"]] == [
+        result["id"] for result in results
+    ]
+    assert Performance.query.count() == 2
+
+    performance_objects[1]["description"] = "Changed description."
+    response = flask_test_client.post(
+        "/api/v1/performances/bulk",
+        headers=get_headers(token),
+        data=json.dumps(performance_objects),
+    )
+    assert [result["status"] for result in response.json["performances"]] == [
+        "unchanged",
+        "updated",
+    ]
+    assert Performance.query.get(results[1]["id"]).description == "Changed description."
+    assert Performance.query.count() == 2
+
+
+def test_create_performances_in_bulk_with_invalid_data_must_fail(
+    flask_test_client, auth, user, json
+):
+    """Test that no performances are created if any performance
+    in the batch is invalid.
+    """
+    token = auth.register(user.username, "password", user.email)
+    response = flask_test_client.post(
+        "/api/v1/performances/bulk",
+        headers=get_headers(token),
+        data=json.dumps([{"title": "Performance without a venue or artist"}]),
+    )
+    assert response.status == "400 BAD REQUEST"
+    assert "venue" in response.json["message"]["0"]
+    assert "artist" in response.json["message"]["0"]
+    assert Performance.query.count() == 0
@@ -53,17 +53,17 @@ def test_getting_list_of_users_by_authorized_user(flask_test_client, json, auth,
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == expected_fields
-    assert isinstance(json.loads(response.json["users"]), list)
-    assert set(json.loads(response.json["users"])[0].keys()) == expected_user_fields
+    assert isinstance(response.json["users"], list)
+    assert set(response.json["users"][0].keys()) == expected_user_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["users"])[0]["id"] == user.id
-    assert json.loads(response.json["users"])[0]["username"] == user.username
-    assert json.loads(response.json["users"])[0]["email"] == user.email
-    assert json.loads(response.json["users"])[0].get("password") is None
-    assert json.loads(response.json["users"])[0]["_links"]["uri"] == f"/api/v1/users/{user.id}"    
-    assert json.loads(response.json["users"])[0]["_links"]["collection"] == "/api/v1/users"
+    assert response.json["users"][0]["id"] == user.id
+    assert response.json["users"][0]["username"] == user.username
+    assert response.json["users"][0]["email"] == user.email
+    assert response.json["users"][0].get("password") is None
+    assert response.json["users"][0]["_links"]["uri"] == f"/api/v1/users/{user.id}"    
+    assert response.json["users"][0]["_links"]["collection"] == "/api/v1/users"
 
 
 def test_getting_list_of_users_without_token_must_fail(flask_test_client):
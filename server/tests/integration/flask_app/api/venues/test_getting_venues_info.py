@@ -2,7 +2,7 @@
 
 
 from pytest import mark
-from flask_app.utils import get_headers
+from flask_app.utils import get_headers, count_queries
 
 
 def test_getting_single_venue_by_authorized_user(flask_test_client, venue, auth, user):
@@ -94,20 +94,20 @@ def test_getting_list_of_venues_by_authorized_user(flask_test_client, json, auth
     assert response.status == "200 OK"
     assert response.content_type == "application/json"
     assert set(response.json.keys()) == {"venues", "prev", "next", "total"}
-    assert isinstance(json.loads(response.json["venues"]), list)
-    assert set(json.loads(response.json["venues"])[0].keys()) == expected_fields
+    assert isinstance(response.json["venues"], list)
+    assert set(response.json["venues"][0].keys()) == expected_fields
     assert response.json["total"] == 1
     assert response.json["prev"] is None
     assert response.json["next"] is None
-    assert json.loads(response.json["venues"])[0]["id"] == venue.id
-    assert json.loads(response.json["venues"])[0]["name"] == venue.name
-    assert json.loads(response.json["venues"])[0]["street_address"] == venue.street_address
-    assert json.loads(response.json["venues"])[0]["city"] == venue.city
-    assert json.loads(response.json["venues"])[0]["state"] == venue.state
-    assert json.loads(response.json["venues"])[0]["zip_code"] == venue.zip_code
-    assert json.loads(response.json["venues"])[0]["performances"] == venue.performances.all()
-    assert json.loads(response.json["venues"])[0]["_links"]["uri"] == f"/api/v1/venues/{venue.id}"    
-    assert json.loads(response.json["venues"])[0]["_links"]["collection"] == "/api/v1/venues"
+    assert response.json["venues"][0]["id"] == venue.id
+    assert response.json["venues"][0]["name"] == venue.name
+    assert response.json["venues"][0]["street_address"] == venue.street_address
+    assert response.json["venues"][0]["city"] == venue.city
+    assert response.json["venues"][0]["state"] == venue.state
+    assert response.json["venues"][0]["zip_code"] == venue.zip_code
+    assert response.json["venues"][0]["performances"] == venue.performances.all()
+    assert response.json["venues"][0]["_links"]["uri"] == f"/api/v1/venues/{venue.id}"    
+    assert response.json["venues"][0]["_links"]["collection"] == "/api/v1/venues"
 
 
 def test_getting_list_of_venues_without_token_must_fail(flask_test_client):
@@ -135,4 +135,39 @@ def test_venue_not_found(flask_test_client, auth, user):
     assert response.status == "404 NOT FOUND"
     assert response.content_type == "application/json"
     assert response.json["message"] == "Venue could not be found."
-    
\ No newline at end of file
+    
+
+def test_getting_list_of_venues_does_not_query_per_venue(flask_test_client, auth, user, db, artist):
+    """Test to ensure that the performances of a page of venues are
+    loaded in bulk instead of with an extra query for every venue.
+    """
+    from datetime import datetime
+    from app.models import Venue, Performance
+    for number in range(5):
+        venue = Venue(
+            name=f"venue {number}",
+            street_address=f"{number} S. Broad St.",
+            city="Philadelphia",
+            state="PA",
+            zip_code="19121",
+        )
+        db.session.add(
+            Performance(
+                title=f"title {number}",
+                url="http://www.jazzclub.com",
+                start_datetime=datetime(2020, 4, 12, 20),
+                end_datetime=datetime(2020, 4, 12, 22),
+                artist=artist,
+                venue=venue
+            )
+        )
+    db.session.commit()
+    db.session.expire_all()
+    token = auth.register(user.username, "password", user.email)
+    with count_queries(db) as statements:
+        response = flask_test_client.get(f"/api/v1/venues", headers=get_headers(token))
+    assert response.status == "200 OK"
+    assert all(len(venue["performances"]) == 1 for venue in response.json["venues"])
+    # the user of the token, collection version, venues and their
+    # performance ids
+    assert len(statements) == 4
@@ -1,7 +1,9 @@
 """This module contains helper functions for testing."""
 
 import json
+from contextlib import contextmanager
 from datetime import datetime
+from sqlalchemy import event
 
 
 class AuthActions(object):
@@ -32,3 +34,20 @@ def get_headers(token=None):
     else:
         headers = {"Content-Type": "application/json", "Accept": "application/json"}
     return headers
+
+
+@contextmanager
+def count_queries(db):
+    """Context manager that yields a list of the SQL statements
+    executed against the given database while it is open.
+    """
+    statements = []
+
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record_statement)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record_statement)
@@ -0,0 +1,42 @@
+"""This module contains unit tests for the response cache."""
+
+
+from unittest.mock import MagicMock
+from flask import Flask
+from app.cache import cache_key
+
+
+def make_app():
+    """Return a bare application instance with a mocked Redis client."""
+    app = Flask(__name__)
+    app.add_url_rule("/artists/<int:artist_id>/performances", endpoint="artist_performances")
+    app.redis = MagicMock()
+    app.redis.mget.return_value = [b"3", None]
+    return app
+
+
+def test_cache_key_ignores_query_string_order():
+    """Test that the same query string parameters sent in a different
+    order produce the same cache key.
+    """
+    app = make_app()
+    with app.test_request_context("/artists/1/performances?page=2&per_page=10"):
+        first_key = cache_key(("performances", "artists"))
+    with app.test_request_context("/artists/1/performances?per_page=10&page=2"):
+        second_key = cache_key(("performances", "artists"))
+    assert first_key == second_key
+    assert first_key.startswith("response_cache:artist_performances:")
+
+
+def test_cache_key_changes_with_view_args_and_generations():
+    """Test that the cache key changes when the view arguments or the
+    generation of one of the tables change.
+    """
+    app = make_app()
+    with app.test_request_context("/artists/1/performances"):
+        key = cache_key(("performances", "artists"))
+    with app.test_request_context("/artists/2/performances"):
+        assert cache_key(("performances", "artists")) != key
+    app.redis.mget.return_value = [b"4", None]
+    with app.test_request_context("/artists/1/performances"):
+        assert cache_key(("performances", "artists")) != key
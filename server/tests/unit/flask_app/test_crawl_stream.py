@@ -0,0 +1,92 @@
+"""This module contains tests for following a crawl task as a stream of
+Server-Sent Events.
+"""
+
+
+from unittest.mock import MagicMock, patch
+from flask import Blueprint, Flask
+from flask_restful import Api
+from app.api.resources import crawl
+from app.api.resources.crawl import CrawlTaskStatusAPI, CrawlTaskStatusStreamAPI
+
+
+def create_stream_client(max_streams=4):
+    """Return a test client of an application with only the crawl status
+    endpoints.
+    """
+    app = Flask(__name__)
+    app.config["CRAWL_STATUS_MAX_STREAMS"] = max_streams
+    blueprint = Blueprint("api", __name__)
+    api = Api(blueprint)
+    api.add_resource(CrawlTaskStatusAPI, "/crawl_status/<task_id>", endpoint="crawl_status")
+    api.add_resource(CrawlTaskStatusStreamAPI, "/crawl_status/<task_id>/stream")
+    app.register_blueprint(blueprint)
+    return app.test_client()
+
+
+def backend_task(status, info=None):
+    """Return a Celery result with the given status."""
+    return MagicMock(status=status, info=info)
+
+
+def test_stream_sends_events_until_the_task_finishes():
+    """Test that the events of a recorded task are streamed as they are
+    followed, with heartbeats as comments.
+    """
+    events = [("status", {"status": "STARTED"}), None, ("status", {"status": "SUCCESS"})]
+    with patch.object(crawl, "get_status", return_value={"status": "STARTED"}), \
+            patch.object(crawl, "follow_status", return_value=iter(events)) as follow_status:
+        response = create_stream_client().get("/crawl_status/abc/stream")
+        body = response.get_data(as_text=True)
+        response.close()
+    follow_status.assert_called_once_with("abc")
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert body == (
+        'event: status\ndata: {"status": "STARTED"}\n\n'
+        ": heartbeat\n\n"
+        'event: status\ndata: {"status": "SUCCESS"}\n\n'
+    )
+
+
+def test_stream_of_expired_task_sends_its_backend_status():
+    """Test that a task whose record has expired gets a single event with
+    its status from the Celery result backend.
+    """
+    with patch.object(crawl, "get_status", return_value=None), \
+            patch.object(crawl, "follow_status") as follow_status, \
+            patch.object(crawl.start_crawl, "AsyncResult", return_value=backend_task("SUCCESS", {"items": 2})):
+        response = create_stream_client().get("/crawl_status/abc/stream")
+        body = response.get_data(as_text=True)
+    follow_status.assert_not_called()
+    assert response.status_code == 200
+    assert body == 'event: status\ndata: {"status": "SUCCESS", "result": {"items": 2}}\n\n'
+
+
+def test_stream_of_unknown_task_is_not_found():
+    """Test that a task without a record or a backend state is not found
+    instead of being followed forever.
+    """
+    with patch.object(crawl, "get_status", return_value=None), \
+            patch.object(crawl, "follow_status") as follow_status, \
+            patch.object(crawl.start_crawl, "AsyncResult", return_value=backend_task("PENDING")):
+        response = create_stream_client().get("/crawl_status/missing/stream")
+    follow_status.assert_not_called()
+    assert response.status_code == 404
+    assert response.json == {"message": "Crawl task not found."}
+
+
+def test_streams_beyond_the_limit_are_refused():
+    """Test that a process refuses streams once it has the configured
+    number open, and accepts them again once one is closed.
+    """
+    client = create_stream_client(max_streams=1)
+    with patch.object(crawl, "get_status", return_value={"status": "STARTED"}), \
+            patch.object(crawl, "follow_status", side_effect=lambda task_id: iter([None])):
+        first = client.get("/crawl_status/abc/stream", buffered=False)
+        assert first.status_code == 200
+        refused = client.get("/crawl_status/def/stream")
+        assert refused.status_code == 503
+        assert refused.json["uri"] == "/crawl_status/def"
+        first.close()
+        assert client.get("/crawl_status/def/stream").status_code == 200
@@ -0,0 +1,52 @@
+"""This module contains tests for the WSGI middleware."""
+
+
+import gzip
+from flask import Flask, request
+from app.middleware import GzipRequestMiddleware
+
+
+def create_echo_app(max_size):
+    """Return an application that echoes the JSON request body."""
+    app = Flask(__name__)
+    app.wsgi_app = GzipRequestMiddleware(app.wsgi_app, max_size=max_size)
+
+    @app.route("/", methods=["POST"])
+    def echo():
+        return request.get_json()
+
+    return app
+
+
+def test_gzip_request_body_is_decompressed():
+    """Test that a gzipped JSON body reaches the view decompressed."""
+    client = create_echo_app(max_size=1024).test_client()
+    response = client.post(
+        "/",
+        data=gzip.compress(b'{"name": "test artist"}'),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 200
+    assert response.json == {"name": "test artist"}
+
+
+def test_gzip_request_body_over_max_size_must_fail():
+    """Test that a body that decompresses past the limit is rejected."""
+    client = create_echo_app(max_size=10).test_client()
+    response = client.post(
+        "/",
+        data=gzip.compress(b'{"name": "test artist"}'),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 413
+
+
+def test_invalid_gzip_request_body_must_fail():
+    """Test that a body that is not valid gzip is rejected."""
+    client = create_echo_app(max_size=1024).test_client()
+    response = client.post(
+        "/",
+        data=b"not gzip",
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+"""This module contains unit tests for the status records of crawl tasks."""
+
+
+from unittest.mock import MagicMock, patch
+from app.celery_app import task_status
+
+
+def test_recorded_fields_are_returned_decoded():
+    """Test that the fields recorded with a status are returned as they
+    were given, and that a task without a record has no status.
+    """
+    redis = MagicMock()
+    with patch.object(task_status, "_redis", redis):
+        task_status.record_status("abc", "SUCCESS", result={"item_scraped_count": 3})
+        redis.pipeline().hset.assert_called_once_with(
+            "crawl_status:abc",
+            mapping={"status": "SUCCESS", "result": '{"item_scraped_count": 3}'}
+        )
+        redis.hgetall.return_value = {
+            b"status": b"SUCCESS",
+            b"spider": b'"time"',
+            b"result": b'{"item_scraped_count": 3}'
+        }
+        assert task_status.get_status("abc") == {
+            "status": "SUCCESS",
+            "spider": "time",
+            "result": {"item_scraped_count": 3}
+        }
+        redis.hgetall.return_value = {}
+        assert task_status.get_status("missing") is None
+
+
+def test_following_ends_when_the_record_expires():
+    """Test that following a task sends its current record, a heartbeat
+    while the record exists, and ends once the record has expired.
+    """
+    redis = MagicMock()
+    redis.hgetall.return_value = {b"status": b"STARTED", b"progress": b'{"items_scraped": 1}'}
+    redis.pubsub().get_message.return_value = None
+    redis.exists.side_effect = [1, 0]
+    with patch.object(task_status, "_redis", redis):
+        events = list(task_status.follow_status("abc", heartbeat=0))
+    assert events == [("status", {"status": "STARTED"}), ("progress", {"items_scraped": 1}), None]
+    redis.pubsub().close.assert_called_once_with()
+
+
+def test_redis_calls_time_out_quickly():
+    """Test that the status records give up on a slow Redis after the
+    configured timeout, since crawls publish their progress on the reactor
+    thread.
+    """
+    with patch.object(task_status, "_redis", None), \
+            patch.object(task_status.CeleryConfig, "CRAWL_STATUS_REDIS_TIMEOUT", 0.5):
+        connection_kwargs = task_status.get_redis().connection_pool.connection_kwargs
+    assert connection_kwargs["socket_connect_timeout"] == 0.5
+    assert connection_kwargs["socket_timeout"] == 0.5
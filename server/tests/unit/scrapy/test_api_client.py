@@ -0,0 +1,31 @@
+"""This module contains tests for the Flask API client."""
+
+
+import gzip
+import json
+from unittest.mock import MagicMock
+from app.performance_scraper.performance_scraper.flask_api.api_client import FlaskAPIClient
+from app.performance_scraper.performance_scraper.flask_api.auth import AuthManager
+
+
+def test_client_shares_session_with_auth_manager():
+    """Test that the client sends its calls through the auth manager's
+    pooled session, with the configured timeouts.
+    """
+    session = MagicMock()
+    session.request.return_value.json.return_value = {"id": 1}
+    auth_manager = AuthManager("scrapy", "password", "scrapy@gmail.com", "token.json", session=session)
+    client = FlaskAPIClient(token="token", auth_manager=auth_manager, timeout=(3, 30))
+    assert client.get_venue_by_name("Heritage") == {"id": 1}
+    assert session.request.call_args[1]["timeout"] == (3, 30)
+
+
+def test_client_gzips_request_bodies():
+    """Test that JSON request bodies are gzipped if enabled."""
+    session = MagicMock()
+    session.request.return_value.json.return_value = {"id": 1}
+    client = FlaskAPIClient(token="token", session=session, gzip_requests=True)
+    client.create_artist({"name": "test artist"})
+    kwargs = session.request.call_args[1]
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(kwargs["data"])) == {"name": "test artist"}
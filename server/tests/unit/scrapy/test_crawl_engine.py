@@ -0,0 +1,88 @@
+"""This module contains tests for the engine that runs crawls for the
+Celery tasks.
+"""
+
+
+import pytest
+from scrapy import Spider, signals
+from scrapy.exceptions import DontCloseSpider
+from scrapy.settings import Settings
+from app.performance_scraper.performance_scraper.crawl_engine import CrawlEngine
+
+
+class EmptySpider(Spider):
+    """Spider that finishes without sending any requests."""
+
+    name = "empty"
+
+
+class OtherSpider(Spider):
+    """Another spider that finishes without sending any requests."""
+
+    name = "other"
+
+
+class BrokenSpider(Spider):
+    """Spider that cannot be created."""
+
+    name = "broken"
+
+    def __init__(self, *args, **kwargs):
+        raise ValueError("broken spider")
+
+
+class HungSpider(Spider):
+    """Spider that never finishes on its own."""
+
+    name = "hung"
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.keep_open, signal=signals.spider_idle)
+        return spider
+
+    def keep_open(self):
+        raise DontCloseSpider
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Fixture that returns a running crawl engine, which is stopped
+    once the tests of the module have run.
+    """
+    engine = CrawlEngine(Settings({"TELNETCONSOLE_ENABLED": False, "LOG_ENABLED": False}))
+    yield engine
+    engine.stop(timeout=10)
+    assert not engine.running
+
+
+def test_crawls_share_one_reactor(engine):
+    """Test that several crawls run one after another in the same reactor,
+    which could not be restarted if it had stopped.
+    """
+    first = engine.crawl(EmptySpider, timeout=10)
+    assert first["empty"]["finish_reason"] == "finished"
+    assert isinstance(first["empty"]["start_time"], str)
+    assert engine.running
+    second = engine.crawl(EmptySpider, OtherSpider, timeout=10)
+    assert set(second) == {"empty", "other"}
+
+
+def test_crawl_errors_are_raised_in_the_caller(engine):
+    """Test that the error of a failed crawl is raised by crawl, and that
+    the engine keeps running.
+    """
+    with pytest.raises(ValueError, match="broken spider"):
+        engine.crawl(BrokenSpider, timeout=10)
+    assert engine.crawl(EmptySpider, timeout=10)["empty"]["finish_reason"] == "finished"
+
+
+def test_crawls_that_time_out_are_stopped(engine):
+    """Test that crawl raises TimeoutError for crawls that do not finish in
+    time, and stops them so that they do not keep running in the reactor.
+    """
+    with pytest.raises(TimeoutError):
+        engine.crawl(HungSpider, timeout=0.5)
+    assert engine.crawl(EmptySpider, timeout=10)["empty"]["finish_reason"] == "finished"
+    assert not engine._runner.crawlers
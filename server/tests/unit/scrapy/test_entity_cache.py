@@ -0,0 +1,46 @@
+"""This module contains tests for the entity cache used during crawls."""
+
+
+from unittest.mock import MagicMock
+from app.performance_scraper.performance_scraper.entity_cache import EntityCache
+
+
+def test_names_are_normalized():
+    """Test that names differing in case and whitespace share an entry."""
+    cache = EntityCache()
+    cache.set("artist", "Test  Artist", 1)
+    assert cache.get("artist", "test artist") == (True, 1)
+    assert cache.get("venue", "test artist") == (False, None)
+
+
+def test_missing_entities_are_cached():
+    """Test that an entity the API doesn't have is cached as None."""
+    cache = EntityCache()
+    cache.set("venue", "Heritage", None)
+    assert cache.get("venue", "Heritage") == (True, None)
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Test that the cache holds no more than max_size entries."""
+    cache = EntityCache(max_size=2)
+    cache.set("artist", "first", 1)
+    cache.set("artist", "second", 2)
+    cache.get("artist", "first")
+    cache.set("artist", "third", 3)
+    assert cache.get("artist", "second") == (False, None)
+    assert cache.get("artist", "first") == (True, 1)
+
+
+def test_ids_are_shared_through_redis():
+    """Test that ids are written to and read from Redis, but missing
+    entities are not.
+    """
+    redis = MagicMock()
+    cache = EntityCache(redis=redis, ttl=60)
+    cache.set("artist", "Test Artist", 1)
+    redis.set.assert_called_once_with("entity_cache:artist:test artist", 1, ex=60)
+    cache.set("artist", "missing", None)
+    assert redis.set.call_count == 1
+
+    redis.get.return_value = b"7"
+    assert EntityCache(redis=redis).get("venue", "Heritage") == (True, 7)
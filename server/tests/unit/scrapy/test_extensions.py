@@ -0,0 +1,45 @@
+"""This module contains tests for the crawl progress extension."""
+
+
+from unittest.mock import patch
+from scrapy import Spider
+from scrapy.utils.test import get_crawler
+from app.performance_scraper.performance_scraper import extensions
+from app.performance_scraper.performance_scraper.extensions import CrawlProgress
+
+
+def test_progress_is_published_when_it_changes():
+    """Test that the counters of a crawl started by a task are published
+    only when they change, and once more when the spider closes.
+    """
+    crawler = get_crawler(Spider, {"CRAWL_PROGRESS_INTERVAL": 60})
+    spider = Spider("progress", task_id="abc")
+    crawler.stats.open_spider(spider)
+    extension = CrawlProgress.from_crawler(crawler)
+    with patch.object(extensions, "publish_progress") as publish_progress:
+        extension.spider_opened(spider)
+        extension.item_scraped({}, spider)
+        extension.item_scraped({}, spider)
+        extension.item_dropped({}, spider)
+        crawler.stats.inc_value("api_batch/items_sent", spider=spider)
+        extension.publish(spider)
+        extension.publish(spider)
+        extension.spider_closed(spider, "finished")
+    assert publish_progress.call_count == 3
+    task_id, progress = publish_progress.call_args[0]
+    assert task_id == "abc"
+    assert progress["items_scraped"] == 2
+    assert progress["items_dropped"] == 1
+    assert progress["items_stored"] == 1
+    assert progress["finish_reason"] == "finished"
+
+
+def test_spiders_without_a_task_are_not_followed():
+    """Test that nothing is published for spiders not started by a task."""
+    crawler = get_crawler(Spider, {"CRAWL_PROGRESS_INTERVAL": 60})
+    spider = Spider("progress")
+    extension = CrawlProgress.from_crawler(crawler)
+    with patch.object(extensions, "publish_progress") as publish_progress:
+        extension.spider_opened(spider)
+        extension.spider_closed(spider, "finished")
+    publish_progress.assert_not_called()
@@ -0,0 +1,207 @@
+"""This module contains tests for the Scrapy item pipelines."""
+
+
+import json
+import pytest
+from unittest.mock import MagicMock
+from twisted.internet import defer
+from scrapy import Spider
+from scrapy.utils.test import get_crawler
+from app.performance_scraper.performance_scraper.pipelines import APIPipeline, BatchAPIPipeline
+from app.performance_scraper.performance_scraper.flask_api.exceptions import FlaskAPIException
+
+
+@pytest.fixture
+def performance_item():
+    """Fixture that returns a scraped performance item."""
+    return {
+        "title": "test title",
+        "url": "http://www.jazzclub.com",
+        "start_datetime": "04/12/2020 20:00",
+        "end_datetime": "04/12/2020 22:00",
+        "venue": {
+            "name": "Eric's Jazzhaus",
+            "street_address": "400 S. Broad St.",
+            "city": "Philadelphia",
+            "state": "PA",
+            "zip_code": "19121",
+        },
+        "artist": {"name": "test artist", "image": {"url": "http://www.jazzclub.com/a.jpg"}},
+    }
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """Fixture that returns a batching pipeline with a mocked api client."""
+    crawler = get_crawler(
+        Spider,
+        {"API_BATCH_SIZE": 2, "API_BATCH_TIMEOUT": 10, "API_DEAD_LETTER_PATH": str(tmp_path / "dead_letters.jsonl")},
+    )
+    crawler.stats.open_spider(None)
+    api_client = MagicMock()
+    api_client.create_performances.side_effect = lambda documents: defer.succeed({
+        "performances": [
+            {"id": number, "status": "created", "artist_id": 1, "venue_id": 1}
+            for number, _ in enumerate(documents, 1)
+        ]
+    })
+    return BatchAPIPipeline(api_client, crawler.stats, crawler.settings)
+
+
+def test_batch_is_sent_when_full(pipeline, performance_item):
+    """Test that items are sent in one request once the batch is full."""
+    spider = Spider("test")
+    pipeline.process_item(performance_item, spider)
+    pipeline._api_client.create_performances.assert_not_called()
+    result = pipeline.process_item(performance_item, spider)
+    assert isinstance(result, defer.Deferred)
+    assert result.result == performance_item
+    pipeline._api_client.create_performances.assert_called_once()
+    documents = pipeline._api_client.create_performances.call_args[0][0]
+    assert len(documents) == 2
+    assert documents[0]["venue"]["name"] == "Eric's Jazzhaus"
+    assert documents[0]["artist"] == {"name": "test artist"}
+    assert pipeline._stats.get_value("api_batch/flushes") == 1
+    assert pipeline._stats.get_value("api_batch/items_created") == 2
+
+
+def test_remaining_items_are_sent_when_spider_closes(pipeline, performance_item):
+    """Test that a partial batch is sent when the spider closes."""
+    spider = Spider("test")
+    pipeline.process_item(performance_item, spider)
+    pipeline.close_spider(spider)
+    pipeline._api_client.create_performances.assert_called_once()
+    assert pipeline._stats.get_value("api_batch/items_sent") == 1
+
+
+def test_stale_batch_is_sent(pipeline, performance_item):
+    """Test that a partial batch is sent once its oldest item is too old."""
+    spider = Spider("test")
+    pipeline.process_item(performance_item, spider)
+    pipeline.flush_stale_items(spider)
+    pipeline._api_client.create_performances.assert_not_called()
+    pipeline._oldest_item_time -= 10
+    pipeline.flush_stale_items(spider)
+    pipeline._api_client.create_performances.assert_called_once()
+
+
+def test_failed_batch_is_written_to_dead_letter_file(pipeline, performance_item):
+    """Test that the items of a batch the api rejects are written to the
+    dead letter file and can be read back.
+    """
+    spider = Spider("test")
+    pipeline._api_client.create_performances.side_effect = lambda documents: defer.fail(
+        FlaskAPIException(500, "error")
+    )
+    pipeline.process_item(performance_item, spider)
+    pipeline.close_spider(spider)
+    assert pipeline._stats.get_value("api_batch/items_failed") == 1
+    with open(pipeline._dead_letter_path) as dead_letter_file:
+        assert json.loads(dead_letter_file.readline())["item"]["title"] == "test title"
+    assert pipeline.read_dead_letters()[0]["title"] == "test title"
+    assert pipeline.read_dead_letters() == []
+
+
+def test_batches_are_sent_concurrently(pipeline, performance_item):
+    """Test that a full batch is sent while an earlier one is in flight,
+    and that closing the spider waits for both.
+    """
+    spider = Spider("test")
+    responses = []
+    def create_performances(documents):
+        responses.append(defer.Deferred())
+        return responses[-1]
+    pipeline._api_client.create_performances.side_effect = create_performances
+    for _ in range(4):
+        pipeline.process_item(performance_item, spider)
+    assert pipeline._api_client.create_performances.call_count == 2
+    closed = pipeline.close_spider(spider)
+    assert not closed.called
+    for response in responses:
+        response.callback({
+            "performances": [{"id": 1, "status": "created", "artist_id": 1, "venue_id": 1}] * 2
+        })
+    assert closed.called
+    assert pipeline._stats.get_value("api_batch/items_sent") == 4
+
+
+def test_entities_are_resolved_once_per_crawl(performance_item):
+    """Test that items for the same venue and artist that are in flight
+    at once look them up once, and that later items hit the cache.
+    """
+    crawler = get_crawler(Spider)
+    crawler.stats.open_spider(None)
+    api_client = MagicMock()
+    lookups = []
+    def get_venue_by_name(name):
+        lookups.append(defer.Deferred())
+        return lookups[-1]
+    api_client.get_venue_by_name.side_effect = get_venue_by_name
+    api_client.get_artist_by_name.side_effect = lambda name: defer.fail(
+        FlaskAPIException(404, "not found")
+    )
+    api_client.create_artist.side_effect = lambda item: defer.succeed({"id": 2})
+    api_client.create_performance.side_effect = lambda item: defer.succeed({"id": 3})
+    pipeline = APIPipeline(api_client, stats=crawler.stats)
+    spider = Spider("test")
+    results = [
+        pipeline.process_item(dict(performance_item, artist={"name": "test artist"}), spider)
+        for _ in range(3)
+    ]
+    assert len(lookups) == 1
+    lookups[0].callback({"id": 1})
+    assert all(result.called for result in results)
+    pipeline.process_item(dict(performance_item, artist={"name": "test artist"}), spider)
+    assert api_client.get_venue_by_name.call_count == 1
+    assert api_client.get_artist_by_name.call_count == 1
+    assert api_client.create_artist.call_count == 1
+    assert api_client.create_performance.call_args[0][0]["venue_id"] == 1
+    assert api_client.create_performance.call_args[0][0]["artist_id"] == 2
+    pipeline.close_spider(spider)
+    assert crawler.stats.get_value("entity_cache/venue/hit_rate") == 0.75
+
+
+def test_unchanged_items_are_not_sent_in_incremental_crawls(tmp_path, performance_item):
+    """Test that items which hash the same as when they were stored by an
+    earlier crawl are not sent again, while changed items are.
+    """
+    def crawl(items):
+        crawler = get_crawler(Spider, {
+            "API_BATCH_SIZE": 10,
+            "API_BATCH_TIMEOUT": 10,
+            "API_DEAD_LETTER_PATH": str(tmp_path / "dead_letters.jsonl"),
+            "INCREMENTAL_CRAWL": True,
+            "INCREMENTAL_CRAWL_DIRECTORY": str(tmp_path),
+        })
+        crawler.stats.open_spider(None)
+        api_client = MagicMock()
+        api_client.create_performances.side_effect = lambda documents: defer.succeed({
+            "performances": [
+                {"id": number, "status": "created", "artist_id": 1, "venue_id": 1}
+                for number, _ in enumerate(documents, 1)
+            ]
+        })
+        pipeline = BatchAPIPipeline(api_client, crawler.stats, crawler.settings)
+        spider = Spider("test")
+        spider.settings = crawler.settings
+        pipeline.open_spider(spider)
+        for item in items:
+            pipeline.process_item(dict(item), spider)
+        pipeline.close_spider(spider)
+        sent = [
+            document["title"]
+            for call in api_client.create_performances.call_args_list
+            for document in call[0][0]
+        ]
+        return sent, crawler.stats
+
+    other_item = dict(performance_item, start_datetime="04/19/2020 20:00", title="other title")
+    sent, stats = crawl([performance_item, other_item])
+    assert sent == ["test title", "other title"]
+    assert stats.get_value("incremental/items_new") == 2
+
+    changed_item = dict(other_item, description="new description")
+    sent, stats = crawl([performance_item, changed_item])
+    assert sent == ["other title"]
+    assert stats.get_value("incremental/items_unchanged") == 1
+    assert stats.get_value("incremental/items_changed") == 1
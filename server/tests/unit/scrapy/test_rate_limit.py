@@ -0,0 +1,117 @@
+"""This module contains tests for the rate limits shared between crawler
+processes.
+"""
+
+
+from unittest.mock import MagicMock
+from scrapy import Request, Spider
+from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+from scrapy_splash import SlotPolicy, SplashMiddleware, SplashRequest
+from twisted.internet.defer import Deferred
+from app.performance_scraper.performance_scraper.middlewares import DistributedRateLimitMiddleware
+
+
+def make_middleware(wait=0, slot="slot"):
+    """Return a middleware with a mocked limiter."""
+    limiter = MagicMock()
+    limiter.reserve.return_value = wait
+    limiter.acquire_render_slot.return_value = slot
+    return DistributedRateLimitMiddleware(limiter, get_crawler(Spider).stats, 0.5)
+
+
+def test_requests_wait_for_their_domain():
+    """Test that requests are held back only when their domain is over its
+    rate.
+    """
+    spider = Spider("limited")
+    middleware = make_middleware()
+    assert middleware.process_request(Request("https://www.example.com/events"), spider) is None
+    middleware.limiter.reserve.assert_called_once_with("www.example.com")
+    middleware = make_middleware(wait=2.5)
+    waiting = middleware.process_request(Request("https://www.example.com/events"), spider)
+    assert isinstance(waiting, Deferred)
+    waiting.cancel()
+    assert middleware.stats.get_value("rate_limit/wait_seconds", spider=spider) == 2.5
+
+
+def test_splash_render_slots_are_released():
+    """Test that Splash requests take a render slot, which is released once
+    and not carried over to retries of the request.
+    """
+    spider = Spider("rendering")
+    middleware = make_middleware()
+    request = Request("https://www.example.com/events", meta={"splash": {}})
+    assert middleware.process_request(request, spider) is None
+    assert request.meta["splash_render_slot"] == "slot"
+    response = HtmlResponse(request.url, request=request)
+    assert middleware.process_response(request, response, spider) is response
+    middleware.process_exception(request, ValueError(), spider)
+    middleware.limiter.release_render_slot.assert_called_once_with("slot")
+    assert "splash_render_slot" not in request.meta
+
+
+def test_splash_requests_are_limited_once():
+    """Test that a Splash request is limited before SplashMiddleware turns
+    it into a request to Splash, and not again when that request passes
+    through the middlewares.
+    """
+    spider = Spider("rendering")
+    middleware = make_middleware()
+    splash_middleware = SplashMiddleware.from_crawler(get_crawler(Spider, {"SPLASH_URL": "http://splash:8050"}))
+    # the default slot policy needs a running engine
+    request = SplashRequest(
+        "https://www.example.com/events", endpoint="execute", args={"lua_source": ""},
+        slot_policy=SlotPolicy.SCRAPY_DEFAULT
+    )
+    assert middleware.process_request(request, spider) is None
+    splash_request = splash_middleware.process_request(request, spider)
+    assert splash_request.url == "http://splash:8050/execute"
+    assert middleware.process_request(splash_request, spider) is None
+    middleware.limiter.reserve.assert_called_once_with("www.example.com")
+    middleware.limiter.acquire_render_slot.assert_called_once_with()
+    response = HtmlResponse(splash_request.url, request=splash_request)
+    middleware.process_response(splash_request, response, spider)
+    middleware.limiter.release_render_slot.assert_called_once_with("slot")
+
+
+def test_retries_of_splash_requests_are_limited_again():
+    """Test that a request to Splash that is retried after a 504 reserves
+    a token on the domain of its page and takes a render slot of its own.
+    """
+    crawler = get_crawler(Spider, {"SPLASH_URL": "http://splash:8050"})
+    spider = Spider.from_crawler(crawler, "rendering")
+    middleware = make_middleware()
+    splash_middleware = SplashMiddleware.from_crawler(crawler)
+    request = SplashRequest(
+        "https://www.example.com/events", endpoint="execute", args={"lua_source": ""},
+        slot_policy=SlotPolicy.SCRAPY_DEFAULT
+    )
+    middleware.process_request(request, spider)
+    splash_request = splash_middleware.process_request(request, spider)
+    middleware.process_request(splash_request, spider)
+    response = HtmlResponse(splash_request.url, status=504, request=splash_request)
+    middleware.process_response(splash_request, response, spider)
+    retry = RetryMiddleware.from_crawler(crawler).process_response(splash_request, response, spider)
+    assert retry is not response
+    assert middleware.process_request(retry, spider) is None
+    assert middleware.limiter.reserve.call_count == 2
+    middleware.limiter.reserve.assert_called_with("www.example.com")
+    assert middleware.limiter.acquire_render_slot.call_count == 2
+    assert retry.meta["splash_render_slot"] == "slot"
+    assert splash_middleware.process_request(retry, spider) is None
+
+
+def test_redis_calls_time_out_quickly():
+    """Test that the shared limits give up on a slow Redis after the
+    configured timeout, since they are checked on the reactor thread.
+    """
+    crawler = get_crawler(Spider, {
+        "RATE_LIMIT_REDIS_URL": "redis://localhost:6379/0",
+        "RATE_LIMIT_REDIS_TIMEOUT": 0.25,
+    })
+    middleware = DistributedRateLimitMiddleware.from_crawler(crawler)
+    connection_kwargs = middleware.limiter._redis.connection_pool.connection_kwargs
+    assert connection_kwargs["socket_connect_timeout"] == 0.25
+    assert connection_kwargs["socket_timeout"] == 0.25
@@ -0,0 +1,156 @@
+"""This module contains tests for choosing between plain and Splash
+requests for the pages of a spider.
+"""
+
+
+from scrapy import Spider
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+from scrapy_splash import SplashRequest
+from app.performance_scraper.performance_scraper.splash import SplashRenderMixin
+from app.performance_scraper.performance_scraper.render_decisions import (
+    RenderDecisionStore,
+    PLAIN,
+    SPLASH,
+    url_pattern,
+)
+from app.performance_scraper.performance_scraper import settings
+
+
+class DetailSpider(SplashRenderMixin, Spider):
+    """Spider whose detail pages may not need Splash."""
+
+    name = "detail"
+    render_policy = {"parse_event": ("h1.headline",)}
+
+    def parse_event(self, response, start):
+        if not response.css("a.genre"):
+            self.needs_render(response)
+        yield {"title": response.css("h1.headline::text").get(), "start": start}
+
+
+DETAIL_PAGE = "<h1 class='headline'>Jazz</h1><a class='genre'>Jazz</a>"
+
+
+def create_spider(tmp_path, min_misses=1, reprobe_interval=10):
+    """Return a spider that stores its rendering decisions in tmp_path."""
+    crawler = get_crawler(DetailSpider, {
+        "RENDER_DECISIONS_DIRECTORY": str(tmp_path),
+        "RENDER_DECISION_MIN_MISSES": min_misses,
+        "RENDER_REPROBE_INTERVAL": reprobe_interval,
+        "SPLASH_RENDER_TIMEOUT": settings.SPLASH_RENDER_TIMEOUT,
+        "SPLASH_POLL_INTERVAL": settings.SPLASH_POLL_INTERVAL,
+        "SPLASH_RESOURCE_TIMEOUT": settings.SPLASH_RESOURCE_TIMEOUT,
+    })
+    spider = DetailSpider.from_crawler(crawler)
+    crawler.stats.open_spider(spider)
+    return spider
+
+
+def respond(request, body):
+    """Return an html response with the given body to the given request."""
+    return HtmlResponse(request.url, body=body.encode(), encoding="utf-8", request=request)
+
+
+def test_url_pattern():
+    """Test that detail pages of the same kind share a url pattern."""
+    assert url_pattern("https://www.example.org/events/2020/jazz/kenny-g/") == "www.example.org/events/*/jazz/*"
+    assert url_pattern("https://www.example.org/events/2020/jazz/other") == "www.example.org/events/*/jazz/*"
+
+
+def test_plain_request_is_used_when_selectors_are_in_html(tmp_path):
+    """Test that a page with the required selectors is parsed without Splash
+    and that the decision is persisted for later crawls.
+    """
+    spider = create_spider(tmp_path)
+    url = "https://www.example.org/events/1/jazz"
+    request = spider.render_request(url, spider.parse_event, wait_for="h1", cb_kwargs={"start": 1})
+    assert not isinstance(request, SplashRequest)
+    results = list(request.callback(respond(request, DETAIL_PAGE), **request.cb_kwargs))
+    assert results == [{"title": "Jazz", "start": 1}]
+    spider.closed("finished")
+    assert RenderDecisionStore.from_spider(spider).get(url) == PLAIN
+    assert spider.crawler.stats.get_value("render/plain") == 1
+
+
+def test_splash_is_used_when_selectors_are_missing(tmp_path):
+    """Test that a page without the required selectors is rendered with
+    Splash, and that later crawls go straight to Splash for its pattern.
+    """
+    spider = create_spider(tmp_path)
+    url = "https://www.example.org/events/1/jazz"
+    request = spider.render_request(url, spider.parse_event, wait_for="h1", cb_kwargs={"start": 1})
+    results = list(request.callback(respond(request, "<div id='app'></div>"), **request.cb_kwargs))
+    assert len(results) == 1
+    assert isinstance(results[0], SplashRequest)
+    assert results[0].callback == spider.parse_event
+    assert results[0].cb_kwargs == {"start": 1}
+    spider.closed("finished")
+
+    spider = create_spider(tmp_path)
+    request = spider.render_request(
+        "https://www.example.org/events/2/jazz", spider.parse_event, wait_for="h1", cb_kwargs={"start": 2}
+    )
+    assert isinstance(request, SplashRequest)
+    assert spider.crawler.stats.get_value("render/splash") == 1
+
+
+def test_one_missing_page_does_not_decide_for_its_pattern(tmp_path):
+    """Test that a pattern goes to Splash only once its misses reach the
+    threshold and outnumber its hits.
+    """
+    spider = create_spider(tmp_path, min_misses=3)
+    store = RenderDecisionStore.from_spider(spider)
+    url = "https://www.example.org/events/1/jazz"
+    store.record(url, True)
+    store.record(url, False)
+    store.record(url, False)
+    assert store.get(url) == PLAIN
+    store.record(url, False)
+    assert store.get(url) == SPLASH
+    store.record(url, True)
+    store.record(url, True)
+    assert store.get(url) == PLAIN
+
+
+def test_splash_patterns_are_probed_again(tmp_path):
+    """Test that every few pages of a pattern rendered with Splash are tried
+    without Splash again, and that pages which have their selectors again
+    bring the pattern back to plain requests.
+    """
+    spider = create_spider(tmp_path, reprobe_interval=3)
+    spider.render_decisions.record("https://www.example.org/events/1/jazz", False)
+    requests = [
+        spider.render_request(
+            f"https://www.example.org/events/{number}/jazz", spider.parse_event, wait_for="h1",
+            cb_kwargs={"start": number}
+        )
+        for number in range(1, 7)
+    ]
+    probes = [request for request in requests if not isinstance(request, SplashRequest)]
+    assert [request.url for request in probes] == [
+        "https://www.example.org/events/3/jazz", "https://www.example.org/events/6/jazz"
+    ]
+    assert spider.crawler.stats.get_value("render/reprobe") == 2
+    for request in probes:
+        list(request.callback(respond(request, DETAIL_PAGE), **request.cb_kwargs))
+    assert spider.render_decisions.get("https://www.example.org/events/7/jazz") == PLAIN
+
+
+def test_callbacks_can_ask_for_splash(tmp_path):
+    """Test that a plain page with the required selectors is rendered with
+    Splash when its callback needs something else that is missing, and that
+    the page counts as a miss.
+    """
+    spider = create_spider(tmp_path)
+    url = "https://www.example.org/events/1/jazz"
+    request = spider.render_request(url, spider.parse_event, wait_for="h1", cb_kwargs={"start": 1})
+    response = respond(request, "<h1 class='headline'>Jazz</h1>")
+    results = list(request.callback(response, **request.cb_kwargs))
+    assert len(results) == 1
+    assert isinstance(results[0], SplashRequest)
+    assert spider.render_decisions.get(url) == SPLASH
+    assert spider.crawler.stats.get_value("render/plain") is None
+    rendered = respond(results[0], "<h1 class='headline'>Jazz</h1>")
+    results = list(results[0].callback(rendered, **results[0].cb_kwargs))
+    assert results == [{"title": "Jazz", "start": 1}]
@@ -0,0 +1,61 @@
+"""This module contains tests for the shared Splash rendering."""
+
+
+from unittest.mock import MagicMock
+from scrapy import Spider
+from scrapy.utils.test import get_crawler
+from scrapy_splash import SplashJsonResponse
+from app.performance_scraper.performance_scraper.splash import SplashRenderMixin, first_party_domain
+from app.performance_scraper.performance_scraper.middlewares import SplashRenderStatsMiddleware
+from app.performance_scraper.performance_scraper import settings
+
+
+class RenderingSpider(SplashRenderMixin, Spider):
+    """Spider that renders its pages with Splash."""
+
+    name = "rendering"
+    splash_allowed_domains = ("cdn.example.net",)
+
+
+def test_first_party_domain():
+    """Test that the first party of a url is its host without 'www.'."""
+    assert first_party_domain("https://www.kimmelcenter.org/events/") == "kimmelcenter.org"
+    assert first_party_domain("https://events.example.com/list") == "events.example.com"
+
+
+def test_splash_request_waits_for_selector():
+    """Test that Splash requests poll for the spider's selector instead
+    of waiting a fixed time.
+    """
+    crawler = get_crawler(RenderingSpider, {
+        "SPLASH_RENDER_TIMEOUT": settings.SPLASH_RENDER_TIMEOUT,
+        "SPLASH_POLL_INTERVAL": settings.SPLASH_POLL_INTERVAL,
+        "SPLASH_RESOURCE_TIMEOUT": settings.SPLASH_RESOURCE_TIMEOUT,
+    })
+    spider = RenderingSpider.from_crawler(crawler)
+    request = spider.splash_request(
+        "https://www.example.com/events", spider.parse, wait_for="div.event", cb_kwargs={"page": 1}
+    )
+    args = request.meta["splash"]["args"]
+    assert request.meta["splash"]["endpoint"] == "execute"
+    assert request.cb_kwargs == {"page": 1}
+    assert args["wait_for"] == "div.event"
+    assert "wait" not in args
+    assert args["render_timeout"] == 15.0
+    assert args["allowed_domains"] == ["example.com", "cdn.example.net"]
+    assert args["block_third_party"]
+    assert "splash.images_enabled = false" in args["lua_source"]
+
+
+def test_render_stats_are_recorded():
+    """Test that the time Splash spent polling is recorded per render."""
+    crawler = get_crawler(Spider, {"SPLASH_RENDER_TIMEOUT": 15.0})
+    spider = crawler._create_spider("rendering")
+    crawler.stats.open_spider(spider)
+    middleware = SplashRenderStatsMiddleware.from_crawler(crawler)
+    for data in ({"ready": True, "waited": 0.5}, {"ready": False, "waited": 15.0}):
+        response = MagicMock(spec=SplashJsonResponse, data=data)
+        assert middleware.process_response(None, response, spider) is response
+    assert crawler.stats.get_value("splash/render/ready") == 1
+    assert crawler.stats.get_value("splash/render/timed_out") == 1
+    assert crawler.stats.get_value("splash/render/wait_seconds") == 15.5
@@ -0,0 +1,37 @@
+"""This module contains tests for the Celery tasks that run the spiders."""
+
+
+from unittest.mock import patch
+from app.performance_scraper.performance_scraper import tasks
+
+
+def test_group_crawl_summary_totals_spiders():
+    """Test that the summary of a group crawl has the totals of each
+    spider, their sums, and the errors of the crawls that failed.
+    """
+    stats = {
+        "item_scraped_count": 4,
+        "item_dropped_count": 1,
+        "api_batch/items_created": 3,
+        "start_time": "2020-01-01T20:00:00",
+        "finish_time": "2020-01-01T20:01:30"
+    }
+    results = [stats, dict(stats, item_scraped_count=6), {"errors": "RuntimeError: down"}]
+    with patch.object(tasks, "record_group_summary") as record_group_summary:
+        summary = tasks.summarize_group_crawl(
+            results, "group", ["time", "heritage", "kimmel_center"], ["a", "b", "c"]
+        )
+    record_group_summary.assert_called_once_with("group", summary)
+    assert summary["status"] == "FAILURE"
+    assert summary["spiders"]["time"] == {
+        "task_id": "a",
+        "status": "SUCCESS",
+        "items": 4,
+        "new_rows": 3,
+        "dropped": 1,
+        "duration_seconds": 90.0
+    }
+    assert summary["spiders"]["kimmel_center"]["errors"] == "RuntimeError: down"
+    assert summary["totals"] == {
+        "items": 10, "new_rows": 6, "dropped": 2, "duration_seconds": 90.0
+    }
@@ -27,6 +27,17 @@ def drop_tables():
     db.drop_all()
 
 
+@app.cli.command()
+def queue_image_derivatives():
+    """Queue the generation of resized copies for images that have none."""
+    from app.api.tasks import generate_image_derivatives
+    content_hashes = db.session.query(Image.content_hash).filter(
+        Image.derivatives.is_(None), Image.content_hash.isnot(None)
+    ).distinct()
+    for (content_hash,) in content_hashes:
+        generate_image_derivatives.delay(content_hash)
+
+
 @app.shell_context_processor
 def make_shell_context():
     """Allow the models and database instance to be automatically imported